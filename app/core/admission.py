@@ -0,0 +1,150 @@
+"""
+Per-client rate limiting and global admission control.
+
+Runs as the outermost ASGI middleware so rejected requests cost one bucket
+lookup and a pre-encoded response, never routing, rendering or compression.
+"""
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.ratelimit import TokenBucketLimiter
+from app.core.utils import client_ip
+
+
+class AdmissionStats:
+    """Live counters for the admission layer (read by metrics and background jobs)."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.overloaded = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "overloaded": self.overloaded,
+        }
+
+
+admission_stats = AdmissionStats()
+
+
+def _json_body(detail: str) -> bytes:
+    return json.dumps({"detail": detail}).encode("utf-8")
+
+
+_RATE_LIMITED_BODY = _json_body("Too many requests")
+_OVERLOADED_BODY = _json_body("Server busy, retry shortly")
+
+
+class AdmissionControlMiddleware:
+    """Token-bucket budgets per client and route prefix, plus an in-flight cap.
+
+    Budgets come from ``Settings.rate_limit_route_budgets`` (longest prefix
+    wins, ``rate_limit_default_budget`` otherwise), expressed as request
+    units per ``rate_limit_period`` seconds. Listing endpoints are charged
+    by the page size they ask for: one unit per ``rate_limit_page_size``
+    items of ``limit`` (at least one), and ``rate_limit_unbounded_cost``
+    units, the most, without a ``limit`` since that serializes the whole
+    catalog. Everything else, fixed-size HTML pages included, costs one unit.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_in_flight: Optional[int] = None,
+        route_budgets: Optional[Dict[str, int]] = None,
+        default_budget: Optional[int] = None,
+        period: Optional[float] = None,
+        unbounded_paths: Optional[List[str]] = None,
+        unbounded_cost: Optional[float] = None,
+        exempt_prefixes: Optional[List[str]] = None,
+        stats: AdmissionStats = admission_stats
+    ):
+        self.app = app
+        self.max_in_flight = max_in_flight if max_in_flight is not None else settings.max_in_flight_requests
+        self.period = period or settings.rate_limit_period
+        self.unbounded_paths = set(unbounded_paths if unbounded_paths is not None else settings.rate_limit_unbounded_paths)
+        self.unbounded_cost = unbounded_cost if unbounded_cost is not None else settings.rate_limit_unbounded_cost
+        self.page_size = settings.rate_limit_page_size
+        self.exempt_prefixes = tuple(exempt_prefixes if exempt_prefixes is not None else settings.rate_limit_exempt_prefixes)
+        self.stats = stats
+
+        budgets = route_budgets if route_budgets is not None else settings.rate_limit_route_budgets
+        # Longest prefix first so "/api/noteonai" beats "/api"
+        self.route_limiters: List[Tuple[str, TokenBucketLimiter]] = sorted(
+            (
+                (prefix, TokenBucketLimiter(f"route:{prefix}", budget, self.period))
+                for prefix, budget in budgets.items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+        self.default_limiter = TokenBucketLimiter(
+            "route:*", default_budget or settings.rate_limit_default_budget, self.period
+        )
+
+    def _limiter_for(self, path: str) -> TokenBucketLimiter:
+        for prefix, limiter in self.route_limiters:
+            if path.startswith(prefix):
+                return limiter
+        return self.default_limiter
+
+    def _cost(self, scope: Scope) -> float:
+        if scope["path"] not in self.unbounded_paths:
+            return 1.0
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            limit = int(query["limit"][0])
+        except (KeyError, ValueError):
+            return self.unbounded_cost
+        return min(self.unbounded_cost, max(1.0, limit / self.page_size))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path.startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        if self.max_in_flight and self.stats.in_flight >= self.max_in_flight:
+            self.stats.overloaded += 1
+            await self._reject(send, 503, _OVERLOADED_BODY, 1.0)
+            return
+
+        retry_after = await self._limiter_for(path).hit_async(client_ip(scope), self._cost(scope))
+        if retry_after:
+            self.stats.rate_limited += 1
+            await self._reject(send, 429, _RATE_LIMITED_BODY, retry_after)
+            return
+
+        self.stats.admitted += 1
+        self.stats.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.stats.in_flight -= 1
+
+    @staticmethod
+    async def _reject(send: Send, status_code: int, body: bytes, retry_after: float) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
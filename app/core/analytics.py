@@ -0,0 +1,74 @@
+"""
+Route view counting middleware.
+
+Successful GET requests are counted against the route's path template
+(``/``, ``/projects``, ``/api/noteonai/{article_id}``), so aliases like
+``/index.html`` and every article ID share one counter per route; detail
+routes also count a view of their article or project. The response cache
+restores the matched endpoint on hits, so cached responses are counted too.
+Counting is an in-memory increment on ``view_counter``; persistence happens
+in the background.
+"""
+from typing import Callable, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.analytics import ViewCounter, view_counter
+
+# Probes and the admin panel are not traffic
+_UNCOUNTED_PREFIXES = ("/api/health", "/api/ready", "/admin")
+# Detail routes that also count a view of the item: template -> (kind, path param)
+_ITEM_ROUTES = {
+    "/noteonai/{article_id}": ("article", "article_id"),
+    "/api/noteonai/{article_id}": ("article", "article_id"),
+    "/api/projects/{project_id}": ("project", "project_id"),
+}
+
+
+class RouteViewMiddleware:
+    """Counts successful GET requests per route path template."""
+
+    def __init__(self, app: ASGIApp, counter: ViewCounter = view_counter):
+        self.app = app
+        self.counter = counter
+        self._templates: Optional[Dict[Callable, str]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not self.counter.enabled
+            or scope["path"].startswith(_UNCOUNTED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        status = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        # The router leaves the matched endpoint in the scope
+        if status < 400 and "endpoint" in scope:
+            template = self._route_templates(scope).get(scope["endpoint"])
+            if template is not None:
+                self.counter.record("route", template)
+                item = _ITEM_ROUTES.get(template)
+                if item is not None:
+                    self.counter.record(item[0], scope["path_params"][item[1]])
+
+    def _route_templates(self, scope: Scope) -> Dict[Callable, str]:
+        if self._templates is None:
+            templates: Dict[Callable, str] = {}
+            for route in scope["app"].routes:
+                endpoint = getattr(route, "endpoint", None)
+                if endpoint is not None and (endpoint not in templates or len(route.path) < len(templates[endpoint])):
+                    # Shortest alias wins, so "/" covers "/index.html"
+                    templates[endpoint] = route.path
+            self._templates = templates
+        return self._templates
@@ -1,7 +1,7 @@
 """
 Core configuration for the Portfolio FastAPI application.
 """
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -19,6 +19,17 @@ class Settings(BaseSettings):
     host: str = Field(default="0.0.0.0", description="Server host")
     port: int = Field(default=8000, description="Server port")
     reload: bool = Field(default=False, description="Auto-reload on changes")
+    workers: int = Field(default=1, description="Worker processes started by the production launcher")
+    preload: bool = Field(default=True, description="Load the catalog, templates and indexes once in the launcher before forking workers")
+    background_warmup: bool = Field(default=True, description="Load data in the background at startup instead of on first request")
+    warmup_wait_timeout: float = Field(default=10.0, description="Seconds a request waits for warm-up before getting a 503")
+    forwarded_allow_ips: str = Field(default="127.0.0.1", description="Comma-separated proxy IPs/CIDRs whose X-Forwarded-For names the client; '*' trusts any peer as a single proxy hop")
+    worker_restart_backoff: float = Field(default=1.0, description="Seconds before re-forking a crashed worker, doubled per consecutive crash")
+    worker_restart_backoff_max: float = Field(default=30.0, description="Longest wait before re-forking a crashed worker")
+    worker_max_crashes: int = Field(default=10, description="Consecutive early worker crashes before the launcher gives up")
+    worker_stable_after: float = Field(default=60.0, description="Seconds a worker must run before its exit no longer counts as a crash in a row")
+    refresh_signal_path: str = Field(default="data/.catalog-version", description="File rewritten on every catalog refresh; other processes reload when it changes")
+    refresh_poll_interval: float = Field(default=2.0, description="Seconds between checks of the refresh signal file (0 disables)")
     
     # Template Configuration
     template_dir: str = Field(default="app/templates", description="Templates directory")
@@ -26,6 +37,94 @@ class Settings(BaseSettings):
     assets_dir: str = Field(default="assets", description="Assets directory")
     data_dir: str = Field(default="data", description="Data directory")
     
+    # Rendering Configuration
+    streaming_pages: List[str] = Field(default=["noteonai"], description="Pages rendered as streamed HTML responses")
+    stream_chunk_size: int = Field(default=16384, description="Bytes buffered before a streamed chunk is flushed")
+    gzip_minimum_size: int = Field(default=1000, description="Minimum response size for gzip compression")
+    
+    # Static Export Configuration
+    export_dir: str = Field(default="dist", description="Output directory for the static site export")
+    export_precompress: bool = Field(default=True, description="Write .gz (and .br if available) variants of exported files")
+    
+    # Feed & Sitemap Configuration
+    site_url: str = Field(default="https://portfolio-fastapi-v.onrender.com", description="Public base URL used for absolute links in feeds and sitemaps")
+    feed_max_items: int = Field(default=50, description="Most recent articles included in the RSS/Atom feeds")
+    sitemap_shard_size: int = Field(default=5000, description="URLs per sitemap file before splitting into a sitemap index")
+    feed_cache_max_age: int = Field(default=300, description="Cache-Control max-age (seconds) for feeds and sitemaps")
+    
+    # Related Content Configuration
+    related_top_k: int = Field(default=10, description="Neighbors kept per article/project")
+    related_max_postings: int = Field(default=1000, description="Postings walked per row when collecting neighbor candidates")
+    
+    # Chat Configuration
+    chat_top_k: int = Field(default=4, description="Documents retrieved per chat question")
+    chat_cache_size: int = Field(default=256, description="Answers kept in the chat answer cache")
+    chat_max_question_length: int = Field(default=500, description="Maximum chat question length in characters")
+    
+    # Analytics Configuration
+    analytics_enabled: bool = Field(default=True, description="Count article, project and route views")
+    analytics_db_path: str = Field(default="data/.analytics.sqlite3", description="SQLite file view counts are flushed to (shared by workers)")
+    analytics_flush_interval: float = Field(default=10.0, description="Seconds between background flushes of pending view counts")
+    
+    # Response Cache Configuration
+    response_cache_enabled: bool = Field(default=True, description="Cache rendered GET pages and catalog JSON in memory")
+    response_cache_paths: List[str] = Field(
+        default=["/", "/index.html", "/projects", "/projects.html", "/noteonai", "/noteonai.html",
+                 "/api/noteonai", "/api/projects", "/api/featured", "/api/portfolio-summary", "/api/batch"],
+        description="Cacheable paths (exact, or as a prefix followed by '/')"
+    )
+    response_cache_ttl: float = Field(default=300.0, description="Seconds a cached response stays fresh within one catalog generation")
+    response_cache_max_bytes: int = Field(default=64 * 1024 * 1024, description="Max total size of cached response bodies")
+    
+    # Cache Warming Configuration
+    cache_warm_enabled: bool = Field(default=True, description="Re-render popular URLs into the response cache after data changes")
+    cache_warm_max_items: int = Field(default=50, description="Max URLs rendered per warm-up run")
+    cache_warm_top_articles: int = Field(default=20, description="Most viewed article detail responses to warm")
+    cache_warm_top_categories: int = Field(default=5, description="Most viewed category listings to warm")
+    cache_warm_interval: float = Field(default=0.05, description="Seconds to pause between warm-up renders")
+    cache_warm_max_in_flight: int = Field(default=0, description="Warm only while at most this many client requests are in flight")
+    
+    # Profiling Configuration
+    profile_sample_interval: float = Field(default=0.005, description="Seconds between stack samples while a profile runs")
+    profile_max_seconds: int = Field(default=120, description="Longest profile an admin can start")
+    slow_request_threshold_ms: float = Field(default=500.0, description="Requests at least this slow go to the slow-request log")
+    slow_request_log_size: int = Field(default=100, description="Slow requests kept (oldest dropped first)")
+    
+    # Memory Introspection Configuration
+    memory_trace_frames: int = Field(default=1, description="Frames tracemalloc keeps per allocation during a leak check")
+    memory_leak_threshold_bytes: int = Field(default=256 * 1024, description="Traced growth per refresh_data() reported as a suspected leak")
+    
+    # Article Content Configuration
+    content_cache_dir: str = Field(default="data/.cache/content", description="Rendered article content, one JSON file per content hash")
+    content_words_per_minute: int = Field(default=230, description="Reading speed used for read_time")
+    content_render_workers: int = Field(default=0, description="Processes rendering the archive (0 = CPU count)")
+    content_memory_cache_size: int = Field(default=256, description="Rendered articles kept in memory in front of the disk cache")
+    
+    # JSON API Configuration
+    api_max_ids: int = Field(default=100, description="Most ids one request can ask for (ids= and /api/batch)")
+    
+    # Catalog Transfer Configuration
+    transfer_batch_size: int = Field(default=500, description="Imported articles written per atomic batch")
+    transfer_max_line_bytes: int = Field(default=4 * 1024 * 1024, description="Longest NDJSON line accepted by the import")
+    transfer_max_errors: int = Field(default=100, description="Invalid import lines listed in the report (all are counted)")
+    transfer_chunk_size: int = Field(default=64 * 1024, description="Bytes per chunk of the NDJSON export stream")
+    
+    # Surrogate Key Configuration
+    surrogate_keys_enabled: bool = Field(default=True, description="Tag GET responses with surrogate keys for fronting caches")
+    surrogate_key_header: str = Field(default="Surrogate-Key", description="Response header carrying the space-separated keys")
+    surrogate_max_keys: int = Field(default=100, description="Keys per response before item keys collapse into articles:any / projects:any")
+    surrogate_max_age: int = Field(default=86400, description="Surrogate-Control max-age sent when a purge hook is configured (0 = none)")
+    surrogate_purge_url: str = Field(default="", description="Purge hook called with stale keys after each catalog change (empty = off)")
+    surrogate_purge_token: str = Field(default="", description="Bearer token sent to the purge hook")
+    surrogate_purge_batch: int = Field(default=256, description="Keys per purge request")
+    surrogate_purge_retries: int = Field(default=3, description="Retries (with backoff) of a failed purge request")
+    surrogate_purge_timeout: float = Field(default=5.0, description="Seconds before a purge request times out")
+    
+    # Critical CSS Configuration
+    critical_css_enabled: bool = Field(default=True, description="Inline each page's critical CSS and load the full stylesheet without blocking render")
+    critical_css_dir: str = Field(default="static/css/build", description="Build output: critical CSS per page, the flattened stylesheet and its manifest (inside static_dir)")
+    critical_css_fold_elements: int = Field(default=250, description="Leading <body> elements counted as above the fold when extracting critical CSS")
+    
     # CORS Configuration
     allowed_origins: List[str] = Field(default=["https://portfolio-fastapi-v.onrender.com", "http://localhost:3000", "http://localhost:8000"], description="Allowed CORS origins")
     allowed_methods: List[str] = Field(default=["GET", "POST", "PUT", "DELETE", "OPTIONS"], description="Allowed HTTP methods")
@@ -42,11 +141,55 @@ class Settings(BaseSettings):
     secret_key: str = Field(default="your-super-secret-key-change-this-in-prod", description="Secret key for JWT")
     algorithm: str = Field(default="HS256", description="Algorithm for JWT")
     access_token_expire_minutes: int = Field(default=30, description="Token expiration time")
+    jwt_backend: str = Field(default="hmac", description="JWT verification backend: 'hmac' (stdlib, HS* only) or 'jose'")
+    token_cache_size: int = Field(default=256, description="Max verified tokens kept in the verification cache")
+    
+    # Admin Forms
+    admin_popular_tags: int = Field(default=24, description="Most used tags shown as chips on the add-article page")
+    admin_batch_max_operations: int = Field(default=500, description="Most operations accepted by one /admin/batch request")
     
     # Admin Credentials (should be set via env vars in production)
     admin_username: str = Field(default="admin", description="Admin username")
     admin_password: str = Field(default="admin123", description="Admin password")
     admin_totp_secret: str = Field(default="JBSWY3DPEHPK3PXP", description="TOTP Secret (Base32)")
+    
+    # Medium Import Configuration
+    medium_fetch_timeout: int = Field(default=20, description="Timeout in seconds for fetching a Medium page")
+    medium_fetch_concurrency: int = Field(default=8, description="Max concurrent page fetches during bulk import")
+    medium_per_host_concurrency: int = Field(default=2, description="Max concurrent fetches against one host")
+    medium_host_delay: float = Field(default=0.5, description="Minimum seconds between request starts to the same host")
+    medium_max_fetch_bytes: int = Field(default=8 * 1024 * 1024, description="Max bytes read from a Medium page while extracting metadata")
+    medium_read_chunk_size: int = Field(default=64 * 1024, description="Read size when streaming a Medium page")
+    medium_cache_dir: str = Field(default="data/.cache/medium", description="On-disk cache of fetched pages")
+    medium_cache_ttl: int = Field(default=86400, description="Seconds a cached page stays fresh")
+    
+    # Rate Limiting Configuration
+    rate_limit_backend: str = Field(default="memory", description="Rate limit state store: 'memory' (per worker) or 'sqlite' (shared)")
+    rate_limit_db_path: str = Field(default="data/.ratelimit.sqlite3", description="SQLite file for the shared rate limit backend")
+    rate_limit_max_keys: int = Field(default=10000, description="Max buckets held by the in-memory backend (LRU evicted)")
+    login_attempts_per_ip: int = Field(default=20, description="Login attempts allowed per client IP per window")
+    login_attempts_per_username: int = Field(default=5, description="Login attempts allowed per username per window, from all clients together")
+    login_attempt_window: int = Field(default=300, description="Login throttling window in seconds")
+    
+    # Admission Control Configuration
+    rate_limit_enabled: bool = Field(default=True, description="Enable per-client rate limiting and the in-flight cap")
+    rate_limit_period: int = Field(default=60, description="Window in seconds for per-route request budgets")
+    rate_limit_default_budget: int = Field(default=120, description="Request units per client per window for unlisted routes")
+    rate_limit_route_budgets: Dict[str, int] = Field(
+        default={"/noteonai": 60, "/api/noteonai": 120, "/api/projects": 120, "/admin": 60},
+        description="Request units per client per window, by route prefix (longest prefix wins)"
+    )
+    rate_limit_unbounded_paths: List[str] = Field(
+        default=["/api/noteonai", "/api/projects"],
+        description="Listing routes charged by the requested page size (their 'limit')"
+    )
+    rate_limit_page_size: int = Field(default=20, description="Listing items per request unit; larger limits cost proportionally more")
+    rate_limit_unbounded_cost: float = Field(default=5.0, description="Request units charged for a listing without a limit (the most a listing costs)")
+    rate_limit_exempt_prefixes: List[str] = Field(
+        default=["/static", "/assets", "/api/health"],
+        description="Path prefixes that bypass admission control"
+    )
+    max_in_flight_requests: int = Field(default=64, description="Global cap on concurrent requests before answering 503 (0 disables)")
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,248 @@
+"""
+Production launcher: preload once, then fork uvicorn workers.
+
+The parent process imports the app and runs the startup warm-up (portfolio
+catalog, templates, feed, related-content and chat indexes), then runs ``gc.collect()`` and ``gc.freeze()`` so the garbage
+collector never writes to those objects again. Workers forked afterwards
+share those pages copy-on-write instead of each holding its own copy.
+
+The listening socket is bound in the parent and inherited by every worker.
+The parent restarts workers that die (waiting longer after each crash in a
+row, and giving up after ``worker_max_crashes``), forwards SIGINT/SIGTERM,
+and logs each worker's startup time and memory (RSS, plus PSS and private
+memory on Linux, which show how much is really shared).
+
+Workers keep their own catalog snapshot and caches; an admin change made on
+one reaches the others through the refresh signal file they poll. Login
+throttles and TOTP replay protection must be shared too, so more than one
+worker requires ``rate_limit_backend = "sqlite"``.
+
+Usage:
+    python -m app.core.launcher [--host 0.0.0.0] [--port 8000] [--workers 4] [--no-preload]
+"""
+import argparse
+import gc
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def preload():
+    """Load everything workers would otherwise build on their own, then freeze it."""
+    from main import app  # noqa: F401
+    from app.core.startup import startup_state, warm_up
+
+    warm_up(startup_state)
+    gc.collect()
+    gc.freeze()
+    steps = ", ".join(f"{name} {step.get('ms', '-')} ms" for name, step in startup_state.steps.items())
+    print(f"Preloaded ({steps}); {gc.get_freeze_count()} objects frozen")
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """Memory of a process in KiB: rss, and pss/private where /proc provides them."""
+    usage: Dict[str, int] = {}
+    fields = {"Rss:": "rss", "Pss:": "pss", "Private_Clean:": "private", "Private_Dirty:": "private"}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                parts = line.split()
+                if parts and parts[0] in fields:
+                    key = fields[parts[0]]
+                    usage[key] = usage.get(key, 0) + int(parts[1])
+    except OSError:
+        if pid == os.getpid():
+            import resource
+            # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            usage["rss"] = peak // 1024 if sys.platform == "darwin" else peak
+    return usage
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class _ReportingServer(uvicorn.Server):
+    """uvicorn server that reports its startup time to the launcher once listening."""
+
+    def __init__(self, config: uvicorn.Config, forked_at: float, report_fd: int):
+        super().__init__(config)
+        self.forked_at = forked_at
+        self.report_fd = report_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        report = {"pid": os.getpid(), "startup_ms": round((time.perf_counter() - self.forked_at) * 1000, 1)}
+        try:
+            os.write(self.report_fd, (json.dumps(report) + "\n").encode())
+        except BlockingIOError:
+            pass  # Nobody is reading (a restarted worker); the report is best effort
+
+
+class Launcher:
+    """Forks and supervises uvicorn workers sharing one listening socket."""
+
+    def __init__(self, host: str, port: int, workers: int, preload_app: bool):
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.preload_app = preload_app
+        self.children: Dict[int, float] = {}  # pid -> fork time
+        self.stopping = False
+        self.crashes = 0  # Workers in a row that exited before worker_stable_after
+        self.failed = False
+        self._sock: Optional[socket.socket] = None
+        self._report_r, self._report_w = os.pipe()
+        os.set_blocking(self._report_w, False)
+
+    def run(self):
+        launch_started = time.perf_counter()
+        if self.preload_app:
+            preload()
+        self._sock = bind_socket(self.host, self.port)
+        print(f"🚀 Starting {settings.app_name} with {self.workers} worker(s) on http://{self.host}:{self.port}")
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for _ in range(self.workers):
+            self._spawn()
+        self._report_startup(launch_started)
+        self._supervise()
+        if self.failed:
+            sys.exit(1)
+
+    # Workers
+    def _spawn(self):
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(forked_at)
+        self.children[pid] = forked_at
+
+    def _run_worker(self, forked_at: float):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.close(self._report_r)
+        code = 0
+        try:
+            # Without preload each worker imports (and loads) the app itself
+            from main import app
+            config = uvicorn.Config(app, proxy_headers=True, forwarded_allow_ips=settings.forwarded_allow_ips)
+            server = _ReportingServer(config, forked_at, self._report_w)
+            server.run(sockets=[self._sock])
+        except BaseException as e:  # Never let a worker fall back into the supervisor loop
+            print(f"Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _report_startup(self, launch_started: float):
+        """Wait for every worker to listen, then log startup time and memory per worker."""
+        pending = self.workers
+        buffer = b""
+        deadline = time.monotonic() + 60
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self._report_r], [], [], remaining)[0]:
+                print(f"{pending} worker(s) did not report startup")
+                break
+            chunk = os.read(self._report_r, 4096)
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                report = json.loads(line)
+                pending -= 1
+                print(f"Worker {report['pid']}: ready in {report['startup_ms']} ms, memory {self._format(memory_usage(report['pid']))}")
+        print(
+            f"Launcher {os.getpid()}: memory {self._format(memory_usage(os.getpid()))}; "
+            f"all workers ready in {(time.perf_counter() - launch_started) * 1000:.0f} ms"
+        )
+
+    @staticmethod
+    def _format(usage: Dict[str, int]) -> str:
+        return ", ".join(f"{key} {value / 1024:.1f} MiB" for key, value in usage.items()) or "n/a"
+
+    # Supervision
+    def _supervise(self):
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            if pid not in self.children:
+                continue
+            lived = time.perf_counter() - self.children.pop(pid)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                continue
+            self.crashes = 1 if lived >= settings.worker_stable_after else self.crashes + 1
+            if self.crashes > settings.worker_max_crashes:
+                print(f"Worker {pid} exited with {code}; {self.crashes} early exits in a row, giving up")
+                self.failed = True
+                self._handle_stop(signal.SIGTERM, None)
+                continue
+            delay = min(settings.worker_restart_backoff * 2 ** (self.crashes - 1), settings.worker_restart_backoff_max)
+            print(f"Worker {pid} exited with {code} after {lived:.1f} s; restarting in {delay:.1f} s")
+            self._wait(delay)
+            if not self.stopping:
+                self._spawn()
+        print("Launcher stopped")
+
+    def _wait(self, seconds: float):
+        # Short sleeps, so a stop signal during the backoff is acted on promptly
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(max(0.0, min(0.1, deadline - time.monotonic())))
+
+    def _handle_stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run the app with preloaded, forked uvicorn workers.")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", settings.port)))
+    parser.add_argument("--workers", type=int, default=settings.workers)
+    parser.add_argument("--no-preload", action="store_true", help="Let each worker load the app itself")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and settings.rate_limit_backend != "sqlite":
+        # Per-worker buckets would multiply login attempts and accept a TOTP code once per worker
+        parser.error("more than one worker needs RATE_LIMIT_BACKEND=sqlite")
+
+    if not hasattr(os, "fork"):
+        # No fork (Windows): plain uvicorn, each worker loads its own copy
+        uvicorn.run(
+            "main:app", host=args.host, port=args.port, workers=args.workers,
+            proxy_headers=True, forwarded_allow_ips=settings.forwarded_allow_ips
+        )
+        return
+
+    Launcher(args.host, args.port, args.workers, settings.preload and not args.no_preload).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Memory introspection: deep sizes of the catalog, caches and template
+environments, and a tracemalloc leak check across ``refresh_data()``.
+
+Sizes come from walking each component's object graph with
+``sys.getsizeof``. Modules, classes and other components are never entered,
+and objects already counted for the catalog are excluded from the caches
+and indexes built on top of it (including the snapshot's own lookups), so
+each figure is what that component adds.
+
+``leak_check()`` snapshots tracemalloc after one settling refresh and again
+after N more, on a private catalog service without listeners, and reports
+the growth by source line. A steady growth per
+refresh points at state that is never released.
+
+Everything returns plain JSON-ready dicts, for ``/admin/api/memory``, the
+CLI and the benchmark suite::
+
+    python -m app.core.memory [--leak-check N] [--top K] [--no-warm-up]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+import types
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_NEVER_ENTER = (type, types.ModuleType, types.BuiltinFunctionType, types.MethodType, types.FrameType)
+
+
+def deep_size(root: Any, seen: Optional[Set[int]] = None) -> Dict[str, int]:
+    """Bytes and object count reachable from ``root`` and not already in ``seen`` (which is updated)."""
+    seen = set() if seen is None else seen
+    total = 0
+    objects = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _NEVER_ENTER):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        objects += 1
+
+        if isinstance(obj, _ATOMIC):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif isinstance(obj, types.FunctionType):
+            # The compiled code, but not the module globals or closures it refers to
+            stack.append(obj.__code__)
+        elif isinstance(obj, types.CodeType):
+            stack.extend(obj.co_consts)
+        else:
+            attributes = getattr(obj, "__dict__", None)
+            if isinstance(attributes, dict):
+                stack.append(attributes)
+            for slot in _slots(type(obj)):
+                try:
+                    stack.append(object.__getattribute__(obj, slot))
+                except AttributeError:
+                    pass
+    return {"bytes": total, "objects": objects}
+
+
+def _slots(cls: type) -> Iterable[str]:
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            if slot not in ("__dict__", "__weakref__"):
+                yield slot
+
+
+def memory_report() -> Dict[str, Any]:
+    """Deep sizes per component for this process, plus process-level memory."""
+    from app.core import security
+    from app.core.launcher import memory_usage
+    from app.core.response_cache import response_cache
+    from app.core.templates import template_manager
+    from app.services.analytics import view_counter
+    from app.services.article_content import content_renderer
+    from app.services.article_store import article_store
+    from app.services.chat import chat_engine
+    from app.services.feed_service import feed_service
+    from app.services.portfolio_service import portfolio_service
+    from app.services.related import related_service
+    from app.services.tag_registry import tag_registry
+    from app.routes import admin
+
+    components = {
+        "related_index": related_service,
+        "feeds": feed_service,
+        "chat_index": chat_engine._index,
+        "chat_answers": chat_engine._cache,
+        "rendered_content": content_renderer._memory,
+        "tag_registry": tag_registry,
+        "response_cache": response_cache._entries,
+        "view_counter": view_counter,
+        "token_cache": security.token_cache,
+    }
+    environments = {
+        "site": template_manager._templates.env if template_manager._templates is not None else None,
+        "admin": admin.templates.env,
+    }
+    # Shared roots are never attributed to the component that happens to reach them
+    snapshot = portfolio_service._snapshot
+    boundary = {id(portfolio_service), id(article_store), id(settings)}
+    boundary.update(id(obj) for obj in components.values())
+    boundary.update(id(env) for env in environments.values())
+
+    catalog_seen = set(boundary)
+    catalog = deep_size(snapshot.data if snapshot is not None else None, catalog_seen)
+    articles = len(snapshot.data.articles) if snapshot is not None else 0
+    catalog["per_article"] = catalog["bytes"] // articles if articles else 0
+    # The snapshot's id maps, category groups and featured lists, beyond the data itself
+    snapshot_indexes = deep_size(snapshot, set(catalog_seen))
+
+    derived = {}
+    for name, root in components.items():
+        seen = set(catalog_seen) - {id(root)}
+        derived[name] = deep_size(root, seen) if root is not None else {"bytes": 0, "objects": 0}
+
+    templates = {}
+    for name, env in environments.items():
+        if env is None:
+            templates[name] = {"bytes": 0, "objects": 0, "templates": 0}
+            continue
+        seen = set(boundary) - {id(env)}
+        templates[name] = {**deep_size(env, seen), "templates": len(env.cache or {})}
+
+    total = (
+        catalog["bytes"]
+        + snapshot_indexes["bytes"]
+        + sum(c["bytes"] for c in derived.values())
+        + sum(t["bytes"] for t in templates.values())
+    )
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (None, None)
+    return {
+        "pid": os.getpid(),
+        "generation": portfolio_service.generation,
+        "articles": articles,
+        "process_kib": memory_usage(os.getpid()),
+        "tracemalloc": {"tracing": tracing, "current_bytes": current, "peak_bytes": peak},
+        "catalog": catalog,
+        "snapshot_indexes": snapshot_indexes,
+        "derived": derived,
+        "templates": templates,
+        "total_bytes": total,
+    }
+
+
+def leak_check(refreshes: int = 3, top: int = 10, service: Optional[Any] = None) -> Dict[str, Any]:
+    """Growth of traced memory over ``refreshes`` calls to ``refresh_data()``.
+
+    The refreshes run on a private ``OptimizedPortfolioService`` with no
+    listeners, so the live catalog is not replaced and nothing downstream
+    (cache purges, response cache re-warming, feed/related/chat rebuilds)
+    is triggered; the refreshes are not broadcast to other workers either.
+    """
+    from app.services.portfolio_service import OptimizedPortfolioService
+
+    service = service or OptimizedPortfolioService()
+
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(settings.memory_trace_frames)
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ]
+    try:
+        # One settling refresh: the first after startup may fill caches for good
+        service.refresh_data(broadcast=False)
+        gc.collect()
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        for _ in range(refreshes):
+            service.refresh_data(broadcast=False)
+        gc.collect()
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    stats = after.compare_to(before, "lineno")
+    growth = sum(stat.size_diff for stat in stats)
+    per_refresh = growth // refreshes if refreshes else 0
+    return {
+        "refreshes": refreshes,
+        "growth_bytes": growth,
+        "growth_per_refresh": per_refresh,
+        "threshold_per_refresh": settings.memory_leak_threshold_bytes,
+        "suspected_leak": per_refresh > settings.memory_leak_threshold_bytes,
+        "top": [
+            {
+                "where": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_diff": stat.size_diff,
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[:top] if stat.size_diff
+        ],
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Report memory use of the catalog, caches and templates as JSON.")
+    parser.add_argument("--leak-check", type=int, default=0, metavar="N", help="Also diff tracemalloc across N refreshes")
+    parser.add_argument("--top", type=int, default=10, help="Source lines listed in the leak check")
+    parser.add_argument("--no-warm-up", action="store_true", help="Skip loading the catalog and building indexes first")
+    args = parser.parse_args(argv)
+
+    if not args.no_warm_up:
+        from app.core.startup import startup_state, warm_up
+        warm_up(startup_state)
+    report = memory_report()
+    if args.leak_check:
+        report["leak_check"] = leak_check(args.leak_check, args.top)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
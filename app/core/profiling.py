@@ -0,0 +1,287 @@
+"""
+On-demand sampling profiler, per-request phase timings and a slow-request log.
+
+- ``SamplingProfiler`` samples every busy thread's stack from a background
+  thread (``sys._current_frames()`` every ``profile_sample_interval``
+  seconds) for a number of seconds or requests, and exports the aggregate
+  as collapsed stacks (``frame;frame;frame count``), the input format of
+  flamegraph.pl and speedscope. Nothing is sampled unless a profile runs.
+- ``phase()`` / ``record_phase()`` add time to named phases of the current
+  request (``context`` in ``ContextBuilder``, ``render`` in the template
+  manager, ``endpoint`` in ``TimedRoute``). Outside a request they do nothing.
+- ``ProfilingMiddleware`` times each request, derives ``serialize`` (endpoint
+  return to first byte) and ``send`` (first byte to last, including
+  ``compress``), and keeps the slowest recent requests
+  (over ``slow_request_threshold_ms``) in a bounded ring buffer.
+"""
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class RequestTimings:
+    """Milliseconds spent per named phase of one request."""
+
+    __slots__ = ("phases", "active")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.active: set = set()
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_phase(name: str, ms: float):
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.phases[name] = timings.phases.get(name, 0.0) + ms
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as part of phase ``name``; nested blocks of the same phase count once."""
+    timings = _current_timings.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.phases[name] = timings.phases.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of ``phase()``."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            with phase("endpoint"):
+                return await endpoint(*args, **kwargs)
+        return async_wrapper
+    return timed("endpoint")(endpoint)
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records the endpoint's own run time as the ``endpoint`` phase.
+
+    Whatever happens between the endpoint returning and the first byte going
+    out (response model validation, JSON encoding) is reported as ``serialize``.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+
+class SlowRequestLog:
+    """Ring buffer of recent requests slower than a threshold."""
+
+    def __init__(self, size: Optional[int] = None, threshold_ms: Optional[float] = None):
+        self.threshold_ms = settings.slow_request_threshold_ms if threshold_ms is None else threshold_ms
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=size or settings.slow_request_log_size)
+        self.seen = 0
+
+    def add(self, entry: Dict[str, Any]):
+        self.seen += 1
+        if entry["ms"] >= self.threshold_ms:
+            self.entries.append(entry)
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return sorted(list(self.entries), key=lambda e: e["ms"], reverse=True)[:limit]
+
+
+class SamplingProfiler:
+    """Samples all thread stacks for a number of seconds or requests."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = settings.profile_sample_interval if interval is None else interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.requests = 0
+        self.max_requests: Optional[int] = None
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, requests: Optional[int] = None) -> bool:
+        """Start a new profile (discarding the last one); False if one is running."""
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.samples = 0
+            self.requests = 0
+            self.max_requests = requests
+            self.started_at = time.monotonic()
+            self.stopped_at = None
+            self.deadline = self.started_at + seconds
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+
+    def request_finished(self):
+        if self.max_requests is not None and self.running:
+            self.requests += 1
+            if self.requests >= self.max_requests:
+                self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        end = self.stopped_at or time.monotonic()
+        return {
+            "running": self.running,
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+            "requests": self.requests,
+            "max_requests": self.max_requests,
+            "interval_ms": self.interval * 1000,
+            "elapsed_s": round(end - self.started_at, 2) if self.started_at is not None else None,
+        }
+
+    def collapsed(self) -> str:
+        """Aggregated stacks in collapsed format, root frame first."""
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def _run(self):
+        own = threading.get_ident()
+        try:
+            while not self._stop.is_set() and time.monotonic() < self.deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                sampled = [
+                    self._collapse(names.get(ident, str(ident)), frame)
+                    for ident, frame in sys._current_frames().items()
+                    if ident != own and not _idle(frame)
+                ]
+                with self._lock:
+                    self.stacks.update(sampled)
+                    self.samples += 1
+                self._stop.wait(self.interval)
+        finally:
+            self.stopped_at = time.monotonic()
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            frames.append(label)
+            frame = frame.f_back
+        frames.append(thread_name.replace(" ", "_"))
+        return ";".join(reversed(frames))
+
+
+# Leaf frames of threads that are blocked waiting for work, not doing any
+_IDLE_LEAVES = {
+    ("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker"),
+}
+
+
+def _idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+def _short_path(filename: str) -> str:
+    marker = f"site-packages{os.sep}"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    try:
+        return os.path.relpath(filename)
+    except ValueError:
+        return filename
+
+
+class ProfilingMiddleware:
+    """Times every HTTP request by phase and feeds the slow-request log and profiler."""
+
+    def __init__(self, app: ASGIApp, log: Optional[SlowRequestLog] = None, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.log = log or slow_request_log
+        self.profiler = profiler or sampling_profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        started = time.perf_counter()
+        first_byte: Optional[float] = None
+        status = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal first_byte, status
+            if message["type"] == "http.response.start":
+                first_byte = time.perf_counter()
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timings.reset(token)
+            finished = time.perf_counter()
+            phases = {name: round(ms, 2) for name, ms in timings.phases.items()}
+            if first_byte is not None:
+                ttfb = (first_byte - started) * 1000
+                if "endpoint" in timings.phases:
+                    phases["serialize"] = round(max(0.0, ttfb - timings.phases["endpoint"]), 2)
+                phases["send"] = round((finished - first_byte) * 1000, 2)
+            self.log.add({
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "ms": round((finished - started) * 1000, 2),
+                "ttfb_ms": round((first_byte - started) * 1000, 2) if first_byte is not None else None,
+                "phases": phases,
+                "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            })
+            self.profiler.request_finished()
+
+
+# Global profiling instances
+slow_request_log = SlowRequestLog()
+sampling_profiler = SamplingProfiler()
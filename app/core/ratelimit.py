@@ -0,0 +1,222 @@
+"""
+Token-bucket rate limiting and one-time-use key tracking.
+
+Both features sit on a small backend interface so a single worker can keep
+state in process memory while multi-worker deployments point every worker at
+a shared store (``rate_limit_backend = "sqlite"`` in Settings).
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+
+class RateLimitBackend:
+    """Storage interface for token buckets and one-time keys."""
+
+    # Whether calls may wait on I/O or other processes; async callers then use a worker thread
+    blocking = False
+
+    def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> float:
+        """Try to remove ``cost`` tokens from the bucket at ``key``.
+
+        Returns 0.0 when allowed, otherwise the seconds until enough tokens
+        will have refilled.
+        """
+        raise NotImplementedError
+
+    def add_once(self, key: str, ttl: float) -> bool:
+        """Record ``key`` for ``ttl`` seconds; False if it was already recorded."""
+        raise NotImplementedError
+
+    async def take_async(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> float:
+        """``take()`` for the event loop: blocking backends run in a worker thread."""
+        if not self.blocking:
+            return self.take(key, capacity, refill_per_second, cost)
+        return await asyncio.to_thread(self.take, key, capacity, refill_per_second, cost)
+
+    async def add_once_async(self, key: str, ttl: float) -> bool:
+        """``add_once()`` for the event loop: blocking backends run in a worker thread."""
+        if not self.blocking:
+            return self.add_once(key, ttl)
+        return await asyncio.to_thread(self.add_once, key, ttl)
+
+    @staticmethod
+    def _refill(
+        tokens: float,
+        updated: float,
+        now: float,
+        capacity: float,
+        refill_per_second: float
+    ) -> float:
+        return min(capacity, tokens + (now - updated) * refill_per_second)
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process backend with LRU eviction to bound memory.
+
+    Evicting a bucket forgets its debt, so ``max_keys`` should comfortably
+    exceed the number of clients active within one refill window.
+    """
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            tokens = self._refill(bucket[0], bucket[1], now, capacity, refill_per_second)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0.0
+            bucket[0] = tokens
+            return (cost - tokens) / refill_per_second if refill_per_second > 0 else float("inf")
+
+    def add_once(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            # TTLs are uniform per caller, so insertion order approximates expiry order
+            while self._seen:
+                oldest_key, expires = next(iter(self._seen.items()))
+                if expires > now and len(self._seen) < self.max_keys:
+                    break
+                del self._seen[oldest_key]
+
+            expires = self._seen.get(key)
+            if expires is not None and expires > now:
+                return False
+            self._seen[key] = now + ttl
+            self._seen.move_to_end(key)
+            return True
+
+
+class SQLiteBackend(RateLimitBackend):
+    """Backend shared by all workers on one host through a SQLite file.
+
+    A write can wait up to 5 s on another worker's lock, so async callers go
+    through ``take_async()`` / ``add_once_async()``.
+    """
+
+    blocking = True
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, expires REAL)"
+        )
+        self._lock = threading.Lock()
+        self._ops = 0
+
+    def take(self, key: str, capacity: float, refill_per_second: float, cost: float = 1.0) -> float:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens = capacity if row is None else self._refill(row[0], row[1], now, capacity, refill_per_second)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                self._maybe_prune(now, capacity, refill_per_second)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if allowed:
+            return 0.0
+        return (cost - tokens) / refill_per_second if refill_per_second > 0 else float("inf")
+
+    def add_once(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM seen WHERE key = ? AND expires <= ?", (key, now))
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen (key, expires) VALUES (?, ?)", (key, now + ttl)
+                ).rowcount == 1
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def _maybe_prune(self, now: float, capacity: float, refill_per_second: float):
+        """Drop buckets that have fully refilled and expired one-time keys."""
+        self._ops += 1
+        if self._ops % self._PRUNE_EVERY:
+            return
+        if refill_per_second > 0:
+            self._conn.execute(
+                "DELETE FROM buckets WHERE updated < ?", (now - capacity / refill_per_second,)
+            )
+        self._conn.execute("DELETE FROM seen WHERE expires <= ?", (now,))
+
+
+class TokenBucketLimiter:
+    """Allows ``capacity`` hits per ``period`` seconds per key, refilling continuously."""
+
+    def __init__(self, name: str, capacity: float, period: float, backend: Optional[RateLimitBackend] = None):
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_second = self.capacity / period if period > 0 else 0.0
+        self._backend = backend
+
+    @property
+    def backend(self) -> RateLimitBackend:
+        return self._backend or get_rate_limit_backend()
+
+    def hit(self, key: str, cost: float = 1.0) -> float:
+        """Consume ``cost`` for ``key``; returns 0.0 if allowed, else the retry-after seconds."""
+        return self.backend.take(f"{self.name}:{key}", self.capacity, self.refill_per_second, cost)
+
+    async def hit_async(self, key: str, cost: float = 1.0) -> float:
+        """``hit()`` without blocking the event loop on a shared backend."""
+        return await self.backend.take_async(f"{self.name}:{key}", self.capacity, self.refill_per_second, cost)
+
+
+_backend: Optional[RateLimitBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    """Return the process-wide backend configured in Settings."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.rate_limit_backend == "sqlite":
+                    _backend = SQLiteBackend(settings.rate_limit_db_path)
+                else:
+                    _backend = MemoryBackend(max_keys=settings.rate_limit_max_keys)
+    return _backend
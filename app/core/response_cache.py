@@ -0,0 +1,246 @@
+"""
+In-process cache of rendered GET responses.
+
+Pages and JSON listings under ``response_cache_paths`` are stored after the
+first render, keyed by path and query string. An entry is served while the
+catalog generation it was rendered from is current and it is younger than
+``response_cache_ttl`` (view-based content such as "Most Viewed" changes
+without a new generation). Bodies are bounded by ``response_cache_max_bytes``,
+least recently used out first.
+
+The middleware sits just above surrogate-key tagging, so cached headers
+carry the keys, while compression, CORS and view counting still run on
+hits; a hit puts the matched endpoint back into the scope for the route
+counters. ``render()`` fills an entry without a client request, for
+the cache warmer.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.portfolio_service import portfolio_service
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    generation: int
+    created: float
+    endpoint: Optional[Callable] = None
+    path_params: Dict[str, Any] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """LRU of complete GET responses, invalidated by catalog generation and age."""
+
+    def __init__(
+        self,
+        paths: Optional[List[str]] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.paths = tuple(paths if paths is not None else settings.response_cache_paths)
+        self.ttl = settings.response_cache_ttl if ttl is None else ttl
+        self.max_bytes = settings.response_cache_max_bytes if max_bytes is None else max_bytes
+        self.enabled = settings.response_cache_enabled if enabled is None else enabled
+        self.app: Optional[ASGIApp] = None  # The app below the middleware, used by render()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(path: str, query_string: bytes = b"") -> str:
+        return f"{path}?{query_string.decode('latin-1')}" if query_string else path
+
+    def cacheable(self, path: str) -> bool:
+        return self.enabled and any(path == p or path.startswith(p + "/") for p in self.paths)
+
+    def get(self, key: str, generation: int) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._fresh(entry, generation):
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def is_fresh(self, key: str, generation: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and self._fresh(entry, generation)
+
+    def put(self, key: str, entry: CachedResponse):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def evict_stale(self, generation: int) -> int:
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if not self._fresh(entry, generation)]
+            for key in stale:
+                self._drop(key)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+    async def render(self, app: ASGIApp, path: str, query: str = "") -> bool:
+        """Render ``path`` through the app below the cache and store it; True if stored."""
+        if self.app is None or not self.cacheable(path):
+            return False
+        query_string = query.encode("latin-1")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "root_path": "",
+            "query_string": query_string,
+            "headers": [(b"host", b"localhost")],
+            "client": None,
+            "server": None,
+            "app": app,
+        }
+
+        request_sent = False
+        finished = asyncio.Event()
+
+        async def receive() -> Message:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Streaming responses listen for a disconnect until they finish
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def discard(message: Message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished.set()
+
+        key = self.key(path, query_string)
+        generation = portfolio_service.generation
+        try:
+            await self.store_through(self.app, scope, receive, discard, key, generation)
+        finally:
+            finished.set()
+        return self.is_fresh(key, generation)
+
+    async def store_through(
+        self, app: ASGIApp, scope: Scope, receive: Receive, send: Send, key: str, generation: int
+    ):
+        """Run the app, passing the response on to ``send`` and caching it if it is a plain 200."""
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def send_wrapper(message: Message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Copy now: outer middleware (compression) edits the headers in place
+                start = {"status": message["status"], "headers": list(message.get("headers", []))}
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and self._storable(start):
+                    self.put(key, CachedResponse(
+                        status=start["status"],
+                        headers=start["headers"],
+                        body=b"".join(chunks),
+                        generation=generation,
+                        created=time.monotonic(),
+                        endpoint=scope.get("endpoint"),
+                        path_params=dict(scope.get("path_params", {}))
+                    ))
+            await send(message)
+
+        await app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _storable(start: Message) -> bool:
+        if start["status"] != 200:
+            return False
+        for name, value in start.get("headers", []):
+            name = name.lower()
+            if name == b"set-cookie" or (name == b"cache-control" and (b"no-store" in value or b"private" in value)):
+                return False
+        return True
+
+    def _fresh(self, entry: CachedResponse, generation: int) -> bool:
+        return entry.generation == generation and time.monotonic() - entry.created < self.ttl
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+
+class ResponseCacheMiddleware:
+    """Serves cacheable GET requests from ``response_cache``."""
+
+    def __init__(self, app: ASGIApp, cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+        self.cache.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.cacheable(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache.key(scope["path"], scope.get("query_string", b""))
+        generation = portfolio_service.generation
+        entry = self.cache.get(key, generation)
+        if entry is None:
+            await self.cache.store_through(self.app, scope, receive, send, key, generation)
+            return
+
+        scope["endpoint"] = entry.endpoint
+        scope["path_params"] = entry.path_params
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": entry.headers + [(b"x-cache", b"HIT")],
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+
+# Global response cache instance
+response_cache = ResponseCache()
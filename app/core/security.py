@@ -1,11 +1,24 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from collections import OrderedDict
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_HMAC_ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -21,3 +34,120 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of already-verified tokens, keyed by a hash of the token.
+
+    Entries carry the token's ``exp`` and are dropped once it passes, so a
+    cache hit never extends a token's lifetime.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[str]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            subject, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return subject
+
+    def put(self, token: str, subject: str, expires_at: float):
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (subject, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(maxsize=settings.token_cache_size)
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_hmac(token: str) -> dict:
+    """Verify an HS* token with the standard library only.
+
+    Avoids python-jose's generic key handling for the common case of a
+    shared-secret token. Checks the same things jose does for our tokens:
+    algorithm, signature, ``exp`` and ``nbf``.
+    """
+    digestmod = _HMAC_ALGORITHMS[settings.algorithm]
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+    except ValueError as e:
+        raise JWTError(f"Malformed token: {e}")
+
+    if header.get("alg") != settings.algorithm:
+        raise JWTError("The specified alg value is not allowed")
+
+    expected = hmac.new(
+        settings.secret_key.encode("utf-8"),
+        f"{header_b64}.{payload_b64}".encode("ascii"),
+        digestmod
+    ).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise JWTError("Signature verification failed.")
+
+    try:
+        payload = json.loads(_b64url_decode(payload_b64))
+    except ValueError as e:
+        raise JWTError(f"Invalid payload: {e}")
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTError("Expiration Time claim (exp) must be an integer.")
+        if exp <= now:
+            raise JWTError("Signature has expired.")
+    nbf = payload.get("nbf")
+    if isinstance(nbf, (int, float)) and nbf > now:
+        raise JWTError("The token is not yet valid (nbf)")
+    return payload
+
+
+def decode_access_token(token: str) -> dict:
+    """Verify a token with the configured backend and return its claims."""
+    if settings.jwt_backend == "hmac" and settings.algorithm in _HMAC_ALGORITHMS:
+        return _decode_hmac(token)
+    return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+
+def verify_access_token(token: str) -> Optional[str]:
+    """Return the token's subject, verifying it only on a cache miss.
+
+    Raises JWTError for invalid tokens; failures are never cached.
+    """
+    subject = token_cache.get(token)
+    if subject is not None:
+        return subject
+
+    payload = decode_access_token(token)
+    subject = payload.get("sub")
+    exp = payload.get("exp")
+    if subject is not None and isinstance(exp, (int, float)):
+        token_cache.put(token, subject, float(exp))
+    return subject
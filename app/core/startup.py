@@ -0,0 +1,230 @@
+"""
+Deferred startup: warm-up steps, readiness and the warm-up gate.
+
+Importing the app does no data work; the portfolio catalog, templates and
+indexes are built on first use. When the server starts, the lifespan runs
+the same steps in a background thread so the port is bound immediately and
+``/api/health`` answers during warm-up, while ``/api/ready`` reports progress
+and returns 503 until everything is loaded.
+
+Requests that need data and arrive mid warm-up wait (without blocking the
+event loop) for at most ``warmup_wait_timeout`` seconds, then get a 503
+with ``Retry-After``. The production launcher runs ``warm_up()`` before
+forking, so its workers start out ready.
+"""
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Paths served without waiting for warm-up
+_UNGATED_PREFIXES = ("/api/health", "/api/ready", "/static", "/assets")
+
+
+def _load_catalog():
+    from app.services.portfolio_service import portfolio_service
+    portfolio_service.ensure_loaded()
+
+
+def _load_views():
+    from app.services.analytics import view_counter
+    view_counter.refresh()
+
+
+def _compile_templates():
+    from app.core.templates import template_manager
+    template_manager.preload()
+
+
+def _build_feeds():
+    from app.services.feed_service import feed_service
+    feed_service.documents()
+
+
+def _load_tags():
+    from app.services.tag_registry import tag_registry
+    tag_registry.load()
+
+
+def _build_related():
+    from app.services.related import related_service
+    related_service.warm()
+
+
+def _build_chat_index():
+    from app.services.chat import chat_engine
+    chat_engine.index()
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("catalog", _load_catalog),
+    ("views", _load_views),
+    ("templates", _compile_templates),
+    ("feeds", _build_feeds),
+    ("tags", _load_tags),
+    ("related", _build_related),
+    ("chat", _build_chat_index),
+]
+
+
+class StartupState:
+    """Progress of the warm-up, as reported by ``/api/ready``."""
+
+    def __init__(self):
+        self.state = "idle"  # idle | warming | ready | failed
+        self.current: Optional[str] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._ready_event: Optional[asyncio.Event] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def as_dict(self) -> Dict[str, Any]:
+        from app.services.portfolio_service import portfolio_service
+
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round(((self.finished_at or time.perf_counter()) - self.started_at) * 1000, 1)
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "current_step": self.current,
+            "steps": self.steps,
+            "catalog": portfolio_service.load_progress,
+            "elapsed_ms": elapsed,
+            "error": self.error,
+        }
+
+    async def wait_ready(self, timeout: float) -> bool:
+        if self._ready_event is None or self.state != "warming":
+            return self.state != "warming"
+        try:
+            await asyncio.wait_for(self._ready_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+def warm_up(state: Optional["StartupState"] = None):
+    """Run every warm-up step in order (blocking), recording progress in ``state``."""
+    state = state or startup_state
+    state.state = "warming"
+    state.started_at = time.perf_counter()
+    state.steps = {name: {"status": "pending"} for name, _ in WARMUP_STEPS}
+    try:
+        for name, step in WARMUP_STEPS:
+            state.current = name
+            state.steps[name]["status"] = "running"
+            step_started = time.perf_counter()
+            step()
+            state.steps[name] = {"status": "done", "ms": round((time.perf_counter() - step_started) * 1000, 1)}
+        state.state = "ready"
+    except Exception as e:
+        state.state = "failed"
+        state.error = str(e)
+        print(f"Warm-up failed during {state.current}: {e}")
+    finally:
+        state.current = None
+        state.finished_at = time.perf_counter()
+
+
+async def _warm_up_in_background(state: "StartupState"):
+    try:
+        await asyncio.to_thread(warm_up, state)
+    finally:
+        if state._ready_event is not None:
+            state._ready_event.set()
+
+
+async def _flush_views_periodically(interval: float):
+    from app.services.analytics import view_counter
+
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(view_counter.sync)
+
+
+async def _follow_refresh_signal(interval: float):
+    from app.services.portfolio_service import portfolio_service
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(portfolio_service.sync_with_signal)
+        except Exception as e:
+            print(f"Catalog reload after an external refresh failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the warm-up in the background unless it already ran (e.g. preloaded by the launcher).
+
+    Also runs the response cache warmer, the write-behind flush of view
+    counts (with a final flush on shutdown) and the poll of the refresh
+    signal that reloads the catalog after another process changed it.
+    """
+    from app.services.analytics import view_counter
+    from app.services.cache_warmer import cache_warmer
+
+    state = startup_state
+    task = None
+    if settings.background_warmup and state.state == "idle":
+        state.state = "warming"
+        state._ready_event = asyncio.Event()
+        task = asyncio.create_task(_warm_up_in_background(state))
+    flusher = asyncio.create_task(_flush_views_periodically(settings.analytics_flush_interval)) if view_counter.enabled else None
+    warmer = cache_warmer.start(app)
+    follower = asyncio.create_task(_follow_refresh_signal(settings.refresh_poll_interval)) if settings.refresh_poll_interval > 0 else None
+    yield
+    if warmer is not None:
+        warmer.cancel()
+    if follower is not None:
+        follower.cancel()
+    if task is not None and not task.done():
+        # The worker thread can't be interrupted; just stop waiting for it
+        task.cancel()
+    if flusher is not None:
+        flusher.cancel()
+        view_counter.flush()
+
+
+class WarmupGateMiddleware:
+    """Holds data-dependent requests until warm-up finishes, or answers 503."""
+
+    def __init__(self, app, timeout: Optional[float] = None, state: Optional[StartupState] = None):
+        self.app = app
+        self.timeout = settings.warmup_wait_timeout if timeout is None else timeout
+        self.state = state or startup_state
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or self.state.state != "warming"
+            or scope["path"].startswith(_UNGATED_PREFIXES)
+            or await self.state.wait_ready(self.timeout)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Warming up", **self.state.as_dict()}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", b"1"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global startup state
+startup_state = StartupState()
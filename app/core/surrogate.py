@@ -0,0 +1,152 @@
+"""
+Surrogate keys: tags on responses that let a CDN or reverse proxy purge
+exactly the cached URLs a catalog change affects.
+
+Routes and context builders call ``tag()`` / ``tag_articles()`` /
+``tag_projects()`` with the items and facets a response contains, and
+``SurrogateKeyMiddleware`` sends them in the ``surrogate_key_header``
+(space-separated, as Fastly and Varnish xkey expect). The vocabulary:
+
+- ``article:<id>`` / ``project:<id>``: the item appears in the response
+- ``articles`` / ``projects``: an unfiltered listing (which items appear,
+  or their order, can change with any membership change)
+- ``category:<slug>``: a listing of one article category
+- ``featured``: featured items
+- ``articles:any``: depends on every article (feeds, sitemaps, and lists
+  too long to tag item by item, see ``surrogate_max_keys``)
+- ``all``: every response, purged by a full reload
+
+``changed_keys()`` turns a ``CatalogChange`` into the keys to purge: an
+edited article purges its own key and ``articles:any``; creating, deleting,
+moving, re-dating, re-tagging or (un)featuring one also purges the listings
+it enters or leaves.
+"""
+from contextvars import ContextVar
+from typing import Iterable, Optional, Set
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.utils import slugify
+from app.services.portfolio_service import CatalogChange, CatalogSnapshot
+
+ALL = "all"
+ANY_ARTICLE = "articles:any"
+ANY_PROJECT = "projects:any"
+
+_current_keys: ContextVar[Optional[Set[str]]] = ContextVar("surrogate_keys", default=None)
+
+# Paths never tagged: private or uncacheable
+_UNTAGGED_PREFIXES = ("/admin", "/api/chat", "/api/health", "/api/ready")
+
+
+def tag(*keys: str):
+    """Add keys to the current response; outside a request this does nothing."""
+    current = _current_keys.get()
+    if current is not None:
+        current.update(keys)
+
+
+def tag_articles(articles: Iterable, *keys: str):
+    current = _current_keys.get()
+    if current is not None:
+        current.update(f"article:{article.id}" for article in articles)
+        current.update(keys)
+
+
+def tag_projects(projects: Iterable, *keys: str):
+    current = _current_keys.get()
+    if current is not None:
+        current.update(f"project:{project.id}" for project in projects)
+        current.update(keys)
+
+
+def category_key(category: str) -> str:
+    return f"category:{slugify(category)}"
+
+
+def header_value(keys: Set[str], max_keys: Optional[int] = None) -> str:
+    """Keys for the header; past ``max_keys``, item keys collapse into ``articles:any`` / ``projects:any``."""
+    max_keys = max_keys or settings.surrogate_max_keys
+    keys = set(keys) | {ALL}
+    if len(keys) > max_keys:
+        collapsed = set()
+        for key in keys:
+            if key.startswith("article:"):
+                collapsed.add(ANY_ARTICLE)
+            elif key.startswith("project:"):
+                collapsed.add(ANY_PROJECT)
+            else:
+                collapsed.add(key)
+        keys = collapsed
+    return " ".join(sorted(keys))
+
+
+def _facets(article) -> tuple:
+    return (slugify(article.category), article.featured, article.published_date, tuple(article.tags))
+
+
+def changed_keys(change: CatalogChange, current: CatalogSnapshot) -> Set[str]:
+    """Surrogate keys whose responses a catalog change makes stale."""
+    previous = change.previous
+    if change.full or previous is None:
+        return {ALL}
+    keys = set()
+    for article_id in set(change.upserted) | set(change.removed):
+        before = previous.get_article_by_id(article_id)
+        after = current.get_article_by_id(article_id)
+        keys.update((f"article:{article_id}", ANY_ARTICLE))
+        if before is not None and after is not None and _facets(before) == _facets(after):
+            continue  # Text edit: only responses showing this article change
+        keys.add("articles")
+        for article in (before, after):
+            if article is not None:
+                keys.add(category_key(article.category))
+                if article.featured:
+                    keys.add("featured")
+    return keys
+
+
+class SurrogateKeyMiddleware:
+    """Collects the keys tagged while handling a GET and sends them as a response header.
+
+    Sits inside the response cache, so cached responses replay their keys.
+    With a purge hook configured, tagged responses also get
+    ``Surrogate-Control: max-age=<surrogate_max_age>``: purges make long
+    CDN lifetimes safe.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = settings.surrogate_key_header.lower().encode("latin-1")
+        self.control = (
+            f"max-age={settings.surrogate_max_age}".encode("latin-1")
+            if settings.surrogate_purge_url and settings.surrogate_max_age > 0 else None
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or not settings.surrogate_keys_enabled
+            or scope["method"] not in ("GET", "HEAD")
+            or scope["path"].startswith(_UNTAGGED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        keys: Set[str] = set()
+        token = _current_keys.set(keys)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 500:
+                headers = list(message.get("headers", []))
+                headers.append((self.header, header_value(keys).encode("latin-1")))
+                if self.control is not None:
+                    headers.append((b"surrogate-control", self.control))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_keys.reset(token)
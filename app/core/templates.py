@@ -1,28 +1,41 @@
 """
 Template utilities and Jinja2 configuration.
 """
+import time
 from pathlib import Path
+from typing import Iterator, Optional
 from fastapi.templating import Jinja2Templates
+from fastapi.responses import StreamingResponse
 from app.core.config import settings
+from app.core.profiling import phase, record_phase
+from app.services.critical_css import critical_css
 
 
 class TemplateManager:
     """Manages Jinja2 templates with custom filters and globals."""
     
     def __init__(self):
-        self.templates = Jinja2Templates(directory=settings.template_dir)
-        self._setup_globals()
-        self._setup_filters()
+        self._templates: Optional[Jinja2Templates] = None
+    
+    @property
+    def templates(self) -> Jinja2Templates:
+        """The Jinja2 environment, created on first use rather than at import."""
+        if self._templates is None:
+            self._templates = Jinja2Templates(directory=settings.template_dir)
+            self._setup_globals()
+            self._setup_filters()
+        return self._templates
     
     def _setup_globals(self):
         """Add global variables available to all templates."""
-        self.templates.env.globals.update({
+        self._templates.env.globals.update({
             'app_name': settings.app_name,
             'contact_email': settings.contact_email,
             'linkedin_url': settings.linkedin_url,
             'github_url': settings.github_url,
             'twitter_url': settings.twitter_url,
             'medium_url': settings.medium_url,
+            'critical_css': critical_css,
         })
     
     def _setup_filters(self):
@@ -40,14 +53,67 @@ class TemplateManager:
                 return text
             return text[:length].strip() + "..."
         
-        self.templates.env.filters.update({
+        self._templates.env.filters.update({
             'format_date': format_date,
             'truncate': truncate_text,
         })
     
-    def render(self, template_name: str, context: dict):
+    def preload(self) -> int:
+        """Compile every template up front (e.g. before forking workers). Returns the count."""
+        names = self.templates.env.list_templates(extensions=["html"])
+        for name in names:
+            self.templates.get_template(name)
+        return len(names)
+    
+    def render(self, template_name: str, context: dict, stream: bool = False):
         """Render a template with the given context."""
-        return self.templates.TemplateResponse(template_name, context)
+        if stream:
+            return self.stream(template_name, context)
+        with phase("render"):
+            return self.templates.TemplateResponse(template_name, context)
+    
+    def render_to_string(self, template_name: str, context: dict) -> str:
+        """Render a template to a string outside of a request/response cycle."""
+        with phase("render"):
+            return self.templates.get_template(template_name).render(context)
+    
+    def stream(
+        self, 
+        template_name: str, 
+        context: dict, 
+        chunk_size: Optional[int] = None
+    ) -> StreamingResponse:
+        """Render a template incrementally so the first bytes go out before the rest is built."""
+        template = self.templates.get_template(template_name)
+        chunks = self._iter_chunks(
+            template.generate(context), 
+            chunk_size or settings.stream_chunk_size
+        )
+        return StreamingResponse(chunks, media_type="text/html")
+    
+    @staticmethod
+    def _iter_chunks(fragments: Iterator[str], chunk_size: int) -> Iterator[bytes]:
+        """Coalesce Jinja's small output fragments into network-sized chunks.
+        
+        Time spent generating (not waiting on the client) counts as the ``render`` phase.
+        """
+        buffer = []
+        buffered = 0
+        started = time.perf_counter()
+        for fragment in fragments:
+            buffer.append(fragment)
+            buffered += len(fragment)
+            if buffered >= chunk_size:
+                chunk = "".join(buffer).encode("utf-8")
+                record_phase("render", (time.perf_counter() - started) * 1000)
+                yield chunk
+                started = time.perf_counter()
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            chunk = "".join(buffer).encode("utf-8")
+            record_phase("render", (time.perf_counter() - started) * 1000)
+            yield chunk
 
 
 # Global template manager instance
@@ -0,0 +1,132 @@
+"""
+Small shared helpers.
+"""
+import ipaddress
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Relative data paths in the settings are relative to the project, not the working directory
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def project_path(value: str) -> Path:
+    """Absolute, resolved path for a setting like ``data_dir`` (absolute values are kept)."""
+    return (PROJECT_ROOT / value).resolve()
+
+
+def slugify(text: str) -> str:
+    """Convert text to a URL/file-system friendly slug."""
+    text = text.lower()
+    text = re.sub(r'[^\w\s-]', '', text)
+    text = re.sub(r'[-\s]+', '-', text)
+    return text.strip('-')
+
+
+def atomic_write_bytes(path: Path, body: bytes):
+    """Write via a temp file in the same directory and rename over the target.
+
+    Readers (other workers, static file servers) never observe a partially
+    written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@lru_cache(maxsize=8)
+def _trusted_proxies(value: str) -> Optional[Tuple[Any, ...]]:
+    """Parsed ``forwarded_allow_ips``; None trusts every peer ("*")."""
+    entries = [entry.strip() for entry in value.split(",") if entry.strip()]
+    if "*" in entries:
+        return None
+    trusted = []
+    for entry in entries:
+        try:
+            trusted.append(ipaddress.ip_network(entry, strict=False))
+        except ValueError:
+            trusted.append(entry)  # A non-IP peer name, e.g. a unix socket
+    return tuple(trusted)
+
+
+def _is_trusted(host: str, trusted: Optional[Tuple[Any, ...]]) -> bool:
+    if trusted is None:
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return host in trusted
+    return any(not isinstance(entry, str) and address in entry for entry in trusted)
+
+
+def client_ip(scope: Dict[str, Any]) -> str:
+    """The client address of an ASGI request, looking through trusted proxies.
+
+    When the peer is one of ``forwarded_allow_ips``, the client is the
+    right-most ``X-Forwarded-For`` hop that is not itself a trusted proxy
+    (hops further left can be forged by the client); with "*" it is the
+    right-most hop. Also correct when the server (uvicorn ``proxy_headers``)
+    has already rewritten the peer from the same header.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else None
+    if not peer:
+        return "unknown"
+    trusted = _trusted_proxies(settings.forwarded_allow_ips)
+    if not _is_trusted(peer, trusted):
+        return peer
+    header = b",".join(value for name, value in scope.get("headers", []) if name == b"x-forwarded-for")
+    hops = [hop.strip() for hop in header.decode("latin-1").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        # "*" vouches for the peer only: the hop it appended is the client
+        if trusted is None or not _is_trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+def month_after(year: int, month: int) -> datetime:
+    """Start of the month following ``year``-``month``."""
+    return datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+
+
+def period_bounds(value: str) -> Tuple[datetime, datetime]:
+    """``[start, end)`` of a year (``2025``), month (``2025-03``), day (``2025-03-14``) or ISO instant.
+
+    Results are naive UTC, like article dates; a period ending after year
+    9999 ends at ``datetime.max``. Raises ``ValueError`` for anything else.
+    """
+    parts = value.split("-")
+    if len(parts) == 1 and value.isdigit():
+        start, unit = datetime(int(value), 1, 1), "year"
+    elif len(parts) == 2 and all(part.isdigit() for part in parts):
+        start, unit = datetime(int(parts[0]), int(parts[1]), 1), "month"
+    else:
+        start, unit = datetime.fromisoformat(value), "day" if len(value) == 10 else "instant"
+        if start.tzinfo is not None:
+            try:
+                start = start.astimezone(timezone.utc).replace(tzinfo=None)
+            except OverflowError:
+                raise ValueError(f"{value!r} is outside the supported date range") from None
+    try:
+        if unit == "year":
+            end = datetime(start.year + 1, 1, 1)
+        elif unit == "month":
+            end = month_after(start.year, start.month)
+        else:
+            end = start + (timedelta(days=1) if unit == "day" else timedelta(microseconds=1))
+    except (OverflowError, ValueError):
+        end = datetime.max
+    return start, end
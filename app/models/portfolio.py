@@ -2,8 +2,8 @@
 Data models for the portfolio application.
 """
 from typing import List, Optional
-from pydantic import BaseModel, Field
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, timezone
 
 
 class ContactInfo(BaseModel):
@@ -54,6 +54,14 @@ class Article(BaseModel):
     featured: bool = Field(default=False, description="Whether article is featured")
     external_url: Optional[str] = Field(None, description="External article URL")
 
+    @field_validator("published_date")
+    @classmethod
+    def _naive_utc(cls, value: datetime) -> datetime:
+        # Dates are compared, sorted and bucketed naive; offset-aware ones are stored as UTC
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 
 class Education(BaseModel):
     """Education model."""
@@ -1,74 +1,104 @@
-from fastapi import APIRouter, Request, HTTPException, Depends, status, Form, Response
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Request, HTTPException, Depends, status, Form, Response, Query
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
-from typing import List, Optional
-import json
-import os
-import uuid
-from datetime import datetime, timedelta
-import re
-from pathlib import Path
-from jose import JWTError, jwt
+from typing import List, Literal, Optional
+import asyncio
+import hmac
+import math
+from datetime import date, timedelta
+from jose import JWTError
 import pyotp
 
 from app.core.config import settings
+from app.core.templates import template_manager
 from app.services.portfolio_service import portfolio_service
+from app.services.article_store import BatchError, article_store
+from app.services.tag_registry import tag_registry
+from app.services.analytics import view_counter
+from app.services.cache_warmer import cache_warmer
+from app.services.catalog_transfer import CatalogImporter, export_ndjson
+from app.services.cache_purge import cache_purger
+from app.services.medium_import import (
+    ImportItem, MediumImporter, fetch_medium_metadata, import_jobs, parse_import_text
+)
 from app.core import security
-
-import subprocess
-import shutil
+from app.core.ratelimit import TokenBucketLimiter, get_rate_limit_backend
+from app.core.utils import client_ip
+from app.core.admission import admission_stats
+from app.core.response_cache import response_cache
+from app.core.profiling import sampling_profiler, slow_request_log
+from app.core.memory import leak_check, memory_report
 
 router = APIRouter()
-templates = Jinja2Templates(directory=settings.template_dir)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="admin/login")
 
-async def get_current_admin(request: Request):
+_UNSET = object()
+
+def _authenticate(request: Request) -> Optional[str]:
+    """Verify the session cookie once per request and memoize the result on request.state.
+
+    Returns the admin username, None when no cookie is present, and raises
+    HTTPException for invalid tokens.
+    """
+    cached = getattr(request.state, "admin_user", _UNSET)
+    if cached is not _UNSET:
+        if isinstance(cached, HTTPException):
+            raise cached
+        return cached
+
     token = request.cookies.get("access_token")
     if not token:
-        # If it's a page request, return None to let the caller handle redirect
-        # If it's an API request (like fetch-medium), raise 401
-        if request.url.path == "/admin/add-article" or \
-           request.url.path == "/admin/manage-articles":
-            return None
-            
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        request.state.admin_user = None
+        return None
     
     try:
         # Remove "Bearer " prefix if present
         if token.startswith("Bearer "):
             token = token.split(" ")[1]
             
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        username: str = payload.get("sub")
+        username = security.verify_access_token(token)
         if username is None or username != settings.admin_username:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    except HTTPException as e:
+        request.state.admin_user = e
+        raise
     except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        request.state.admin_user = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        raise request.state.admin_user
     except Exception as e:
         print(f"Error decoding token: {e}")
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token validation failed")
+        request.state.admin_user = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token validation failed")
+        raise request.state.admin_user
     
+    request.state.admin_user = username
     return username
 
-# Middleware-like dependency for HTML pages
-async def admin_required(request: Request):
+async def get_current_admin(request: Request):
+    """Dependency for admin API routes: the admin username or 401."""
+    username = _authenticate(request)
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return username
+
+async def get_optional_admin(request: Request) -> Optional[str]:
+    """Dependency for admin HTML pages: the admin username, or None to redirect to login."""
     try:
-        user = await get_current_admin(request)
-        if user is None:
-            return False
+        return _authenticate(request)
     except HTTPException:
-        return False
-    return True
+        return None
+
+# Middleware-like dependency for HTML pages
+async def admin_required(request: Request):
+    return await get_optional_admin(request) is not None
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return templates.TemplateResponse("admin/login.html", {
+    return template_manager.render("admin/login.html", {
         "request": request,
         "app_name": settings.app_name,
         "page_title": "Admin Login",
@@ -80,15 +110,41 @@ async def login_page(request: Request):
         "portfolio": portfolio_service.get_portfolio_data()
     })
 
+login_ip_limiter = TokenBucketLimiter(
+    "login-ip", settings.login_attempts_per_ip, settings.login_attempt_window
+)
+login_username_limiter = TokenBucketLimiter(
+    "login-user", settings.login_attempts_per_username, settings.login_attempt_window
+)
+
+def _too_many_attempts(retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Too many login attempts"},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
 @router.post("/login")
 async def login(
+    request: Request,
     response: Response,
     username: str = Form(...),
     password: str = Form(...),
     totp_code: str = Form(...)
 ):
+    # 0. Throttle per client IP and per username before any credential or crypto work.
+    # The username budget is shared by every client, capping distributed guessing against one account.
+    retry_after = (
+        await login_ip_limiter.hit_async(client_ip(request.scope))
+        or await login_username_limiter.hit_async(username.lower())
+    )
+    if retry_after:
+        return _too_many_attempts(retry_after)
+    
     # 1. Verify Username & Password
-    if username != settings.admin_username or password != settings.admin_password:
+    username_ok = hmac.compare_digest(username.encode(), settings.admin_username.encode())
+    password_ok = hmac.compare_digest(password.encode(), settings.admin_password.encode())
+    if not (username_ok and password_ok):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -105,6 +161,13 @@ async def login(
             detail="Invalid 2FA code",
         )
     
+    # 2b. Reject replays: each code is accepted once while it is still valid
+    if not await get_rate_limit_backend().add_once_async(f"totp:{username}:{totp_code}", ttl=totp.interval * 2):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="2FA code already used",
+        )
+    
     # 3. Create Token
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = security.create_access_token(
@@ -149,64 +212,19 @@ class ArticleData(BaseModel):
     image_url: Optional[str] = None
     external_url: Optional[str] = None
 
-def slugify(text):
-    text = text.lower()
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
-    return text.strip('-')
-
-def get_medium_html(url):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.9',
-    }
-    
-    # Try urllib first
-    try:
-        import urllib.request
-        req = urllib.request.Request(url, headers=headers)
-        with urllib.request.urlopen(req) as response:
-            return response.read().decode('utf-8')
-    except Exception as e:
-        print(f"Urllib failed: {e}")
-        
-        # Try curl if available (fallback for 403s)
-        if shutil.which("curl"):
-            try:
-                result = subprocess.run(
-                    ["curl", "-L", "-A", headers['User-Agent'], url],
-                    capture_output=True,
-                    text=True,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
-                if result.returncode == 0 and result.stdout:
-                    return result.stdout
-            except Exception as curl_e:
-                print(f"Curl failed: {curl_e}")
-                
-        raise e
-
 @router.get("/add-article", response_class=HTMLResponse)
-async def add_article_page(request: Request):
+async def add_article_page(request: Request, username: Optional[str] = Depends(get_optional_admin)):
     # Check authentication first
-    if not await admin_required(request):
+    if username is None:
         return RedirectResponse(url="/admin/login", status_code=303)
 
     try:
-        # Load metadata for dropdowns
-        try:
-            with open('data/blog_metadata.json', 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-        except FileNotFoundError:
-            metadata = {"categories": [], "tags": []}
-        
-        # Build context similar to pages.py
+        # Categories for the dropdown; only the most used tags are preloaded,
+        # the rest come from /admin/api/tags as the admin types
         context = {
             "request": request,
-            "categories": metadata.get("categories", []),
-            "tags": metadata.get("tags", []),
+            "categories": tag_registry.category_names(),
+            "tags": tag_registry.popular_tags(settings.admin_popular_tags),
             "app_name": settings.app_name,
             "contact_email": settings.contact_email,
             "linkedin_url": settings.linkedin_url,
@@ -216,7 +234,7 @@ async def add_article_page(request: Request):
             "portfolio": portfolio_service.get_portfolio_data()
         }
             
-        return templates.TemplateResponse("admin/add_article.html", context)
+        return template_manager.render("admin/add_article.html", context)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -225,162 +243,251 @@ async def add_article_page(request: Request):
 @router.post("/fetch-medium")
 async def fetch_medium(data: MediumRequest, username: str = Depends(get_current_admin)):
     try:
-        from html.parser import HTMLParser
-
-        class MetaParser(HTMLParser):
-            def __init__(self):
-                super().__init__()
-                self.meta = {}
-            def handle_starttag(self, tag, attrs):
-                if tag == 'meta':
-                    attrs_dict = dict(attrs)
-                    if 'property' in attrs_dict:
-                        prop = attrs_dict['property']
-                        if prop.startswith('og:'):
-                            self.meta[prop] = attrs_dict.get('content')
-                    elif 'name' in attrs_dict:
-                        name = attrs_dict['name']
-                        if name == 'description':
-                            self.meta['description'] = attrs_dict.get('content')
-                        elif name == 'twitter:data1':
-                            self.meta['twitter:data1'] = attrs_dict.get('content')
-                        elif name == 'article:published_time':
-                            self.meta['article:published_time'] = attrs_dict.get('content')
-
-        # Get HTML using robust method
-        html = get_medium_html(data.url)
-            
-        parser = MetaParser()
-        parser.feed(html)
-        
-        # Extract read time (heuristic or from meta)
-        read_time = 5 # Default
-        
-        # Extract published date
-        published_date = parser.meta.get('article:published_time')
-        
-        # Try to parse Apollo State for better data
-        apollo_match = re.search(r'window\.__APOLLO_STATE__\s*=\s*({.+?})</script>', html)
-        if apollo_match:
-            try:
-                apollo_data = json.loads(apollo_match.group(1))
-                
-                # Try to find the post
-                post = None
-                
-                # 1. Try to extract ID from URL
-                post_id = None
-                url_match = re.search(r'-([a-f0-9]+)$', data.url)
-                if url_match:
-                    post_id = url_match.group(1)
-                    post = apollo_data.get(f"Post:{post_id}")
-                
-                # 2. If not found, look for any Post with matching title
-                if not post:
-                    title = parser.meta.get('og:title', '')
-                    for key, value in apollo_data.items():
-                        if key.startswith('Post:') and value.get('title') == title:
-                            post = value
-                            break
-                
-                if post:
-                    if 'readingTime' in post:
-                        read_time = int(round(post['readingTime']))
-                    
-                    if 'firstPublishedAt' in post and post['firstPublishedAt']:
-                        dt = datetime.fromtimestamp(post['firstPublishedAt'] / 1000)
-                        published_date = dt.isoformat()
-                    elif 'updatedAt' in post and post['updatedAt']:
-                        dt = datetime.fromtimestamp(post['updatedAt'] / 1000)
-                        published_date = dt.isoformat()
-                        
-            except Exception as e:
-                print(f"Apollo parse error: {e}")
-
-        # Fallback for read time if not found in Apollo
-        if read_time == 5:
-            twitter_data1 = parser.meta.get('twitter:data1')
-            if twitter_data1 and 'min read' in twitter_data1:
-                 try:
-                     read_time = int(twitter_data1.split()[0])
-                 except:
-                     pass
-        
-        # Fallback for date
-        if not published_date:
-             published_date = datetime.now().isoformat()
-
-        return {
-            "title": parser.meta.get('og:title', ''),
-            "description": parser.meta.get('og:description', '') or parser.meta.get('description', ''),
-            "image": parser.meta.get('og:image', ''),
-            "url": parser.meta.get('og:url', data.url),
-            "read_time": read_time,
-            "published_date": published_date
-        }
+        # Stream the page and stop reading once the metadata is found
+        metadata, _ = await asyncio.to_thread(fetch_medium_metadata, data.url)
+        return metadata
         
     except Exception as e:
         return JSONResponse(status_code=400, content={"error": str(e)})
 
+class BulkImportRequest(BaseModel):
+    urls: List[str] = []
+    feed: Optional[str] = None  # Raw RSS/Atom XML or newline-separated URLs
+    category: str
+    tags: List[str] = []
+    featured: bool = False
+    overwrite: bool = False
+
+class BatchOperation(BaseModel):
+    op: Literal["upsert", "delete", "recategorize", "toggle_featured"]
+    id: Optional[str] = None  # Target of delete, recategorize and toggle_featured
+    article: Optional[ArticleData] = None  # upsert
+    category: Optional[str] = None  # recategorize
+    featured: Optional[bool] = None  # toggle_featured; omitted flips the current value
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+# Batches are applied one at a time, each against the catalog the previous one published
+_batch_lock = asyncio.Lock()
+
+@router.post("/bulk-import")
+async def bulk_import(data: BulkImportRequest, username: str = Depends(get_current_admin)):
+    """Start importing many Medium posts; poll /admin/bulk-import/{job_id} for progress."""
+    try:
+        items = [ImportItem(url) for url in data.urls]
+        if data.feed:
+            items.extend(parse_import_text(data.feed))
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"error": f"Could not parse feed: {e}"})
+    if not items:
+        return JSONResponse(status_code=400, content={"error": "No URLs to import"})
+    
+    job = import_jobs.create(total=len({item.url for item in items}))
+    
+    def on_progress(done, total, result):
+        job["done"] = done
+        job["results"].append(result.__dict__)
+    
+    async def run_job():
+        try:
+            await MediumImporter().run(
+                items, data.category, data.tags, data.featured, data.overwrite, progress=on_progress
+            )
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+    
+    import_jobs.start(run_job())
+    return {"job_id": job["id"], "total": job["total"]}
+
+@router.get("/bulk-import/{job_id}")
+async def bulk_import_status(job_id: str, username: str = Depends(get_current_admin)):
+    job = import_jobs.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Job not found"})
+    return job
+
 @router.post("/save-article")
 async def save_article(article: ArticleData, username: str = Depends(get_current_admin)):
     try:
-        # Parse date
-        pub_date = datetime.fromisoformat(article.published_date)
-        year = str(pub_date.year)
-        month = f"{pub_date.month:02d}"
-        
-        # Create directory
-        cat_slug = slugify(article.category)
-        base_dir = Path(settings.data_dir) / "articles" / cat_slug / year / month
-        base_dir.mkdir(parents=True, exist_ok=True)
-        
-        # File path
-        file_path = base_dir / f"{article.id}.json"
-        
-        # Prepare data with UUID and Slug
-        data = article.dict()
-        data['primary_id'] = str(uuid.uuid4())
-        data['slug'] = article.id # Use ID as slug
-        
-        # Save JSON
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        file_path = article_store.save(article.dict())
             
         # Update metadata if new tags/categories
-        meta_path = Path('data/blog_metadata.json')
-        if meta_path.exists():
-            with open(meta_path, 'r', encoding='utf-8') as f:
-                meta = json.load(f)
-            
-            updated = False
-            if article.category not in meta['categories']:
-                meta['categories'].append(article.category)
-                meta['categories'].sort()
-                updated = True
-                
-            for tag in article.tags:
-                if tag not in meta['tags']:
-                    meta['tags'].append(tag)
-                    updated = True
-            
-            if updated:
-                meta['tags'].sort()
-                with open(meta_path, 'w', encoding='utf-8') as f:
-                    json.dump(meta, f, indent=4)
+        tag_registry.register([article.category], article.tags)
         
         # Refresh the portfolio service cache
-        portfolio_service.refresh_data()
+        await portfolio_service.refresh(upserted=[article.id], paths={article.id: file_path})
                     
         return {"success": True, "path": str(file_path)}
         
     except Exception as e:
         return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
     
+@router.post("/batch")
+async def batch_articles(data: BatchRequest, username: str = Depends(get_current_admin)):
+    """Apply many article operations all-or-nothing, with one metadata update and one refresh."""
+    if not data.operations or len(data.operations) > settings.admin_batch_max_operations:
+        return JSONResponse(status_code=400, content={
+            "success": False,
+            "message": f"Send between 1 and {settings.admin_batch_max_operations} operations"
+        })
+    operations = [operation.dict() for operation in data.operations]
+    async with _batch_lock:
+        snapshot = portfolio_service.snapshot
+        try:
+            result = await asyncio.to_thread(
+                article_store.apply_batch, operations, snapshot.article_by_id, snapshot.paths
+            )
+        except BatchError as e:
+            return JSONResponse(status_code=400, content={"success": False, "message": str(e), "errors": e.errors})
+        except Exception as e:
+            return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
+        
+        tag_registry.register(result.categories, result.tags)
+        change = await portfolio_service.refresh(
+            upserted=result.upserted, removed=result.removed, paths=result.paths
+        )
+    return {
+        "success": True,
+        "upserted": result.upserted,
+        "removed": result.removed,
+        "moved": result.moved,
+        "generation": change.generation,
+    }
+
+@router.get("/export.ndjson")
+async def export_catalog(username: str = Depends(get_current_admin)):
+    """Stream every project and article as NDJSON, reading one article file at a time."""
+    return StreamingResponse(
+        export_ndjson(portfolio_service.snapshot),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="catalog-{date.today().isoformat()}.ndjson"'}
+    )
+
+@router.post("/import.ndjson")
+async def import_catalog(
+    request: Request,
+    dry_run: bool = Query(False, description="Validate every line without writing anything"),
+    username: str = Depends(get_current_admin)
+):
+    """Import an NDJSON export as it is uploaded, in atomic batches, with one refresh at the end."""
+    async with _batch_lock:
+        try:
+            report = await CatalogImporter(dry_run=dry_run).run(request.stream())
+        except Exception as e:
+            return JSONResponse(status_code=500, content={"success": False, "message": str(e)})
+    return {"success": report["error_count"] == 0, **report}
+
+@router.get("/api/tags")
+async def complete_terms(
+    prefix: str = "",
+    kind: str = Query("tags", pattern="^(tags|categories)$"),
+    limit: int = Query(10, ge=1, le=50),
+    username: str = Depends(get_current_admin)
+):
+    """Ranked tag/category completions for the admin forms."""
+    return tag_registry.complete(kind, prefix, limit)
+
+
+@router.get("/api/views")
+async def view_stats(
+    kind: str = Query("article", pattern="^(article|project|route)$"),
+    limit: int = Query(20, ge=1, le=200),
+    username: str = Depends(get_current_admin)
+):
+    """Most viewed articles, projects or routes, merged across workers."""
+    return [{"key": key, "views": views} for key, views in view_counter.top(kind, limit)]
+
+
+@router.get("/api/metrics")
+async def runtime_metrics(username: str = Depends(get_current_admin)):
+    """Admission counters, response cache stats, cache warm-up and purge progress for this worker."""
+    return {
+        "admission": admission_stats.as_dict(),
+        "response_cache": response_cache.stats(),
+        "cache_warmer": cache_warmer.progress,
+        "cache_purge": cache_purger.status(),
+    }
+
+
+class PurgeRequest(BaseModel):
+    keys: List[str] = []
+    all: bool = False
+
+
+@router.post("/api/purge")
+async def purge_surrogate_keys(data: PurgeRequest, username: str = Depends(get_current_admin)):
+    """Send surrogate keys (or ``all``) to the purge hook now."""
+    if not cache_purger.enabled:
+        return JSONResponse(status_code=409, content={"error": "No surrogate_purge_url configured"})
+    keys = set(data.keys) | ({"all"} if data.all else set())
+    if not keys:
+        return JSONResponse(status_code=400, content={"error": "No keys to purge"})
+    return {"queued": sorted(keys), "pending": cache_purger.purge(keys)}
+
+
+@router.post("/api/profile")
+async def start_profile(
+    seconds: float = Query(10.0, gt=0, le=settings.profile_max_seconds),
+    requests: Optional[int] = Query(None, ge=1, description="Stop after this many requests"),
+    username: str = Depends(get_current_admin)
+):
+    """Start the sampling profiler for N seconds (or until N requests finish)."""
+    if not sampling_profiler.start(seconds, requests):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    return sampling_profiler.status()
+
+
+@router.get("/api/profile")
+async def profile_status(username: str = Depends(get_current_admin)):
+    return sampling_profiler.status()
+
+
+@router.get("/api/profile.collapsed")
+async def download_profile(username: str = Depends(get_current_admin)):
+    """Aggregated stacks in collapsed format (flamegraph.pl, speedscope)."""
+    return Response(
+        content=sampling_profiler.collapsed(),
+        media_type="text/plain",
+        headers={"Content-Disposition": "attachment; filename=profile.collapsed"}
+    )
+
+
+@router.get("/api/slow-requests")
+async def slow_requests(
+    limit: int = Query(20, ge=1, le=settings.slow_request_log_size),
+    username: str = Depends(get_current_admin)
+):
+    """Slowest recent requests with per-phase timings (ms)."""
+    return {
+        "threshold_ms": slow_request_log.threshold_ms,
+        "requests_seen": slow_request_log.seen,
+        "slowest": slow_request_log.slowest(limit),
+    }
+
+
+@router.get("/api/memory")
+def memory(username: str = Depends(get_current_admin)):
+    """Deep sizes of the catalog, caches and template environments (bytes)."""
+    return memory_report()
+
+
+@router.post("/api/memory/leak-check")
+def memory_leak_check(
+    refreshes: int = Query(3, ge=1, le=20),
+    top: int = Query(10, ge=1, le=50),
+    username: str = Depends(get_current_admin)
+):
+    """Diff tracemalloc snapshots across repeated catalog rebuilds (on a private copy of the catalog)."""
+    return leak_check(refreshes, top)
+
+
 @router.get("/manage-articles", response_class=HTMLResponse)
-async def manage_articles_page(request: Request):
+async def manage_articles_page(request: Request, username: Optional[str] = Depends(get_optional_admin)):
     # Check authentication first
-    if not await admin_required(request):
+    if username is None:
         return RedirectResponse(url="/admin/login", status_code=303)
 
     context = {
@@ -394,43 +501,24 @@ async def manage_articles_page(request: Request):
         "medium_url": settings.medium_url,
         "portfolio": portfolio_service.get_portfolio_data()
     }
-    return templates.TemplateResponse("admin/manage_articles.html", context)
+    return template_manager.render("admin/manage_articles.html", context)
 
 @router.delete("/delete-article/{article_id}")
 async def delete_article(article_id: str, username: str = Depends(get_current_admin)):
     try:
         # Find the article to get its path details
-        article = portfolio_service.get_article_by_id(article_id)
+        snapshot = portfolio_service.snapshot
+        article = snapshot.get_article_by_id(article_id)
         if not article:
             return JSONResponse(status_code=404, content={"success": False, "message": "Article not found"})
             
-        # Reconstruct file path
-        cat_slug = slugify(article.category)
-        year = str(article.published_date.year)
-        month = f"{article.published_date.month:02d}"
-        
-        file_path = Path(settings.data_dir) / "articles" / cat_slug / year / month / f"{article.id}.json"
-        
-        if file_path.exists():
-            os.remove(file_path)
-            
-            # Clean up empty directories if any
-            try:
-                # Try to remove month dir if empty
-                if not any(file_path.parent.iterdir()):
-                    file_path.parent.rmdir()
-                    # Try to remove year dir if empty
-                    if not any(file_path.parent.parent.iterdir()):
-                        file_path.parent.parent.rmdir()
-            except Exception:
-                pass # Ignore directory cleanup errors
-                
+        if article_store.delete(article, snapshot.paths.get(article_id)):
             # Refresh cache
-            portfolio_service.refresh_data()
+            await portfolio_service.refresh(removed=[article_id])
             return {"success": True, "message": "Article deleted successfully"}
         else:
             # If file not found but exists in cache, force refresh
-            portfolio_service.refresh_data()
+            await portfolio_service.refresh()
             return JSONResponse(status_code=404, content={"success": False, "message": "Article file not found"})
             
     except Exception as e:
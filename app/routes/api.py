@@ -1,12 +1,24 @@
 """
 Optimized API routes with consolidated filtering logic.
 """
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional, TypeVar
+import json
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Tuple, TypeVar
 from app.models.portfolio import Project, Article, ContactInfo
+from app.core.config import settings
+from app.core.startup import startup_state
+from app.core.profiling import TimedRoute
+from app.core.utils import period_bounds
+from app.core.surrogate import category_key, tag, tag_articles, tag_projects
 from app.services.portfolio_service import portfolio_service
+from app.services.analytics import view_counter
+from app.services.related import related_service
+from app.services.chat import chat_engine
+from app.services.article_content import content_renderer
+from app.services.projection import FieldEncoder
 
-router = APIRouter(prefix="/api", tags=["api"])
+router = APIRouter(prefix="/api", tags=["api"], route_class=TimedRoute)
 
 T = TypeVar('T', Project, Article)
 
@@ -38,12 +50,49 @@ class FilterService:
         return filtered_items
 
 
+FIELDS_DESCRIPTION = "Comma-separated fields to return (default: all)"
+IDS_DESCRIPTION = "Comma-separated ids, returned in this order"
+
+
+def parse_fields(encoder: FieldEncoder, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """A ``fields=`` projection, or None for full objects."""
+    try:
+        return encoder.parse(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def parse_ids(ids: Optional[str]) -> Optional[List[str]]:
+    """Ids from a comma-separated list, deduplicated in order."""
+    if ids is None:
+        return None
+    parsed = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if len(parsed) > settings.api_max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {settings.api_max_ids} ids per request")
+    return parsed
+
+
+def projected(encoder: FieldEncoder, items, fields: Tuple[str, ...]) -> Response:
+    """Items (a list, or a single item) as JSON from their precomputed field encodings."""
+    body = encoder.encode_many(items, fields) if isinstance(items, list) else encoder.encode(items, fields)
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "message": "Portfolio API is running"}
 
 
+@router.get("/ready")
+async def readiness_check():
+    """Readiness: 200 once the catalog, templates and indexes are loaded, else 503 with progress."""
+    return JSONResponse(
+        status_code=200 if startup_state.ready else 503,
+        content=startup_state.as_dict()
+    )
+
+
 @router.get("/contact", response_model=ContactInfo)
 async def get_contact_info():
     """Get contact information."""
@@ -54,50 +103,227 @@ async def get_contact_info():
 async def get_projects(
     category: Optional[str] = Query(None, description="Filter by category"),
     featured: Optional[bool] = Query(None, description="Filter by featured status"),
-    limit: Optional[int] = Query(None, ge=1, description="Limit number of results")
+    limit: Optional[int] = Query(None, ge=1, description="Limit number of results"),
+    ids: Optional[str] = Query(None, description=IDS_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    """Get projects with optional filtering and limiting."""
+    """Get projects with optional filtering, limiting and field selection."""
+    catalog = portfolio_service.snapshot
+    projection = parse_fields(catalog.project_fields, fields)
+    wanted = parse_ids(ids)
+    projects = catalog.projects
+    if wanted is not None:
+        projects = [p for p in map(catalog.get_project_by_id, wanted) if p]
+    
     projects = FilterService.filter_items(
-        portfolio_service.projects, 
+        projects, 
         category=category, 
         featured=featured
     )
+    projects = projects[:limit] if limit else projects
     
-    return projects[:limit] if limit else projects
+    if wanted is not None:
+        tag(*(f"project:{project_id}" for project_id in wanted))
+    else:
+        tag("projects")
+    tag_projects(projects)
+    return projected(catalog.project_fields, projects, projection) if projection else projects
 
 
 @router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str):
+async def get_project(
+    project_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Get a specific project by ID."""
-    project = portfolio_service.get_project_by_id(project_id)
+    catalog = portfolio_service.snapshot
+    projection = parse_fields(catalog.project_fields, fields)
+    tag(f"project:{project_id}")
+    project = catalog.get_project_by_id(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    return project
+    return projected(catalog.project_fields, project, projection) if projection else project
+
+
+@router.post("/projects/{project_id}/view", status_code=204)
+async def record_project_view(project_id: str):
+    """Count a project view (sent as a beacon when a project link is followed)."""
+    if not portfolio_service.get_project_by_id(project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    view_counter.record("project", project_id)
+    return Response(status_code=204)
+
+
+@router.get("/projects/{project_id}/related", response_model=List[Project])
+def get_related_projects(
+    project_id: str,
+    limit: int = Query(3, ge=1, le=settings.related_top_k, description="Number of related projects"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    """Get projects with the most similar tech stack and category."""
+    catalog = portfolio_service.snapshot
+    projection = parse_fields(catalog.project_fields, fields)
+    if not catalog.get_project_by_id(project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    related = related_service.related_projects(project_id, limit=limit)
+    tag_projects(related, f"project:{project_id}", "projects")
+    return projected(catalog.project_fields, related, projection) if projection else related
 
 
 @router.get("/noteonai", response_model=List[Article])
 async def get_articles(
     category: Optional[str] = Query(None, description="Filter by category"),
     featured: Optional[bool] = Query(None, description="Filter by featured status"),
-    limit: Optional[int] = Query(None, ge=1, description="Limit number of results")
+    limit: Optional[int] = Query(None, ge=1, description="Limit number of results"),
+    sort: Optional[str] = Query(None, pattern="^(recent|popular)$", description="'popular' orders by views"),
+    from_: Optional[str] = Query(None, alias="from", description="Published in or after: YYYY, YYYY-MM or YYYY-MM-DD"),
+    to: Optional[str] = Query(None, description="Published in or before: YYYY, YYYY-MM or YYYY-MM-DD"),
+    ids: Optional[str] = Query(None, description=IDS_DESCRIPTION),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    """Get articles with optional filtering and limiting."""
+    """Get articles with optional filtering, ordering, limiting and field selection."""
+    catalog = portfolio_service.snapshot
+    projection = parse_fields(catalog.article_fields, fields)
+    wanted = parse_ids(ids)
+    articles = catalog.articles
+    if wanted is not None:
+        articles = [a for a in map(catalog.get_article_by_id, wanted) if a]
+    if from_ or to:
+        try:
+            start = period_bounds(from_)[0] if from_ else None
+            end = period_bounds(to)[1] if to else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="'from' and 'to' take YYYY, YYYY-MM or YYYY-MM-DD")
+        if wanted is not None:
+            articles = [
+                a for a in articles
+                if (start is None or a.published_date >= start) and (end is None or a.published_date < end)
+            ]
+        else:
+            # Binary search on the date index instead of a scan
+            articles = catalog.dates.between(start, end)
+    
     articles = FilterService.filter_items(
-        portfolio_service.articles, 
+        articles, 
         category=category, 
         featured=featured
     )
     
-    return articles[:limit] if limit else articles
+    if sort == "popular":
+        views = view_counter.counts("article")
+        articles = sorted(articles, key=lambda a: -views.get(a.id, 0))
+    articles = articles[:limit] if limit else articles
+    
+    # Which catalog changes can alter this list: its items, plus the facet it selects by
+    if wanted is not None:
+        tag(*(f"article:{article_id}" for article_id in wanted))
+    elif category:
+        tag(category_key(category))
+    else:
+        tag("featured" if featured else "articles")
+    if from_ or to or sort == "popular":
+        tag("articles")
+    tag_articles(articles)
+    return projected(catalog.article_fields, articles, projection) if projection else articles
+
+
+@router.get("/noteonai/archive")
+async def get_article_archive():
+    """Article counts per year and month, newest first."""
+    catalog = portfolio_service.snapshot
+    tag("articles")
+    return {"total": len(catalog.articles), "years": catalog.dates.summary()}
 
 
 @router.get("/noteonai/{article_id}", response_model=Article)
-async def get_article(article_id: str):
+async def get_article(
+    article_id: str,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Get a specific article by ID."""
+    catalog = portfolio_service.snapshot
+    projection = parse_fields(catalog.article_fields, fields)
+    tag(f"article:{article_id}")
+    article = catalog.get_article_by_id(article_id)
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return projected(catalog.article_fields, article, projection) if projection else article
+
+
+@router.get("/noteonai/{article_id}/content")
+def get_article_content(article_id: str):
+    """Get an article's rendered content: sanitized HTML, table of contents and read time."""
+    tag(f"article:{article_id}")
     article = portfolio_service.get_article_by_id(article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
-    return article
+    rendered = content_renderer.render_article(article)
+    return {
+        "id": article.id,
+        "html": rendered.html,
+        "toc": rendered.toc,
+        "words": rendered.words,
+        "read_time": rendered.read_time,
+    }
+
+
+@router.post("/noteonai/{article_id}/view", status_code=204)
+async def record_article_view(article_id: str):
+    """Count an article view (sent as a beacon when an article link is followed)."""
+    if not portfolio_service.get_article_by_id(article_id):
+        raise HTTPException(status_code=404, detail="Article not found")
+    view_counter.record("article", article_id)
+    return Response(status_code=204)
+
+
+@router.get("/noteonai/{article_id}/related", response_model=List[Article])
+def get_related_articles(
+    article_id: str,
+    limit: int = Query(3, ge=1, le=settings.related_top_k, description="Number of related articles"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    """Get articles sharing the most tags and category with the given article."""
+    catalog = portfolio_service.snapshot
+    projection = parse_fields(catalog.article_fields, fields)
+    related = related_service.related_articles(article_id, limit=limit)
+    tag_articles(related, f"article:{article_id}", "articles")
+    if not related and not catalog.get_article_by_id(article_id):
+        raise HTTPException(status_code=404, detail="Article not found")
+    return projected(catalog.article_fields, related, projection) if projection else related
+
+
+@router.get("/batch")
+async def get_batch(
+    articles: Optional[str] = Query(None, description="Comma-separated article ids"),
+    projects: Optional[str] = Query(None, description="Comma-separated project ids"),
+    article_fields: Optional[str] = Query(None, description="Article fields to return (default: all)"),
+    project_fields: Optional[str] = Query(None, description="Project fields to return (default: all)")
+):
+    """Get many articles and projects by id in one response, in the order asked for.
+    
+    Ids that don't exist are listed under ``missing`` instead of failing the request.
+    """
+    catalog = portfolio_service.snapshot
+    article_projection = parse_fields(catalog.article_fields, article_fields)
+    project_projection = parse_fields(catalog.project_fields, project_fields)
+    article_ids = parse_ids(articles) or []
+    project_ids = parse_ids(projects) or []
+    if len(article_ids) + len(project_ids) > settings.api_max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {settings.api_max_ids} ids per request")
+    
+    tag(*(f"article:{i}" for i in article_ids), *(f"project:{i}" for i in project_ids))
+    found_articles = [a for a in map(catalog.get_article_by_id, article_ids) if a]
+    found_projects = [p for p in map(catalog.get_project_by_id, project_ids) if p]
+    missing = {
+        "articles": [i for i in article_ids if catalog.get_article_by_id(i) is None],
+        "projects": [i for i in project_ids if catalog.get_project_by_id(i) is None],
+    }
+    body = b"".join((
+        b'{"articles":', catalog.article_fields.encode_many(found_articles, article_projection),
+        b',"projects":', catalog.project_fields.encode_many(found_projects, project_projection),
+        b',"missing":', json.dumps(missing).encode(), b"}"
+    ))
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/tech-stack")
@@ -114,29 +340,34 @@ async def get_tech_stack(
     return tech_stack[:limit] if limit else tech_stack
 
 
+@router.get("/chat")
+async def chat(
+    q: str = Query(..., min_length=1, max_length=settings.chat_max_question_length, description="Question")
+):
+    """Answer a question about the portfolio, streamed as Server-Sent Events."""
+    return StreamingResponse(
+        chat_engine.stream(q),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/featured")
 async def get_featured_content(
     projects_limit: int = Query(3, ge=1, description="Number of featured projects"),
     articles_limit: int = Query(2, ge=1, description="Number of featured articles")
 ):
     """Get featured content (projects and articles) in one request."""
-    return {
-        "projects": portfolio_service.get_featured_projects(limit=projects_limit),
-        "articles": portfolio_service.get_featured_articles(limit=articles_limit)
-    }
+    catalog = portfolio_service.snapshot
+    projects = catalog.get_featured_projects(limit=projects_limit)
+    articles = catalog.get_featured_articles(limit=articles_limit)
+    tag_projects(projects, "featured")
+    tag_articles(articles, "featured")
+    return {"projects": projects, "articles": articles}
 
 
 @router.get("/portfolio-summary")
 async def get_portfolio_summary():
     """Get a summary of portfolio statistics."""
-    portfolio = portfolio_service.get_portfolio_data()
-    
-    return {
-        "total_projects": len(portfolio.projects),
-        "featured_projects": len([p for p in portfolio.projects if p.featured]),
-        "total_articles": len(portfolio.articles),
-        "featured_articles": len([a for a in portfolio.articles if a.featured]),
-        "total_certifications": len(portfolio.certifications),
-        "total_technologies": len(portfolio.tech_stack),
-        "education_levels": len(portfolio.education)
-    }
+    tag("articles", "projects", "featured")
+    return portfolio_service.get_portfolio_stats()
@@ -0,0 +1,58 @@
+"""
+Feed and sitemap routes, served from pre-rendered documents with ETags.
+"""
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.config import settings
+from app.core.surrogate import ANY_ARTICLE, tag
+from app.services.feed_service import RenderedDocument, feed_service
+
+router = APIRouter(tags=["feeds"])
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison as used for If-None-Match (proxies may add ``W/``)."""
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def xml_response(request: Request, name: str) -> Response:
+    """Serve a feed document, answering conditional GETs with 304."""
+    document: RenderedDocument = feed_service.get(name)
+    tag("articles", ANY_ARTICLE)  # Titles, dates and membership of the latest articles
+    if document is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    headers = {
+        "ETag": document.etag,
+        "Cache-Control": f"public, max-age={settings.feed_cache_max_age}",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, document.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=document.body, media_type=document.media_type, headers=headers)
+
+
+# Plain (sync) handlers: the first request after a full refresh renders in the threadpool
+@router.get("/feed.xml")
+def rss_feed(request: Request):
+    """RSS 2.0 feed of the latest articles."""
+    return xml_response(request, "feed.xml")
+
+
+@router.get("/atom.xml")
+def atom_feed(request: Request):
+    """Atom feed of the latest articles."""
+    return xml_response(request, "atom.xml")
+
+
+@router.get("/sitemap.xml")
+def sitemap(request: Request):
+    """Sitemap, or a sitemap index once the site outgrows one shard."""
+    return xml_response(request, "sitemap.xml")
+
+
+@router.get("/sitemaps/sitemap-{shard}.xml")
+def sitemap_shard(request: Request, shard: int):
+    """One shard of a sharded sitemap."""
+    return xml_response(request, f"sitemaps/sitemap-{shard}.xml")
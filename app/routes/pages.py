@@ -1,21 +1,27 @@
 """
 Optimized page routes with consolidated context building.
 """
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, Optional
+from app.core.config import settings
 from app.core.templates import template_manager
+from app.core.profiling import TimedRoute, timed
+from app.core.surrogate import tag, tag_articles, tag_projects
 from app.services.portfolio_service import portfolio_service
+from app.services.article_content import content_renderer
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 class ContextBuilder:
     """Centralized context building service to eliminate duplication."""
     
     @staticmethod
+    @timed("context")
     def build_base_context(
-        request: Request, 
+        request: Optional[Request], 
         page_title: str, 
         include_portfolio: bool = True
     ) -> Dict[str, Any]:
@@ -34,7 +40,9 @@ class ContextBuilder:
         }
         
         if include_portfolio:
-            context["portfolio"] = portfolio_service.get_portfolio_data()
+            # One snapshot per page, so every part of it sees the same catalog
+            context["catalog"] = portfolio_service.snapshot
+            context["portfolio"] = context["catalog"].data
         
         return context
     
@@ -45,10 +53,81 @@ class ContextBuilder:
         articles_limit: int = 4
     ) -> Dict[str, Any]:
         """Add featured projects and articles to context."""
+        catalog = context.get("catalog") or portfolio_service.snapshot
         context.update({
-            "featured_projects": portfolio_service.get_featured_projects(limit=projects_limit),
-            "featured_articles": portfolio_service.get_featured_articles(limit=articles_limit)
+            "featured_projects": catalog.get_featured_projects(limit=projects_limit),
+            "featured_articles": catalog.get_featured_articles(limit=articles_limit)
         })
+        tag_projects(context["featured_projects"], "featured")
+        tag_articles(context["featured_articles"], "featured")
+        return context
+    
+    @staticmethod
+    @timed("context")
+    def build_home_context(request: Optional[Request]) -> Dict[str, Any]:
+        """Build the home page context."""
+        context = ContextBuilder.build_base_context(request, "Sahabaj Alam")
+        return ContextBuilder.add_featured_content(context)
+    
+    @staticmethod
+    @timed("context")
+    def build_projects_context(request: Optional[Request]) -> Dict[str, Any]:
+        """Build the projects page context."""
+        context = ContextBuilder.build_base_context(request, "Projects")
+        context["projects"] = context["portfolio"].projects
+        tag_projects(context["projects"], "projects")
+        return context
+    
+    @staticmethod
+    @timed("context")
+    def build_noteonai_context(request: Optional[Request]) -> Dict[str, Any]:
+        """Build the articles page context."""
+        context = ContextBuilder.build_base_context(request, "NoteonAI")
+        context["articles"] = context["portfolio"].articles
+        context["category_counts"] = context["catalog"].category_counts
+        context["most_viewed"] = context["catalog"].get_popular_articles(5)
+        tag_articles(context["articles"], "articles")
+        return context
+    
+    @staticmethod
+    @timed("context")
+    def build_archive_context(
+        request: Optional[Request], 
+        year: Optional[int] = None, 
+        month: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Build an archive page context: the year/month summary plus one period's articles."""
+        context = ContextBuilder.build_base_context(request, "Archive")
+        dates = context["catalog"].dates
+        if month is not None:
+            context["articles"] = dates.month(year, month)
+            context["period_title"] = datetime(year, month, 1).strftime("%B %Y")
+        elif year is not None:
+            context["articles"] = dates.year(year)
+            context["period_title"] = str(year)
+        else:
+            context["articles"] = []
+            context["period_title"] = None
+        context["archive"] = dates.summary()
+        context["selected_year"] = year
+        context["selected_month"] = month
+        if context["period_title"]:
+            context["page_title"] = f"Archive: {context['period_title']}"
+        tag_articles(context["articles"], "articles")
+        return context
+    
+    @staticmethod
+    @timed("context")
+    def build_article_context(request: Optional[Request], article_id: str) -> Optional[Dict[str, Any]]:
+        """Build an article page context with its rendered content, or None if there is no such article."""
+        context = ContextBuilder.build_base_context(request, "NoteonAI")
+        tag(f"article:{article_id}")
+        article = context["catalog"].get_article_by_id(article_id)
+        if article is None:
+            return None
+        context["article"] = article
+        context["content"] = content_renderer.render_article(article)
+        context["page_title"] = article.title
         return context
 
 
@@ -56,8 +135,7 @@ class ContextBuilder:
 @router.get("/index.html", response_class=HTMLResponse)
 async def home(request: Request):
     """Serve the home page with portfolio data."""
-    context = ContextBuilder.build_base_context(request, "Sahabaj Alam")
-    context = ContextBuilder.add_featured_content(context)
+    context = ContextBuilder.build_home_context(request)
     
     return template_manager.render("pages/index.html", context)
 
@@ -66,8 +144,7 @@ async def home(request: Request):
 @router.get("/projects.html", response_class=HTMLResponse)
 async def projects(request: Request):
     """Serve the projects page."""
-    context = ContextBuilder.build_base_context(request, "Projects")
-    context["projects"] = context["portfolio"].projects
+    context = ContextBuilder.build_projects_context(request)
     
     return template_manager.render("pages/projects.html", context)
 
@@ -76,11 +153,44 @@ async def projects(request: Request):
 @router.get("/noteonai.html", response_class=HTMLResponse)
 async def articles(request: Request):
     """Serve the consolidated articles page with filtering and pagination."""
-    context = ContextBuilder.build_base_context(request, "NoteonAI")
-    context["articles"] = context["portfolio"].articles
-    context["category_counts"] = portfolio_service.get_category_counts()
+    context = ContextBuilder.build_noteonai_context(request)
+    
+    return template_manager.render(
+        "pages/noteonai.html", 
+        context, 
+        stream="noteonai" in settings.streaming_pages
+    )
+
+
+@router.get("/noteonai/archive", response_class=HTMLResponse)
+async def archive(request: Request):
+    """Serve the archive index: article counts per year and month."""
+    context = ContextBuilder.build_archive_context(request)
+    
+    return template_manager.render("pages/archive.html", context)
+
+
+@router.get("/noteonai/archive/{year:int}", response_class=HTMLResponse)
+@router.get("/noteonai/archive/{year:int}/{month:int}", response_class=HTMLResponse)
+async def archive_period(request: Request, year: int, month: Optional[int] = None):
+    """Serve the articles of one year or month."""
+    if not 1 <= year <= 9999 or (month is not None and not 1 <= month <= 12):
+        raise HTTPException(status_code=404, detail="Page not found")
+    context = ContextBuilder.build_archive_context(request, year, month)
+    if not context["articles"]:
+        raise HTTPException(status_code=404, detail="Page not found")
+    
+    return template_manager.render("pages/archive.html", context)
+
+
+@router.get("/noteonai/{article_id}", response_class=HTMLResponse)
+def article_page(request: Request, article_id: str):
+    """Serve one article with its rendered content and table of contents."""
+    context = ContextBuilder.build_article_context(request, article_id)
+    if context is None:
+        raise HTTPException(status_code=404, detail="Page not found")
     
-    return template_manager.render("pages/noteonai.html", context)
+    return template_manager.render("pages/article.html", context)
 
 
 # Optional: Add a generic page renderer for future extensibility
@@ -0,0 +1,146 @@
+"""
+View counters for articles, projects and routes.
+
+Recording a view only increments an in-memory counter; nothing touches the
+disk on the request path. A background task (started by the app lifespan)
+flushes the pending increments to a SQLite file every
+``analytics_flush_interval`` seconds, as one transaction of
+``count = count + delta`` upserts. Every worker flushes into the same file,
+so totals read back from it are merged across workers; each worker adds its
+own not-yet-flushed increments on top.
+
+Reads never touch the disk either: after each flush the same task re-reads
+the totals and publishes a ``ViewRanking`` per kind (counts plus keys in
+rank order), which requests use as is. Rankings are therefore up to one
+flush interval behind.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class ViewRanking:
+    """Views per key of one kind, as of the last refresh; never modified once published."""
+    counts: Mapping[str, int] = field(default_factory=dict)
+    ranked: Tuple[str, ...] = ()  # Keys, most viewed first (ties by key)
+
+
+_NO_VIEWS = ViewRanking()
+
+
+class ViewCounter:
+    """In-memory view counts with write-behind persistence to SQLite."""
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.path = path or settings.analytics_db_path
+        self.enabled = settings.analytics_enabled if enabled is None else enabled
+        self._pending: Counter = Counter()  # (kind, key) -> views not yet flushed
+        self._rankings: Dict[str, ViewRanking] = {}  # Replaced whole by refresh()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+    def record(self, kind: str, key: str, views: int = 1):
+        """Count a view; memory only, safe to call on the request path."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending[(kind, key)] += views
+
+    def flush(self) -> int:
+        """Write pending increments in one transaction; returns how many keys were written."""
+        with self._lock:
+            batch, self._pending = self._pending, Counter()
+        if not batch:
+            return 0
+
+        now = time.time()
+        try:
+            with self._db_lock:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT INTO views (kind, key, count, updated) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (kind, key) DO UPDATE SET count = count + excluded.count, updated = excluded.updated",
+                        [(kind, key, count, now) for (kind, key), count in batch.items()]
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            # Keep the views for the next attempt rather than dropping them
+            with self._lock:
+                self._pending.update(batch)
+            print(f"Error flushing view counts: {e}")
+            return 0
+
+        return len(batch)
+
+    def refresh(self):
+        """Re-read the merged totals and publish new rankings (background; reads the disk)."""
+        if not self.enabled:
+            return
+        try:
+            with self._db_lock:
+                rows = self._connection().execute("SELECT kind, key, count FROM views").fetchall()
+        except Exception as e:
+            print(f"Error reading view counts: {e}")
+            return
+        totals: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for kind, key, count in rows:
+            totals[kind][key] = count
+        with self._lock:
+            pending = list(self._pending.items())
+        for (kind, key), count in pending:
+            totals[kind][key] = totals[kind].get(key, 0) + count
+        self._rankings = {
+            kind: ViewRanking(counts, tuple(sorted(counts, key=lambda key: (-counts[key], key))))
+            for kind, counts in totals.items()
+        }
+
+    def sync(self):
+        """Flush pending views, then refresh the rankings; run by the periodic background task."""
+        self.flush()
+        self.refresh()
+
+    def ranking(self, kind: str) -> ViewRanking:
+        """The published ranking of one kind; safe (and cheap) on the request path."""
+        return self._rankings.get(kind, _NO_VIEWS)
+
+    def counts(self, kind: str) -> Mapping[str, int]:
+        """Views per key for one kind, across all workers (read-only)."""
+        return self.ranking(kind).counts
+
+    def top(self, kind: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Most viewed keys of a kind, highest first."""
+        ranking = self.ranking(kind)
+        return [(key, ranking.counts[key]) for key in ranking.ranked[:limit]]
+
+    def _connection(self) -> sqlite3.Connection:
+        # Forked workers must not share the parent's connection
+        if self._conn is None or self._conn_pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS views ("
+                "kind TEXT NOT NULL, key TEXT NOT NULL, count INTEGER NOT NULL, updated REAL, "
+                "PRIMARY KEY (kind, key))"
+            )
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+# Global view counter instance
+view_counter = ViewCounter()
@@ -0,0 +1,497 @@
+"""
+Article content pipeline: markdown -> sanitized HTML, heading anchors,
+table of contents, read time and pre-highlighted code blocks.
+
+``render_markdown()`` is a self-contained renderer for the markdown that
+articles use: ATX headings, paragraphs, emphasis, code spans, fenced and
+indented code, (nested) lists, blockquotes, rules, links and images. Raw
+HTML is never passed through, it is escaped like any other text, and links
+and images only keep ``http``, ``https``, ``mailto`` and relative URLs, so
+the output contains nothing but the tags generated here. Code blocks are
+highlighted with Pygments when it is installed, otherwise with a small
+built-in lexer; both emit Pygments' short class names prefixed with ``hl-``.
+
+``ContentRenderer`` caches results on disk, one JSON file per content hash
+(``<content_cache_dir>/<sha256[:2]>/<sha256>.json``), so an unchanged article
+is rendered once across restarts and catalog reloads, with a small in-memory
+LRU in front. ``render_all()`` fills the cache for the whole archive with a
+process pool::
+
+    python -m app.services.article_content [--workers N] [--prune]
+"""
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.utils import atomic_write_bytes, slugify
+from app.models.portfolio import Article
+
+try:  # Optional: Pygments highlighting when installed, the built-in lexer otherwise
+    from pygments import highlight as pygments_highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # pragma: no cover - depends on the environment
+    pygments_highlight = None
+
+# Bump when the rendered output changes, so cached renders are redone
+RENDERER_VERSION = 1
+HIGHLIGHTER = "pygments" if pygments_highlight is not None else "builtin"
+TOC_LEVELS = (1, 2, 3)
+
+
+@dataclass
+class RenderedContent:
+    html: str = ""
+    toc: List[Dict[str, Any]] = field(default_factory=list)  # {"level", "id", "title"} per heading
+    words: int = 0
+    read_time: int = 1  # Minutes
+
+
+# Block syntax
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([\w+#.-]*)")
+_HEADING = re.compile(r"^ {0,3}(#{1,6})(?:\s+(.*?))?(?:\s+#+)?\s*$")
+_RULE = re.compile(r"^ {0,3}([-*_])(?:\s*\1){2,}\s*$")
+_QUOTE = re.compile(r"^ {0,3}> ?(.*)$")
+_LIST_ITEM = re.compile(r"^( *)([-*+]|\d{1,9}[.)])(\s+)(.*)$")
+
+# Inline syntax, matched after escaping (quotes are &quot;)
+_CODE_SPAN = re.compile(r"(`+)(.+?)\1", re.S)
+_URL = r"((?:[^()\s]|\([^()\s]*\))+)"  # One level of balanced parentheses
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(\s*" + _URL + r"(?:\s+&quot;(.*?)&quot;)?\s*\)")
+_LINK = re.compile(r"\[([^\]]+)\]\(\s*" + _URL + r"(?:\s+&quot;(.*?)&quot;)?\s*\)")
+_AUTOLINK = re.compile(r"&lt;((?:https?://|mailto:)[^\s]+?)&gt;")
+_STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1", re.S)
+_EMPHASIS = re.compile(r"(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?!\*)|(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])", re.S)
+_STRIKE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~", re.S)
+_PLACEHOLDER = re.compile(r"\x00(\d+)\x00")
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"\w+")
+
+_SAFE_SCHEMES = ("http", "https", "mailto")
+
+
+def _safe_url(url: str) -> Optional[str]:
+    """The URL escaped for an attribute, or None if its scheme could run script."""
+    raw = html.unescape(url).strip()
+    scheme = re.match(r"^([a-z][a-z0-9+.-]*):", re.sub(r"[\x00-\x20]", "", raw).lower())
+    if scheme and scheme.group(1) not in _SAFE_SCHEMES:
+        return None
+    return html.escape(raw, quote=True)
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+# Built-in highlighting: comments, strings, numbers and keywords
+_HASH_COMMENTS = {"python", "py", "bash", "sh", "shell", "zsh", "yaml", "yml", "toml", "ruby", "rb", "r", "dockerfile"}
+_SLASH_COMMENTS = {
+    "javascript", "js", "typescript", "ts", "jsx", "tsx", "java", "go", "rust", "rs", "c", "cpp", "c++",
+    "csharp", "cs", "kotlin", "swift", "scala", "php", "json", "css",
+}
+_DASH_COMMENTS = {"sql"}
+_KEYWORDS = frozenset("""
+    and as assert async await break case catch class const continue def del do elif else enum except export
+    extends false False final finally fn for from func function go if impl import in interface is lambda let
+    match mod mut new nil None nonlocal not null or package pass pub raise return self static struct super
+    switch this throw true True try type typeof use var void while with yield
+    echo then fi done esac local
+    SELECT FROM WHERE JOIN LEFT RIGHT INNER OUTER ON GROUP BY ORDER HAVING LIMIT INSERT INTO VALUES UPDATE
+    SET DELETE CREATE TABLE INDEX AS AND OR NOT NULL DISTINCT UNION WITH
+""".split())
+_LEXERS: Dict[str, "re.Pattern"] = {}
+
+
+def _lexer(comment: str) -> "re.Pattern":
+    if comment not in _LEXERS:
+        _LEXERS[comment] = re.compile(
+            rf"(?P<c>{comment})"
+            r"|(?P<s>\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"
+            r"|(?P<m>\b\d+(?:\.\d+)?\b)"
+            r"|(?P<w>\b[A-Za-z_][A-Za-z0-9_]*\b)"
+        )
+    return _LEXERS[comment]
+
+
+def highlight(code: str, language: str) -> str:
+    """Escaped code with ``hl-`` classed spans; plain escaped code for unknown languages."""
+    language = language.lower()
+    if pygments_highlight is not None and language:
+        try:
+            lexer = get_lexer_by_name(language)
+        except ClassNotFound:
+            return html.escape(code, quote=False)
+        return pygments_highlight(code, lexer, HtmlFormatter(nowrap=True, classprefix="hl-")).rstrip("\n")
+
+    if language in _HASH_COMMENTS:
+        pattern = _lexer(r"#[^\n]*")
+    elif language in _SLASH_COMMENTS:
+        pattern = _lexer(r"//[^\n]*|/\*[\s\S]*?\*/")
+    elif language in _DASH_COMMENTS:
+        pattern = _lexer(r"--[^\n]*")
+    else:
+        return html.escape(code, quote=False)
+
+    out = []
+    position = 0
+    for match in pattern.finditer(code):
+        kind = match.lastgroup
+        if kind == "w" and match.group() not in _KEYWORDS:
+            continue
+        out.append(html.escape(code[position:match.start()], quote=False))
+        css = "k" if kind == "w" else kind  # Pygments' short class names
+        out.append(f'<span class="hl-{css}">{html.escape(match.group(), quote=False)}</span>')
+        position = match.end()
+    out.append(html.escape(code[position:], quote=False))
+    return "".join(out)
+
+
+class _MarkdownRenderer:
+    """One document's block and inline rendering, collecting headings and words."""
+
+    def __init__(self):
+        self.toc: List[Dict[str, Any]] = []
+        self.words = 0
+        self._slugs: Dict[str, int] = {}
+
+    # Blocks
+    def blocks(self, lines: List[str]) -> List[str]:
+        out: List[str] = []
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                i += 1
+                continue
+
+            fence = _FENCE.match(line)
+            if fence:
+                marker, language = fence.group(1), fence.group(2)
+                code: List[str] = []
+                i += 1
+                while i < len(lines) and not lines[i].strip().startswith(marker):
+                    code.append(lines[i])
+                    i += 1
+                out.append(self.code_block("\n".join(code), language))
+                i += 1
+                continue
+
+            heading = _HEADING.match(line)
+            if heading:
+                out.append(self.heading(len(heading.group(1)), heading.group(2) or ""))
+                i += 1
+                continue
+
+            if _RULE.match(line):
+                out.append("<hr>")
+                i += 1
+                continue
+
+            if _QUOTE.match(line):
+                quoted = []
+                while i < len(lines) and lines[i].strip():
+                    match = _QUOTE.match(lines[i])
+                    quoted.append(match.group(1) if match else lines[i])
+                    i += 1
+                out.append("<blockquote>\n" + "\n".join(self.blocks(quoted)) + "\n</blockquote>")
+                continue
+
+            if _LIST_ITEM.match(line):
+                i = self.list_block(lines, i, out)
+                continue
+
+            if _indent(line) >= 4:
+                code = []
+                while i < len(lines) and (_indent(lines[i]) >= 4 or not lines[i].strip()):
+                    code.append(lines[i][4:])
+                    i += 1
+                while code and not code[-1].strip():
+                    code.pop()
+                out.append(self.code_block("\n".join(code), ""))
+                continue
+
+            paragraph = [line]
+            i += 1
+            while i < len(lines) and lines[i].strip() and not self._starts_block(lines[i]):
+                paragraph.append(lines[i])
+                i += 1
+            out.append(f"<p>{self.inline(chr(10).join(p.strip() if not p.endswith('  ') else p.lstrip() for p in paragraph))}</p>")
+        return out
+
+    @staticmethod
+    def _starts_block(line: str) -> bool:
+        return bool(
+            _FENCE.match(line) or _HEADING.match(line) or _RULE.match(line)
+            or _QUOTE.match(line) or re.match(r"^ {0,3}[-*+]\s+\S", line)
+        )
+
+    def list_block(self, lines: List[str], i: int, out: List[str]) -> int:
+        first = _LIST_ITEM.match(lines[i])
+        indent = len(first.group(1))
+        ordered = first.group(2)[0].isdigit()
+        items: List[List[str]] = []
+
+        while i < len(lines):
+            item = _LIST_ITEM.match(lines[i])
+            if item is None or len(item.group(1)) != indent or item.group(2)[0].isdigit() != ordered:
+                break
+            content_indent = indent + len(item.group(2)) + len(item.group(3))
+            items.append([item.group(4)])
+            i += 1
+            while i < len(lines):
+                line = lines[i]
+                if not line.strip():
+                    # A blank line continues the item only if indented content follows
+                    j = i
+                    while j < len(lines) and not lines[j].strip():
+                        j += 1
+                    if j < len(lines) and _indent(lines[j]) > indent:
+                        items[-1].extend(lines[i:j])
+                        i = j
+                        continue
+                    break
+                if _indent(line) > indent:
+                    items[-1].append(line[min(content_indent, _indent(line)):])
+                elif _LIST_ITEM.match(line) or self._starts_block(line):
+                    break
+                else:
+                    items[-1].append(line)  # Lazy continuation of the item's paragraph
+                i += 1
+            # Blank lines between items of the same list
+            j = i
+            while j < len(lines) and not lines[j].strip():
+                j += 1
+            following = _LIST_ITEM.match(lines[j]) if j < len(lines) else None
+            if following is None or len(following.group(1)) != indent:
+                break
+            i = j
+
+        tag = "ol" if ordered else "ul"
+        start = int(first.group(2)[:-1]) if ordered else 1
+        rendered = []
+        for item_lines in items:
+            blocks = self.blocks(item_lines)
+            if blocks and blocks[0].startswith("<p>"):
+                blocks[0] = blocks[0][3:-4]  # Tight items: no paragraph around the first line
+            rendered.append(f"<li>{chr(10).join(blocks)}</li>")
+        opening = f'<{tag} start="{start}">' if ordered and start != 1 else f"<{tag}>"
+        out.append(opening + "\n" + "\n".join(rendered) + f"\n</{tag}>")
+        return i
+
+    def code_block(self, code: str, language: str) -> str:
+        css = f' class="language-{html.escape(language.lower(), quote=True)}"' if language else ""
+        return f"<pre><code{css}>{highlight(code, language)}</code></pre>"
+
+    def heading(self, level: int, text: str) -> str:
+        inner = self.inline(text)
+        title = html.unescape(_TAG.sub("", inner)).strip()
+        slug = slugify(title) or "section"
+        count = self._slugs.get(slug, 0)
+        self._slugs[slug] = count + 1
+        if count:
+            slug = f"{slug}-{count + 1}"
+        if level in TOC_LEVELS:
+            self.toc.append({"level": level, "id": slug, "title": title})
+        return (
+            f'<h{level} id="{slug}">{inner} '
+            f'<a class="heading-anchor" href="#{slug}" aria-label="Link to this section">#</a></h{level}>'
+        )
+
+    # Inline
+    def inline(self, text: str) -> str:
+        stash: List[str] = []
+
+        def keep(fragment: str) -> str:
+            stash.append(fragment)
+            return f"\x00{len(stash) - 1}\x00"
+
+        def image(match: "re.Match") -> str:
+            url = _safe_url(match.group(2))
+            if url is None:
+                return match.group(1)
+            title = f' title="{match.group(3)}"' if match.group(3) else ""
+            return keep(f'<img src="{url}" alt="{match.group(1)}"{title} loading="lazy">')
+
+        def link(match: "re.Match") -> str:
+            url = _safe_url(match.group(2))
+            if url is None:
+                return match.group(1)
+            title = f' title="{match.group(3)}"' if match.group(3) else ""
+            rel = ' rel="noopener noreferrer"' if url.startswith(("http://", "https://")) else ""
+            # Tags go to the stash so emphasis never rewrites inside an attribute
+            return keep(f'<a href="{url}"{title}{rel}>') + match.group(1) + keep("</a>")
+
+        def autolink(match: "re.Match") -> str:
+            url = _safe_url(match.group(1))
+            return keep(f'<a href="{url}" rel="noopener noreferrer">{url}</a>') if url else match.group(0)
+
+        self.words += len(_WORD.findall(_CODE_SPAN.sub(" ", text)))
+        text = _CODE_SPAN.sub(lambda m: keep(f"<code>{html.escape(m.group(2).strip(), quote=False)}</code>"), text)
+        text = html.escape(text, quote=True)
+        text = _IMAGE.sub(image, text)
+        text = _LINK.sub(link, text)
+        text = _AUTOLINK.sub(autolink, text)
+        text = _STRONG.sub(r"<strong>\2</strong>", text)
+        text = _EMPHASIS.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", text)
+        text = _STRIKE.sub(r"<del>\1</del>", text)
+        text = re.sub(r" {2,}\n", "<br>\n", text)
+        return _PLACEHOLDER.sub(lambda m: stash[int(m.group(1))], text)
+
+
+def render_markdown(text: str, words_per_minute: Optional[int] = None) -> RenderedContent:
+    """Render markdown to sanitized HTML with heading anchors, TOC, word count and read time."""
+    words_per_minute = words_per_minute or settings.content_words_per_minute
+    renderer = _MarkdownRenderer()
+    lines = text.replace("\x00", "").replace("\r\n", "\n").expandtabs(4).split("\n")
+    body = "\n".join(renderer.blocks(lines))
+    return RenderedContent(
+        html=body,
+        toc=renderer.toc,
+        words=renderer.words,
+        read_time=max(1, math.ceil(renderer.words / words_per_minute))
+    )
+
+
+class ContentRenderer:
+    """Renders article content through a disk cache keyed by content hash."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        memory_size: Optional[int] = None,
+        words_per_minute: Optional[int] = None
+    ):
+        self.cache_dir = Path(cache_dir or settings.content_cache_dir)
+        self.memory_size = settings.content_memory_cache_size if memory_size is None else memory_size
+        self.words_per_minute = words_per_minute or settings.content_words_per_minute
+        self._memory: "OrderedDict[str, RenderedContent]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        """Content hash, also covering everything else that changes the output."""
+        salt = f"{RENDERER_VERSION}:{HIGHLIGHTER}:{self.words_per_minute}\n"
+        return hashlib.sha256((salt + text).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def render(self, text: Optional[str]) -> RenderedContent:
+        if not text:
+            return RenderedContent()
+        key = self.key(text)
+        with self._lock:
+            rendered = self._memory.get(key)
+            if rendered is not None:
+                self._memory.move_to_end(key)
+                return rendered
+
+        rendered = self._read(key)
+        if rendered is None:
+            rendered = render_markdown(text, self.words_per_minute)
+            self._write(key, rendered)
+        self._remember(key, rendered)
+        return rendered
+
+    def render_article(self, article: Article) -> RenderedContent:
+        return self.render(article.content)
+
+    def render_all(self, articles: Iterable[Article], workers: Optional[int] = None) -> Dict[str, Any]:
+        """Render every article not yet on disk, in a process pool when there is more than one."""
+        started = time.perf_counter()
+        texts = {}
+        total = 0
+        for article in articles:
+            total += 1
+            if article.content:
+                texts.setdefault(self.key(article.content), article.content)
+        pending = {key: text for key, text in texts.items() if not self._path(key).exists()}
+
+        workers = workers or settings.content_render_workers or os.cpu_count() or 1
+        keys = list(pending)
+        render = partial(render_markdown, words_per_minute=self.words_per_minute)
+        if workers > 1 and len(keys) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(keys) // (workers * 8))
+                for key, rendered in zip(keys, pool.map(render, [pending[k] for k in keys], chunksize=chunksize)):
+                    self._write(key, rendered)
+        else:
+            for key in keys:
+                self._write(key, render(pending[key]))
+
+        return {
+            "articles": total,
+            "with_content": len(texts),
+            "cached": len(texts) - len(pending),
+            "rendered": len(pending),
+            "workers": workers if len(keys) > 1 else 1,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    def prune(self, articles: Iterable[Article]) -> int:
+        """Delete cached renders no current article uses. Returns how many."""
+        wanted = {self.key(article.content) for article in articles if article.content}
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            if path.stem not in wanted:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def _read(self, key: str) -> Optional[RenderedContent]:
+        try:
+            return RenderedContent(**json.loads(self._path(key).read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write(self, key: str, rendered: RenderedContent):
+        try:
+            atomic_write_bytes(self._path(key), json.dumps(asdict(rendered)).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not cache rendered content {key[:12]}: {e}")
+
+    def _remember(self, key: str, rendered: RenderedContent):
+        if self.memory_size <= 0:
+            return
+        with self._lock:
+            self._memory[key] = rendered
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Render every article's content into the disk cache.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: content_render_workers or CPU count)")
+    parser.add_argument("--prune", action="store_true", help="Also delete cached renders no article uses any more")
+    args = parser.parse_args(argv)
+
+    from app.services.portfolio_service import portfolio_service
+
+    articles = portfolio_service.articles
+    report = content_renderer.render_all(articles, args.workers)
+    if args.prune:
+        report["pruned"] = content_renderer.prune(articles)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# Global content renderer instance
+content_renderer = ContentRenderer()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+File-backed article store.
+
+Articles live at ``<data_dir>/articles/<category-slug>/<year>/<month>/<id>.json``
+and the admin category/tag vocabulary in ``<data_dir>/blog_metadata.json``
+(kept in memory by ``app.services.tag_registry``).
+Writes go through here so the admin routes, bulk tools and catalog import
+share one layout; none of these methods refresh the portfolio service,
+callers do that once per batch.
+
+``apply_batch()`` applies many upserts, deletes, recategorizations and
+featured toggles as one transaction: every operation is validated first,
+new files are staged next to their targets, and only then renamed into
+place (moving articles whose category or date changed), rolling back the
+files already swapped if anything fails.
+"""
+import json
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.core.utils import atomic_write_bytes, project_path, slugify
+from app.models.portfolio import Article
+
+
+class BatchError(ValueError):
+    """A batch was rejected before anything was written."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__(f"{len(errors)} operation(s) rejected")
+        self.errors = errors
+
+
+@dataclass
+class BatchResult:
+    upserted: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    moved: List[str] = field(default_factory=list)  # Upserted articles whose file changed place
+    paths: Dict[str, Path] = field(default_factory=dict)  # Final file of each upserted article
+    categories: List[str] = field(default_factory=list)  # Terms used by the written articles
+    tags: List[str] = field(default_factory=list)
+
+
+class ArticleStore:
+    """Reads and writes article JSON files and blog metadata."""
+
+    def __init__(self, data_dir: Optional[str] = None):
+        # The same absolute base the catalog loads from, so paths from either side compare equal
+        self.data_dir = project_path(data_dir or settings.data_dir)
+
+    @property
+    def articles_dir(self) -> Path:
+        return self.data_dir / "articles"
+
+    @property
+    def metadata_path(self) -> Path:
+        return self.data_dir / "blog_metadata.json"
+
+    def path_for(self, category: str, published_date: datetime, article_id: str) -> Path:
+        """File path for an article with the given category, date and id."""
+        return (
+            self.articles_dir
+            / slugify(category)
+            / str(published_date.year)
+            / f"{published_date.month:02d}"
+            / f"{article_id}.json"
+        )
+
+    def path_of(self, article: Article) -> Path:
+        return self.path_for(article.category, article.published_date, article.id)
+
+    def save(self, data: Dict[str, Any]) -> Path:
+        """Validate and write an article record, returning its file path.
+
+        ``data`` uses the admin form shape (``published_date`` as an ISO
+        string); ``primary_id`` and ``slug`` are filled in when missing.
+        """
+        data = self._normalize(data)
+
+        # Validate before touching the disk so a bad record never lands in the tree
+        article = self._validate(data)
+
+        file_path = self.path_of(article)
+        atomic_write_bytes(file_path, self._encode(data))
+        return file_path
+
+    def validate(self, data: Mapping[str, Any]) -> Article:
+        """The article a ``save()``-shaped record would become; raises ValueError if invalid."""
+        if not isinstance(data, Mapping):
+            raise ValueError("Article record must be an object")
+        try:
+            return self._validate(self._normalize(data))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid article record: {e}") from None
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Every article file's raw record, in path order, reading one file at a time."""
+        for path in self._walk(self.articles_dir):
+            try:
+                yield json.loads(path.read_bytes())
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable article file {path}: {e}")
+
+    @classmethod
+    def _walk(cls, directory: Path) -> Iterator[Path]:
+        # Depth-first with one sorted listing per level, never the whole tree in memory
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.is_dir():
+                yield from cls._walk(Path(entry.path))
+            elif entry.name.endswith(".json"):
+                yield Path(entry.path)
+
+    @staticmethod
+    def _normalize(data: Mapping[str, Any]) -> Dict[str, Any]:
+        data = dict(data)
+        data.setdefault("primary_id", str(uuid.uuid4()))
+        data.setdefault("slug", data["id"])
+        return data
+
+    @staticmethod
+    def _validate(data: Dict[str, Any]) -> Article:
+        published = data["published_date"]
+        if isinstance(published, str):
+            published = datetime.fromisoformat(published)
+        return Article(**{**data, "published_date": published})
+
+    @staticmethod
+    def _encode(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, indent=4).encode("utf-8")
+
+    def apply_batch(
+        self,
+        operations: List[Mapping[str, Any]],
+        current: Mapping[str, Article],
+        located: Optional[Mapping[str, Path]] = None
+    ) -> BatchResult:
+        """Apply admin operations all-or-nothing; ``current`` maps ids to the catalog's articles.
+
+        ``located`` maps ids to the files they live in (the snapshot's
+        ``paths``, plus files written since by earlier batches of the same
+        import), so existing articles are read, replaced and removed where
+        they actually are, even when that is not their canonical path.
+
+        Operations run in order against a working copy, so later ones see
+        earlier ones (upsert then recategorize, and so on):
+
+        - ``{"op": "upsert", "article": {...}}`` in the ``save()`` shape
+        - ``{"op": "delete", "id": ...}``
+        - ``{"op": "recategorize", "id": ..., "category": ...}``
+        - ``{"op": "toggle_featured", "id": ..., "featured": true|false|null}``
+          (null flips the current value)
+
+        Raises ``BatchError`` listing every invalid operation, with nothing
+        written. Existing records are read from their files, so fields the
+        admin forms don't know about are kept.
+        """
+        records: Dict[str, Optional[Dict[str, Any]]] = {}  # Final state of each touched id; None = deleted
+        originals: Dict[str, Optional[Path]] = {}  # Where each touched id lives now
+        errors: List[Dict[str, Any]] = []
+
+        def locate(article_id: str, article: Article) -> Path:
+            path = located.get(article_id) if located else None
+            return path.resolve() if path is not None else self.path_of(article)
+
+        def working(article_id: str) -> Dict[str, Any]:
+            if article_id not in records:
+                article = current.get(article_id)
+                if article is None:
+                    raise KeyError(f"Article '{article_id}' not found")
+                path = locate(article_id, article)
+                try:
+                    # Older files may predate primary_id/slug; fill them in as the loader does
+                    records[article_id] = self._normalize(json.loads(path.read_bytes()))
+                except FileNotFoundError:
+                    raise KeyError(f"File for article '{article_id}' not found") from None
+                originals[article_id] = path
+            if records[article_id] is None:
+                raise KeyError(f"Article '{article_id}' was deleted earlier in this batch")
+            return dict(records[article_id])
+
+        for index, operation in enumerate(operations):
+            kind = operation.get("op")
+            article_id = operation.get("id") or (operation.get("article") or {}).get("id")
+            try:
+                if kind == "upsert":
+                    record = self._normalize(operation["article"])
+                    if record["id"] not in originals:
+                        existing = current.get(record["id"])
+                        originals[record["id"]] = (
+                            locate(record["id"], existing) if existing is not None
+                            else located[record["id"]].resolve() if located and record["id"] in located else None
+                        )
+                elif kind == "delete":
+                    working(article_id)
+                    records[article_id] = None
+                    continue
+                elif kind == "recategorize":
+                    if not operation.get("category"):
+                        raise ValueError("recategorize needs a category")
+                    record = {**working(article_id), "category": operation["category"]}
+                elif kind == "toggle_featured":
+                    record = working(article_id)
+                    featured = operation.get("featured")
+                    record["featured"] = not record.get("featured", False) if featured is None else bool(featured)
+                else:
+                    raise ValueError(f"Unknown operation '{kind}'")
+                self._validate(record)
+                records[record["id"]] = record
+            except (KeyError, TypeError, ValueError) as e:
+                message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+                errors.append({"index": index, "op": kind, "id": article_id, "error": str(message)})
+        if errors:
+            raise BatchError(errors)
+
+        result = BatchResult()
+        writes: List[Tuple[Path, bytes]] = []
+        unlinks: List[Path] = []
+        for article_id, record in records.items():
+            original = originals.get(article_id)
+            if record is None:
+                if original is not None:
+                    unlinks.append(original)
+                result.removed.append(article_id)
+                continue
+            article = self._validate(record)
+            target = self.path_of(article)
+            writes.append((target, self._encode(record)))
+            if original is not None and original.resolve() != target.resolve():
+                unlinks.append(original)
+                result.moved.append(article_id)
+            result.upserted.append(article_id)
+            result.paths[article_id] = target
+            result.categories.append(article.category)
+            result.tags.extend(article.tags)
+        # A file vacated by one article may be the target of another
+        targets = {target.resolve() for target, _ in writes}
+        self._commit(writes, [path for path in unlinks if path.resolve() not in targets])
+        return result
+
+    def _commit(self, writes: List[Tuple[Path, bytes]], unlinks: List[Path]):
+        """Stage every write, then swap them all in and remove vacated files; undo on failure."""
+        staged: List[Tuple[str, Path]] = []
+        backups: Dict[Path, Optional[bytes]] = {}  # Previous content of every path touched; None = absent
+        try:
+            # Temp names don't end in .json, so the catalog loader never picks them up
+            for target, body in writes:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+                staged.append((tmp_path, target))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+            for path in [target for _, target in staged] + unlinks:
+                backups[path] = path.read_bytes() if path.exists() else None
+
+            # Nothing visible has changed until here
+            done: List[Path] = []
+            try:
+                for tmp_path, target in staged:
+                    os.replace(tmp_path, target)
+                    done.append(target)
+                for path in unlinks:
+                    if path.exists():
+                        path.unlink()
+                    done.append(path)
+            except BaseException:
+                for path in reversed(done):
+                    if backups[path] is None:
+                        path.unlink(missing_ok=True)
+                    else:
+                        atomic_write_bytes(path, backups[path])
+                raise
+        except BaseException:
+            for tmp_path, target in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                self._prune_dirs(target)
+            raise
+        for path in unlinks:
+            self._prune_dirs(path)
+
+    def delete(self, article: Article, path: Optional[Path] = None) -> bool:
+        """Remove an article's file (``path``, else its canonical one) and any directories left empty. False if missing."""
+        file_path = path or self.path_of(article)
+        if not file_path.exists():
+            return False
+
+        file_path.unlink()
+        self._prune_dirs(file_path)
+        return True
+
+    @staticmethod
+    def _prune_dirs(file_path: Path):
+        try:
+            # Try to remove month and year dirs if empty
+            if not any(file_path.parent.iterdir()):
+                file_path.parent.rmdir()
+                if not any(file_path.parent.parent.iterdir()):
+                    file_path.parent.parent.rmdir()
+        except OSError:
+            pass  # Ignore directory cleanup errors
+
+    def load_metadata(self) -> Dict[str, list]:
+        """Load the category/tag vocabulary used by the admin forms."""
+        try:
+            with open(self.metadata_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"categories": [], "tags": []}
+
+    def save_metadata(self, meta: Dict[str, list]):
+        """Atomically replace the category/tag vocabulary file."""
+        atomic_write_bytes(self.metadata_path, json.dumps(meta, indent=4).encode("utf-8"))
+
+
+# Global article store instance
+article_store = ArticleStore()
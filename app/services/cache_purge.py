@@ -0,0 +1,127 @@
+"""
+Purges of fronting caches (CDN, reverse proxy) by surrogate key.
+
+After every catalog refresh, ``CachePurger`` computes the surrogate keys the
+change made stale (``app.core.surrogate.changed_keys``) and sends them to
+``surrogate_purge_url``: a POST per ``surrogate_purge_batch`` keys, with the
+keys both as a JSON body (``{"keys": [...]}``) and space-separated in a
+``Surrogate-Key`` header, so a Fastly-style batch purge or a small relay
+can consume it. ``surrogate_purge_token`` is sent as a bearer token.
+
+Sending happens on a background thread: refreshes never wait for the
+network, keys queued while a purge is in flight are coalesced into the
+next one, and failed calls are retried with backoff before being counted
+as failures (``/admin/api/metrics``). Without a purge URL nothing is queued.
+"""
+import json
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.surrogate import changed_keys
+from app.services.portfolio_service import CatalogChange, OptimizedPortfolioService, portfolio_service
+
+
+class CachePurger:
+    """Queues surrogate keys and sends them to the purge hook from a worker thread."""
+
+    def __init__(self, service: OptimizedPortfolioService = portfolio_service, listen: bool = True):
+        self.service = service
+        self.url = settings.surrogate_purge_url
+        self.token = settings.surrogate_purge_token
+        self.batch = settings.surrogate_purge_batch
+        self.retries = settings.surrogate_purge_retries
+        self.timeout = settings.surrogate_purge_timeout
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sending = False
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "keys_sent": 0,
+            "failures": 0,
+            "last_error": None,
+            "last_purge": None,
+        }
+        if listen:
+            service.add_listener(self._on_change)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def purge(self, keys: Iterable[str]) -> int:
+        """Queue keys for purging; returns how many are now pending."""
+        if not self.enabled:
+            return 0
+        with self._lock:
+            self._pending.update(keys)
+            pending = len(self._pending)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cache-purger", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return pending
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until the queue is empty (or ``timeout`` passes); True if it emptied."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending and not self._wake.is_set() and not self._sending:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {"enabled": self.enabled, "pending": pending, **self.stats}
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                self._wake.clear()
+                keys = sorted(self._pending)
+                self._pending.clear()
+                self._sending = bool(keys)
+            try:
+                for start in range(0, len(keys), self.batch):
+                    self._send(keys[start:start + self.batch])
+            finally:
+                with self._lock:
+                    self._sending = False
+
+    def _send(self, keys: List[str]):
+        headers = {"Content-Type": "application/json", "Surrogate-Key": " ".join(keys)}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        body = json.dumps({"keys": keys}).encode("utf-8")
+        for attempt in range(self.retries + 1):
+            try:
+                request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+                self.stats["requests"] += 1
+                self.stats["keys_sent"] += len(keys)
+                self.stats["last_purge"] = time.time()
+                return
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+                if attempt < self.retries:
+                    time.sleep(min(0.5 * 2 ** attempt, 5.0))
+        self.stats["failures"] += 1
+        print(f"Cache purge of {len(keys)} key(s) failed: {self.stats['last_error']}")
+
+    def _on_change(self, change: CatalogChange):
+        # Runs in the refreshing thread; only computes keys and queues them
+        if self.enabled:
+            self.purge(changed_keys(change, self.service.snapshot))
+
+
+# Global cache purger instance
+cache_purger = CachePurger()
@@ -0,0 +1,182 @@
+"""
+Background warming of the response cache.
+
+After the startup warm-up, and again whenever the catalog generation
+changes, ``CacheWarmer`` re-renders the most requested pages and API
+responses into ``response_cache`` so the first visitors after a restart or
+``refresh_data()`` don't pay for cold renders. Entries that merely age out
+are not re-rendered: an idle site is left idle, and the next request for an
+expired URL renders it as usual.
+
+The plan is ordered by recorded traffic: route counts for the pages and
+listings, article views for article detail responses, and the summed views
+of their articles for category listings. Warming yields to live traffic:
+it renders one URL at a time, pauses ``cache_warm_interval`` seconds between
+renders, and waits while more than ``cache_warm_max_in_flight`` client
+requests are in flight. Progress is reported in ``progress`` (see
+``/admin/api/metrics``).
+"""
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+from app.core.admission import AdmissionStats, admission_stats
+from app.core.config import settings
+from app.core.response_cache import ResponseCache, response_cache
+from app.services.analytics import ViewCounter, view_counter
+from app.services.portfolio_service import CatalogChange, OptimizedPortfolioService, portfolio_service
+
+# Always-considered URLs, in tie-break order, with the route template their traffic is counted under
+_PAGES: List[Tuple[str, str]] = [
+    ("/", "/"),
+    ("/noteonai", "/noteonai"),
+    ("/projects", "/projects"),
+    ("/api/featured", "/api/featured"),
+    ("/api/noteonai", "/api/noteonai"),
+    ("/api/projects", "/api/projects"),
+    ("/noteonai/archive", "/noteonai/archive"),
+    ("/api/noteonai/archive", "/api/noteonai/archive"),
+]
+
+
+class CacheWarmer:
+    """Re-renders popular URLs into the response cache after data changes."""
+
+    def __init__(
+        self,
+        cache: ResponseCache = response_cache,
+        service: OptimizedPortfolioService = portfolio_service,
+        counter: ViewCounter = view_counter,
+        stats: AdmissionStats = admission_stats,
+        listen: bool = True
+    ):
+        self.cache = cache
+        self.service = service
+        self.counter = counter
+        self.stats = stats
+        self.max_items = settings.cache_warm_max_items
+        self.top_articles = settings.cache_warm_top_articles
+        self.top_categories = settings.cache_warm_top_categories
+        self.interval = settings.cache_warm_interval
+        self.max_in_flight = settings.cache_warm_max_in_flight
+        self.progress: Dict[str, Any] = {
+            "state": "idle",  # idle | waiting | warming | done
+            "runs": 0,
+            "generation": None,
+            "planned": 0,
+            "rendered": 0,
+            "fresh": 0,
+            "failed": 0,
+            "yields": 0,
+            "current": None,
+            "last_run_ms": None,
+        }
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        if listen:
+            service.add_listener(self._on_change)
+
+    def plan(self) -> List[str]:
+        """URLs to warm, most requested first."""
+        routes = self.counter.counts("route")
+        views = self.counter.counts("article")
+        candidates: List[Tuple[int, int, str]] = []  # (requests, tie-break order, url)
+
+        for order, (url, template) in enumerate(_PAGES):
+            candidates.append((routes.get(template, 0), -order, url))
+
+        articles = self.service.articles
+        category_views: Dict[str, int] = defaultdict(int)
+        category_sizes: Dict[str, int] = defaultdict(int)
+        for article in articles:
+            category_views[article.category] += views.get(article.id, 0)
+            category_sizes[article.category] += 1
+        categories = sorted(category_sizes, key=lambda c: (-category_views[c], -category_sizes[c], c))
+        for category in categories[:self.top_categories]:
+            url = "/api/noteonai?" + urlencode({"category": category}, quote_via=quote)
+            candidates.append((category_views[category], -len(_PAGES), url))
+
+        # Most viewed articles, topped up with the newest when few have views
+        ranked = sorted(range(len(articles)), key=lambda i: (-views.get(articles[i].id, 0), i))
+        for i in ranked[:self.top_articles]:
+            url = f"/api/noteonai/{quote(articles[i].id, safe='')}"
+            candidates.append((views.get(articles[i].id, 0), -len(_PAGES) - 1, url))
+
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
+        return [url for _, _, url in candidates if self.cache.cacheable(url.split("?", 1)[0])][:self.max_items]
+
+    async def warm(self, app) -> Dict[str, Any]:
+        """Render every stale URL in the plan, yielding to live requests."""
+        started = time.perf_counter()
+        generation = self.service.generation
+        self.cache.evict_stale(generation)
+        # Sorting the catalog by views is CPU work; keep it off the event loop
+        urls = await asyncio.to_thread(self.plan)
+        self.progress.update(
+            state="warming", generation=generation, planned=len(urls),
+            rendered=0, fresh=0, failed=0, yields=0, current=None
+        )
+
+        for url in urls:
+            if self.service.generation != generation:
+                break  # Data changed mid-run; the next run starts over
+            path, _, query = url.partition("?")
+            if self.cache.is_fresh(self.cache.key(path, query.encode("latin-1")), generation):
+                self.progress["fresh"] += 1
+                continue
+            while self.stats.in_flight > self.max_in_flight:
+                self.progress["yields"] += 1
+                await asyncio.sleep(self.interval)
+
+            self.progress["current"] = url
+            try:
+                stored = await self.cache.render(app, path, query)
+            except Exception as e:
+                stored = False
+                print(f"Cache warm-up of {url} failed: {e}")
+            self.progress["rendered" if stored else "failed"] += 1
+            await asyncio.sleep(self.interval)
+
+        self.progress.update(
+            state="done", current=None, runs=self.progress["runs"] + 1,
+            last_run_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        return self.progress
+
+    async def run(self, app):
+        """Warm after startup, then once per catalog generation."""
+        from app.core.startup import startup_state
+
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.progress["state"] = "waiting"
+        while startup_state.state == "warming":
+            await startup_state.wait_ready(1.0)
+
+        while True:
+            self._wake.clear()
+            if self.service.generation != self.progress["generation"]:
+                try:
+                    await self.warm(app)
+                except Exception as e:
+                    print(f"Cache warm-up failed: {e}")
+            await self._wake.wait()
+
+    def start(self, app) -> Optional[asyncio.Task]:
+        if not (settings.cache_warm_enabled and self.cache.enabled):
+            return None
+        return asyncio.create_task(self.run(app))
+
+    def _on_change(self, change: CatalogChange):
+        # Called from whichever thread refreshed the data
+        if self._loop is not None and self._wake is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # Loop already closed (shutting down)
+
+
+# Global cache warmer instance
+cache_warmer = CacheWarmer()
@@ -0,0 +1,211 @@
+"""
+Whole-catalog export and import as NDJSON (one JSON object per line).
+
+The first line is a header, then one line per record::
+
+    {"type": "header", "format": 1, "exported_at": "...", "generation": 12}
+    {"type": "project", "data": {...}}
+    {"type": "article", "data": {...the article file's record...}}
+
+``export_ndjson()`` streams articles straight from their files, one at a
+time, so memory stays flat however large the catalog is. Projects are
+defined in code (``portfolio_service``), so they are exported for reference
+and reported as skipped on import.
+
+``CatalogImporter`` reads a request body as it arrives, validates each
+article line and writes them ``transfer_batch_size`` at a time through
+``ArticleStore.apply_batch()`` (each batch atomic; invalid lines are
+reported by line number and skipped). Only ids and file paths are kept
+across batches, and the catalog is refreshed once, incrementally, at the end.
+"""
+import asyncio
+import json
+import time
+from collections import ChainMap
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.services.article_store import ArticleStore, BatchError, article_store
+from app.services.portfolio_service import CatalogSnapshot, portfolio_service
+from app.services.tag_registry import tag_registry
+
+FORMAT_VERSION = 1
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def export_ndjson(
+    snapshot: CatalogSnapshot,
+    store: Optional[ArticleStore] = None,
+    chunk_size: Optional[int] = None
+) -> Iterator[bytes]:
+    """The catalog as NDJSON chunks of about ``chunk_size`` bytes."""
+    store = store or article_store
+    chunk_size = chunk_size or settings.transfer_chunk_size
+    buffer = bytearray(_line({
+        "type": "header",
+        "format": FORMAT_VERSION,
+        "exported_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "generation": snapshot.generation,
+    }))
+    for project in snapshot.projects:
+        buffer += _line({"type": "project", "data": project.model_dump(mode="json")})
+    for record in store.iter_records():
+        buffer += _line({"type": "article", "data": record})
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+class CatalogImporter:
+    """Streams NDJSON lines into the article store in batches, then refreshes once."""
+
+    def __init__(
+        self,
+        store: Optional[ArticleStore] = None,
+        batch_size: Optional[int] = None,
+        max_line_bytes: Optional[int] = None,
+        dry_run: bool = False
+    ):
+        self.store = store or article_store
+        self.batch_size = batch_size or settings.transfer_batch_size
+        self.max_line_bytes = max_line_bytes or settings.transfer_max_line_bytes
+        self.dry_run = dry_run
+        self.lines = 0
+        self.articles = 0
+        self.skipped_projects = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.upserted: Dict[str, None] = {}  # Ordered set of written ids
+        self.paths: Dict[str, Path] = {}  # Where each written article now lives
+        self.categories: set = set()
+        self.tags: set = set()
+        self._current: Dict[str, Any] = {}  # The catalog's articles by id when the import started
+        self._located: Mapping[str, Path] = {}  # Where each article lives: written files, then the catalog's
+
+    async def run(self, chunks: AsyncIterable[bytes]) -> Dict[str, Any]:
+        """Import everything in ``chunks`` (e.g. ``request.stream()``); returns the report."""
+        started = time.perf_counter()
+        snapshot = portfolio_service.snapshot
+        self._current = snapshot.article_by_id
+        self._located = ChainMap(self.paths, snapshot.paths)
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for number, line in self._lines(chunks):
+            record = self._parse(number, line)
+            if record is None:
+                continue
+            batch.append((number, record))
+            if len(batch) >= self.batch_size:
+                await asyncio.to_thread(self._write, batch)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self._write, batch)
+
+        self.errors.sort(key=lambda error: error["line"])  # Batches report after the lines parsed on the loop
+        generation = portfolio_service.generation
+        if self.upserted and not self.dry_run:
+            tag_registry.register(self.categories, self.tags)
+            change = await portfolio_service.refresh(upserted=list(self.upserted), paths=self.paths)
+            generation = change.generation
+        return {
+            "dry_run": self.dry_run,
+            "lines": self.lines,
+            "articles": self.articles,
+            "written": 0 if self.dry_run else len(self.upserted),
+            "valid": len(self.upserted) if self.dry_run else None,
+            "skipped_projects": self.skipped_projects,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "generation": generation,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def _lines(self, chunks: AsyncIterable[bytes]):
+        """Numbered non-blank lines; lines over ``max_line_bytes`` are reported and skipped."""
+        buffer = b""
+        number = 0
+        oversized = False
+        async for chunk in chunks:
+            buffer += chunk
+            while True:
+                end = buffer.find(b"\n")
+                if end < 0:
+                    if len(buffer) > self.max_line_bytes:
+                        oversized = True
+                        buffer = b""  # Keep discarding until the line ends
+                    break
+                line, buffer = buffer[:end], buffer[end + 1:]
+                number += 1
+                if oversized:
+                    oversized = False
+                    self._error(number, None, f"Line longer than {self.max_line_bytes} bytes")
+                elif line.strip():
+                    yield number, line
+        if buffer or oversized:
+            number += 1
+            if oversized:
+                self._error(number, None, f"Line longer than {self.max_line_bytes} bytes")
+            elif buffer.strip():
+                yield number, buffer
+        self.lines = number
+
+    def _parse(self, number: int, line: bytes) -> Optional[Dict[str, Any]]:
+        """The article record on a line, or None for headers, projects and invalid lines."""
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            self._error(number, None, f"Invalid JSON: {e}")
+            return None
+        kind = entry.get("type") if isinstance(entry, dict) else None
+        if kind == "header":
+            if entry.get("format") != FORMAT_VERSION:
+                self._error(number, None, f"Unsupported format {entry.get('format')!r}")
+            return None
+        if kind == "project":
+            self.skipped_projects += 1
+            return None
+        if kind != "article" or not isinstance(entry.get("data"), dict):
+            self._error(number, None, "Expected {\"type\": \"article\", \"data\": {...}}")
+            return None
+        self.articles += 1
+        return entry["data"]
+
+    def _write(self, batch: List[Tuple[int, Dict[str, Any]]]):
+        if self.dry_run:
+            for number, record in batch:
+                try:
+                    article = self.store.validate(record)
+                except ValueError as e:
+                    self._error(number, record.get("id"), str(e))
+                    continue
+                self.upserted[article.id] = None
+            return
+
+        operations = [{"op": "upsert", "article": record} for _, record in batch]
+        try:
+            result = self.store.apply_batch(operations, self._current, self._located)
+        except BatchError as e:
+            # Drop the invalid records and write the rest; nothing was written on the first try
+            rejected = {error["index"] for error in e.errors}
+            for error in e.errors:
+                self._error(batch[error["index"]][0], error["id"], error["error"])
+            operations = [op for index, op in enumerate(operations) if index not in rejected]
+            if not operations:
+                return
+            result = self.store.apply_batch(operations, self._current, self._located)
+        for article_id in result.upserted:
+            self.upserted[article_id] = None
+        self.paths.update(result.paths)
+        self.categories.update(result.categories)
+        self.tags.update(result.tags)
+
+    def _error(self, number: int, article_id: Optional[str], message: str):
+        self.error_count += 1
+        if len(self.errors) < settings.transfer_max_errors:
+            self.errors.append({"line": number, "id": article_id, "error": message})
@@ -0,0 +1,291 @@
+"""
+Offline chat over the portfolio catalog.
+
+Questions are answered by retrieval plus templates, with no external
+services:
+
+- ``ChatIndex`` turns ``PortfolioData`` into small documents (profile,
+  contact, one per project, article, certification and degree, one per
+  tech-stack category) and indexes them for BM25 scoring. It is rebuilt
+  when the catalog generation changes.
+- ``TemplateAnswerGenerator`` writes the answer from the top hits, one
+  sentence at a time.
+- ``ChatEngine`` ties them together, streams Server-Sent Events, and keeps
+  an LRU cache of answers keyed by normalized question and generation.
+"""
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.models.portfolio import PortfolioData
+from app.services.portfolio_service import OptimizedPortfolioService, portfolio_service
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+_STOPWORDS = frozenset(
+    "a an and are about any can could did do does for from has have he him his how i in is it "
+    "me my of on or tell that the this to was what when where which why will with you your".split()
+)
+# Question words that point at a kind of document
+_INTENTS = {
+    "contact": {"contact", "email", "reach", "hire", "linkedin", "github", "twitter", "medium", "touch"},
+    "tech": {"skill", "technology", "tech", "stack", "tool", "language", "framework", "know"},
+    "project": {"project", "built", "build", "work", "portfolio", "demo"},
+    "article": {"article", "blog", "write", "wrote", "post", "note", "noteonai", "read"},
+    "education": {"education", "degree", "study", "studied", "university", "msc", "background", "experience"},
+    "certification": {"certification", "certificate", "certified", "credential"},
+    "profile": {"who", "yourself", "bio", "location", "experience", "background"},
+}
+_INTENT_BOOST = 1.5
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords dropped and plurals folded."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass
+class ChatDocument:
+    """A retrievable unit of portfolio data."""
+    kind: str
+    title: str
+    text: str
+    url: Optional[str] = None
+    fields: Dict[str, object] = field(default_factory=dict)
+
+
+class ChatIndex:
+    """BM25 index over documents derived from the portfolio data."""
+
+    def __init__(self, data: PortfolioData):
+        self.documents = self._documents(data)
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lengths: List[int] = []
+        self.by_kind: Dict[str, List[int]] = defaultdict(list)
+        for doc_id, document in enumerate(self.documents):
+            self.by_kind[document.kind].append(doc_id)
+            tokens = tokenize(f"{document.title} {document.title} {document.text}")
+            self.lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                self.postings[term].append((doc_id, count))
+
+        total = len(self.documents) or 1
+        self.average_length = (sum(self.lengths) / total) or 1.0
+        self.idf = {
+            term: math.log(1 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for term, posting in self.postings.items()
+        }
+
+    def search(self, question: str, limit: int) -> List[Tuple[ChatDocument, float]]:
+        """Top documents for a question, boosted by the kind of thing it asks about."""
+        tokens = tokenize(question)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokens):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = _K1 * (1 - _B + _B * self.lengths[doc_id] / self.average_length)
+                scores[doc_id] += idf * tf * (_K1 + 1) / (tf + norm)
+
+        intents = {kind for kind, words in _INTENTS.items() if words.intersection(tokens)}
+        for kind in intents:
+            matched = [doc_id for doc_id in scores if self.documents[doc_id].kind == kind]
+            for doc_id in matched:
+                scores[doc_id] = scores[doc_id] * _INTENT_BOOST + 1.0
+            if not matched:
+                # Nothing matched lexically: fall back to the first documents of that kind
+                for doc_id in self.by_kind.get(kind, [])[:limit]:
+                    scores[doc_id] = 1.0
+
+        # Documents of the kind asked about rank ahead of incidental word matches
+        ranked = heapq.nlargest(
+            limit,
+            scores.items(),
+            key=lambda pair: (self.documents[pair[0]].kind in intents, pair[1], -pair[0])
+        )
+        return [(self.documents[doc_id], round(score, 3)) for doc_id, score in ranked if score > 0]
+
+    @staticmethod
+    def _documents(data: PortfolioData) -> List[ChatDocument]:
+        person = data.personal_info
+        contact = data.contact_info
+        documents = [
+            ChatDocument(
+                "profile", person.name,
+                f"{person.title} {person.intro} {person.bio} {person.location or ''}",
+                fields={"name": person.name, "title": person.title, "bio": person.bio, "location": person.location}
+            ),
+            ChatDocument(
+                "contact", "Contact",
+                "email contact linkedin github twitter medium reach hire",
+                fields=contact.model_dump()
+            ),
+        ]
+        for project in data.projects:
+            documents.append(ChatDocument(
+                "project", project.title,
+                f"{project.description} {project.long_description or ''} {project.category} {' '.join(project.tech_stack)}",
+                url=project.demo_url or project.github_url,
+                fields={"description": project.description, "tech_stack": project.tech_stack}
+            ))
+        for article in data.articles:
+            documents.append(ChatDocument(
+                "article", article.title,
+                f"{article.excerpt} {article.category} {' '.join(article.tags)}",
+                url=article.external_url or f"/noteonai/{article.id}",
+                fields={"excerpt": article.excerpt, "category": article.category, "read_time": article.read_time}
+            ))
+        for certification in data.certifications:
+            documents.append(ChatDocument(
+                "certification", certification.title,
+                f"{certification.issuer} {certification.year} {certification.description or ''}",
+                url=certification.credential_url,
+                fields={"issuer": certification.issuer, "year": certification.year}
+            ))
+        for education in data.education:
+            documents.append(ChatDocument(
+                "education", education.degree,
+                f"{education.institution} {education.year} {education.description or ''}",
+                fields={"institution": education.institution, "year": education.year, "current": education.current}
+            ))
+        by_category: Dict[str, List[str]] = defaultdict(list)
+        for tech in data.tech_stack:
+            by_category[tech.category].append(tech.name)
+        for category, names in by_category.items():
+            documents.append(ChatDocument(
+                "tech", category, " ".join(names), fields={"names": names}
+            ))
+        return documents
+
+
+class TemplateAnswerGenerator:
+    """Writes answers from retrieved documents with fixed sentence templates."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.first_name = name.split()[0]
+
+    def generate(self, hits: List[Tuple[ChatDocument, float]]) -> Iterator[str]:
+        if not hits:
+            yield (
+                f"I couldn't find anything about that in {self.first_name}'s portfolio. "
+                f"Try asking about {self.first_name}'s experience, skills, projects, articles or how to get in touch."
+            )
+            return
+
+        lead_kind = hits[0][0].kind
+        yield self._lead(lead_kind)
+        for document, _ in hits:
+            if document.kind == lead_kind or document.kind in ("contact", "profile"):
+                yield " " + self._sentence(document)
+
+    def _lead(self, kind: str) -> str:
+        return {
+            "project": f"Here are projects {self.first_name} has built:",
+            "article": f"{self.first_name} has written about this:",
+            "tech": f"Here's what {self.first_name} works with:",
+            "education": f"{self.first_name}'s education:",
+            "certification": f"{self.first_name} holds these certifications:",
+            "contact": f"You can get in touch with {self.first_name}:",
+            "profile": f"About {self.first_name}:",
+        }.get(kind, "Here's what I found:")
+
+    def _sentence(self, document: ChatDocument) -> str:
+        f = document.fields
+        if document.kind == "project":
+            sentence = f"{document.title}: {f['description']} Built with {', '.join(f['tech_stack'][:5])}."
+        elif document.kind == "article":
+            sentence = f"\"{document.title}\" ({f['category']}, {f['read_time']} min read): {f['excerpt']}"
+        elif document.kind == "tech":
+            sentence = f"{document.title}: {', '.join(f['names'])}."
+        elif document.kind == "education":
+            status = "currently studying" if f["current"] else "completed"
+            sentence = f"{document.title} at {f['institution']} ({f['year']}, {status})."
+        elif document.kind == "certification":
+            sentence = f"{document.title}, issued by {f['issuer']} in {f['year']}."
+        elif document.kind == "contact":
+            return f"Email {f['email']}, or connect on LinkedIn ({f['linkedin']}) and GitHub ({f['github']})."
+        else:
+            location = f" based in {f['location']}" if f.get("location") else ""
+            return f"{f['name']} is a {f['title']}{location}. {f['bio']}"
+        return f"{sentence} ({document.url})" if document.url else sentence
+
+
+class ChatEngine:
+    """Answers questions over the catalog, streaming them as Server-Sent Events."""
+
+    def __init__(self, service: OptimizedPortfolioService = portfolio_service):
+        self.service = service
+        self.top_k = settings.chat_top_k
+        self.cache_size = settings.chat_cache_size
+        self._index: Optional[ChatIndex] = None
+        self._generation: Optional[int] = None
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[List[dict], List[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index(self) -> ChatIndex:
+        with self._lock:
+            snapshot = self.service.snapshot
+            if self._generation != snapshot.generation:
+                self._index = ChatIndex(snapshot.data)
+                self._generation = snapshot.generation
+            return self._index
+
+    def answer(self, question: str) -> Tuple[List[dict], List[str], bool]:
+        """Return (sources, answer chunks, cached) for a question."""
+        index = self.index()
+        key = (" ".join(tokenize(question)), self._generation)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                sources, chunks = self._cache[key]
+                return sources, chunks, True
+
+        hits = index.search(question, self.top_k)
+        sources = [
+            {"kind": document.kind, "title": document.title, "url": document.url, "score": score}
+            for document, score in hits
+        ]
+        generator = TemplateAnswerGenerator(self.service.personal_info.name)
+        chunks = list(generator.generate(hits))
+
+        with self._lock:
+            self._cache[key] = (sources, chunks)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return sources, chunks, False
+
+    def stream(self, question: str) -> Iterator[str]:
+        """SSE events: ``sources``, then one ``message`` per answer chunk, then ``done``."""
+        sources, chunks, cached = self.answer(question)
+        yield _sse({"sources": sources, "cached": cached}, event="sources")
+        for chunk in chunks:
+            yield _sse({"delta": chunk})
+        yield _sse({"answer": "".join(chunks)}, event="done")
+
+
+def _sse(payload: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+# Global chat engine instance
+chat_engine = ChatEngine()
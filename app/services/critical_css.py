@@ -0,0 +1,516 @@
+"""
+Critical CSS: the rules each page needs for its first paint, inlined in <head>.
+
+``styles-modular.css`` ``@import``s a dozen module files, so a first visit
+waits on two round trips of render-blocking CSS before anything is drawn.
+The build step (``python -m app.services.critical_css``, run by
+``render-build.sh``) writes to ``critical_css_dir``:
+
+    styles.<hash>.css   the stylesheet with its imports flattened (one request)
+    <page>.css          the rules that match the page's first
+                        ``critical_css_fold_elements`` elements, in cascade
+                        order, plus the @keyframes they use
+    manifest.json       file names, the source hash and byte/request counts
+
+A page opts in with ``{% set critical_page = "index" %}``; ``base.html``
+then inlines ``critical_css(critical_page)`` and loads the bundle without
+blocking render (``rel=preload``, with a <noscript> fallback). When the build
+is missing or older than the stylesheets, ``critical_css()`` returns "" and
+the page keeps its ordinary blocking <link>.
+
+Selectors are matched against the rendered HTML with a small matcher:
+pseudo-classes, ``:not()`` and sibling combinators are treated as matching,
+so uncertain rules are kept rather than dropped.
+"""
+import argparse
+import hashlib
+import json
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from markupsafe import Markup
+
+from app.core.config import settings
+from app.core.utils import atomic_write_bytes
+
+STYLESHEET = "css/styles-modular.css"  # Relative to static_dir
+
+# Page name -> (template, ContextBuilder method)
+PAGES = {
+    "index": ("pages/index.html", "build_home_context"),
+    "projects": ("pages/projects.html", "build_projects_context"),
+    "noteonai": ("pages/noteonai.html", "build_noteonai_context"),
+}
+
+_STRING = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'""")
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_IMPORT = re.compile(r"""@import\s+(?:url\(\s*)?["']?([^"')\s;]+)["']?\s*\)?\s*;""")
+_GROUPING = ("@media", "@supports", "@layer", "@document")
+_ANIMATION = re.compile(r"animation(?:-name)?\s*:\s*([^;}]+)")
+_IDENT = r"(?:\\.|[\w-])+"
+_SIMPLE = re.compile(rf"\*|{_IDENT}|#{_IDENT}|\.{_IDENT}|\[[^\]]*\]|::?{_IDENT}")
+_PSEUDO = re.compile(rf"::?{_IDENT}")
+_ATTRIBUTE = re.compile(r"""\[\s*([\w-]+)\s*(?:([~|^$*]?=)\s*["']?(.*?)["']?\s*(?:\s[is])?)?\]""")
+_VOID = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+# Stylesheet text
+def _outside_strings(text: str, func) -> str:
+    """Apply ``func`` to the parts of ``text`` that are not string literals."""
+    parts = []
+    position = 0
+    for match in _STRING.finditer(text):
+        parts.append(func(text[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(func(text[position:]))
+    return "".join(parts)
+
+
+def _strip_comments(css: str) -> str:
+    return _outside_strings(css, lambda part: _COMMENT.sub("", part))
+
+
+def minify(css: str) -> str:
+    """Drop comments and the whitespace CSS does not need."""
+    def squeeze(part: str) -> str:
+        part = re.sub(r"\s+", " ", _COMMENT.sub("", part))
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        return part.replace(";}", "}")
+    return _outside_strings(css, squeeze).strip()
+
+
+def flatten(path: Path, seen: Optional[Set[Path]] = None) -> str:
+    """A stylesheet with its local ``@import``s replaced by the imported files' text."""
+    seen = set() if seen is None else seen
+    path = path.resolve()
+    if path in seen:
+        return ""
+    seen.add(path)
+
+    def replace(match: re.Match) -> str:
+        target = match.group(1)
+        if "://" in target or target.startswith("//"):
+            return match.group()
+        return flatten(path.parent / target, seen)
+
+    return _IMPORT.sub(replace, _strip_comments(path.read_text(encoding="utf-8")))
+
+
+def source_hash(css: str) -> str:
+    return hashlib.sha256(css.encode("utf-8")).hexdigest()
+
+
+def _find(text: str, chars: str, position: int) -> int:
+    """Index of the first of ``chars`` at or after ``position`` outside strings, or -1."""
+    while position < len(text):
+        char = text[position]
+        if char in chars:
+            return position
+        if char in "\"'":
+            match = _STRING.match(text, position)
+            position = match.end() if match else len(text)
+            continue
+        position += 1
+    return -1
+
+
+def parse(css: str, position: int = 0) -> Tuple[List[tuple], int]:
+    """Parse comment-free CSS into ``("rule", selectors, body)``, ``("group", prelude, items)``,
+    ``("block", prelude, body)`` (other at-rules with a body) and ``("statement", text)`` items."""
+    items: List[tuple] = []
+    while True:
+        end = _find(css, "{};", position)
+        if end < 0 or css[end] == "}":
+            return items, (len(css) if end < 0 else end + 1)
+        prelude = css[position:end].strip()
+        if css[end] == ";":
+            if prelude:
+                items.append(("statement", prelude + ";"))
+            position = end + 1
+            continue
+        if prelude.startswith(_GROUPING):
+            children, position = parse(css, end + 1)
+            items.append(("group", prelude, children))
+            continue
+        depth, close = 1, end
+        while depth:
+            close = _find(css, "{}", close + 1)
+            if close < 0:
+                close = len(css)
+                break
+            depth += 1 if css[close] == "{" else -1
+        body = css[end + 1:close].strip()
+        items.append(("block" if prelude.startswith("@") else "rule", prelude, body))
+        position = close + 1
+
+
+# Rendered HTML
+class Element:
+    __slots__ = ("tag", "id", "classes", "attrs", "parent", "previous", "hidden")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Element"], previous: Optional["Element"]):
+        self.tag = tag
+        self.id = attrs.get("id")
+        self.classes = set((attrs.get("class") or "").split())
+        self.attrs = attrs
+        self.parent = parent
+        self.previous = previous
+        # Not painted: the hidden attribute, or Tailwind's "hidden" without a responsive display class
+        self.hidden = (parent is not None and parent.hidden) or "hidden" in attrs or (
+            "hidden" in self.classes and not any(":" in name for name in self.classes)
+        )
+
+
+class _FoldParser(HTMLParser):
+    """Collects <html>, <body> and the first ``limit`` visible elements inside <body>, in document order."""
+
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.elements: List[Element] = []
+        self._stack: List[Element] = []
+        self._last_child: Dict[Optional[Element], Element] = {}  # Parent -> its latest child
+        self._in_body = 0
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1] if self._stack else None
+        element = Element(tag, {name: value or "" for name, value in attrs}, parent, self._last_child.get(parent))
+        self._last_child[parent] = element
+        if tag in ("html", "body") or (self._in_body and self._in_body <= self.limit and not element.hidden):
+            self.elements.append(element)
+            if self._in_body:
+                self._in_body += 1
+        if tag == "body":
+            self._in_body = 1
+        if tag not in _VOID:
+            self._stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID:
+            self._stack.pop()
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+
+def above_the_fold(html: str, limit: int) -> List[Element]:
+    parser = _FoldParser(limit)
+    parser.feed(html)
+    parser.close()
+    return parser.elements
+
+
+# Selector matching
+def _unescape(ident: str) -> str:
+    return re.sub(r"\\(.)", r"\1", ident)
+
+
+def _compound(text: str) -> Optional[Dict[str, Any]]:
+    """A compound selector's type, id, classes and attribute tests; None if it cannot be parsed."""
+    compound: Dict[str, Any] = {"tag": None, "ids": [], "classes": [], "attrs": []}
+    position = 0
+    while position < len(text):
+        if text[position] == ":":
+            # Pseudo-classes and pseudo-elements never rule a match out (":root" is <html>)
+            match = _PSEUDO.match(text, position)
+            if not match:
+                return None
+            if match.group() == ":root":
+                compound["tag"] = "html"
+            position = match.end()
+            if position < len(text) and text[position] == "(":
+                depth = 0
+                while position < len(text):
+                    depth += {"(": 1, ")": -1}.get(text[position], 0)
+                    position += 1
+                    if depth == 0:
+                        break
+            continue
+        match = _SIMPLE.match(text, position)
+        if not match:
+            return None
+        token = match.group()
+        if token[0] == "#":
+            compound["ids"].append(_unescape(token[1:]))
+        elif token[0] == ".":
+            compound["classes"].append(_unescape(token[1:]))
+        elif token[0] == "[":
+            attribute = _ATTRIBUTE.match(token)
+            if attribute:
+                compound["attrs"].append(attribute.groups())
+        elif token != "*":
+            compound["tag"] = token.lower()
+        position = match.end()
+    return compound
+
+
+def _complex(selector: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+    """A complex selector as (combinator, compound) pairs, rightmost first."""
+    tokens = re.split(r"\s*([>+~])\s*|\s+", selector.strip())
+    parts: List[Tuple[str, Dict[str, Any]]] = []
+    combinator = " "
+    for token in tokens:
+        if token is None or token == "":
+            continue
+        if token in (">", "+", "~"):
+            combinator = token
+            continue
+        compound = _compound(token)
+        if compound is None:
+            return None
+        parts.append((combinator, compound))
+        combinator = " "
+    # Each compound carries the combinator linking it to the one on its left
+    return list(reversed(parts)) or None
+
+
+def _matches_compound(element: Element, compound: Dict[str, Any]) -> bool:
+    if compound["tag"] and compound["tag"] != element.tag:
+        return False
+    if any(element.id != value for value in compound["ids"]):
+        return False
+    if not element.classes.issuperset(compound["classes"]):
+        return False
+    for name, operator, value in compound["attrs"]:
+        actual = element.attrs.get(name)
+        if actual is None:
+            return False
+        if operator == "=" and actual != value:
+            return False
+        if operator == "~=" and value not in actual.split():
+            return False
+        if operator == "^=" and not actual.startswith(value):
+            return False
+        if operator == "$=" and not actual.endswith(value):
+            return False
+        if operator == "*=" and value not in actual:
+            return False
+        if operator == "|=" and actual != value and not actual.startswith(value + "-"):
+            return False
+    return True
+
+
+def _matches(element: Optional[Element], parts: List[Tuple[str, Dict[str, Any]]], index: int = 0) -> bool:
+    if element is None or not _matches_compound(element, parts[index][1]):
+        return False
+    if index + 1 == len(parts):
+        return True
+    combinator = parts[index][0]
+    if combinator == ">":
+        return _matches(element.parent, parts, index + 1)
+    if combinator in ("+", "~"):
+        sibling = element.previous
+        while sibling is not None:
+            if _matches(sibling, parts, index + 1):
+                return True
+            sibling = sibling.previous
+        return False
+    ancestor = element.parent
+    while ancestor is not None:
+        if _matches(ancestor, parts, index + 1):
+            return True
+        ancestor = ancestor.parent
+    return False
+
+
+def _split_selectors(selectors: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(selectors):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(selectors[start:index])
+            start = index + 1
+    parts.append(selectors[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def selector_matches(selectors: str, elements: List[Element]) -> bool:
+    """True if any selector in the list matches any of ``elements`` (or cannot be parsed)."""
+    for selector in _split_selectors(selectors):
+        parts = _complex(selector)
+        if parts is None or any(_matches(element, parts) for element in elements):
+            return True
+    return False
+
+
+# Extraction
+def extract(items: List[tuple], elements: List[Element]) -> str:
+    """The critical subset of parsed stylesheet ``items`` for ``elements``, minified."""
+    animations: Set[str] = set()
+    for element in elements:
+        for value in _ANIMATION.findall(element.attrs.get("style", "")):
+            animations.update(re.findall(r"[\w-]+", value))
+
+    def keep(items: List[tuple]) -> List[str]:
+        output = []
+        for item in items:
+            kind = item[0]
+            if kind == "rule" and selector_matches(item[1], elements):
+                for value in _ANIMATION.findall(item[2]):
+                    animations.update(re.findall(r"[\w-]+", value))
+                output.append(f"{item[1]}{{{item[2]}}}")
+            elif kind == "group":
+                inner = keep(item[2])
+                if inner:
+                    output.append(f"{item[1]}{{{''.join(inner)}}}")
+            elif kind == "block" and item[1].startswith("@font-face"):
+                output.append(f"{item[1]}{{{item[2]}}}")
+            elif kind == "statement" and item[1].startswith("@charset"):
+                output.append(item[1])
+        return output
+
+    output = keep(items)
+    for item in items:
+        if item[0] == "block" and item[1].startswith(("@keyframes", "@-webkit-keyframes")):
+            if item[1].split(None, 1)[-1].strip() in animations:
+                output.append(f"{item[1]}{{{item[2]}}}")
+    return minify("".join(output))
+
+
+def _count_rules(items: List[tuple]) -> int:
+    return sum(_count_rules(item[2]) if item[0] == "group" else 1 for item in items)
+
+
+def _import_graph(path: Path) -> Tuple[int, int, int]:
+    """Render-blocking requests, bytes and round trips for a stylesheet loaded with @import."""
+    requests, size, depth = 1, path.stat().st_size, 1
+    for target in _IMPORT.findall(_strip_comments(path.read_text(encoding="utf-8"))):
+        if "://" in target or target.startswith("//"):
+            continue
+        child = _import_graph(path.parent / target)
+        requests += child[0]
+        size += child[1]
+        depth = max(depth, child[2] + 1)
+    return requests, size, depth
+
+
+def build(output_dir: Optional[str] = None, fold_elements: Optional[int] = None) -> Dict[str, Any]:
+    """Write the bundle, per-page critical CSS and manifest; returns the manifest."""
+    from app.core.templates import template_manager
+    from app.routes.pages import ContextBuilder
+
+    output = Path(output_dir or settings.critical_css_dir)
+    fold_elements = fold_elements or settings.critical_css_fold_elements
+    entry = Path(settings.static_dir) / STYLESHEET
+    source = flatten(entry)
+    digest = source_hash(source)
+    bundle = minify(source)
+    bundle_name = f"styles.{digest[:12]}.css"
+    items, _ = parse(source)
+
+    output.mkdir(parents=True, exist_ok=True)
+    for stale in output.glob("styles.*.css"):
+        if stale.name != bundle_name:
+            stale.unlink()
+    atomic_write_bytes(output / bundle_name, bundle.encode("utf-8"))
+
+    requests, size, depth = _import_graph(entry)
+    manifest: Dict[str, Any] = {
+        "source_hash": digest,
+        "stylesheet": bundle_name,
+        "fold_elements": fold_elements,
+        "rules": _count_rules(items),
+        "before": {"blocking_requests": requests, "blocking_bytes": size, "round_trips": depth},
+        "after": {"blocking_requests": 0, "deferred_requests": 1, "deferred_bytes": len(bundle.encode("utf-8"))},
+        "pages": {},
+    }
+    for page, (template, builder) in PAGES.items():
+        html = template_manager.render_to_string(template, getattr(ContextBuilder, builder)(None))
+        elements = above_the_fold(html, fold_elements)
+        critical = extract(items, elements)
+        atomic_write_bytes(output / f"{page}.css", critical.encode("utf-8"))
+        manifest["pages"][page] = {
+            "file": f"{page}.css",
+            "elements": len(elements),
+            "rules": _count_rules(parse(critical)[0]),
+            "inline_bytes": len(critical.encode("utf-8")),
+        }
+    atomic_write_bytes(output / "manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+class CriticalCSS:
+    """Serves the build's critical CSS to templates; disabled while the build is missing or stale."""
+
+    def __init__(self, directory: Optional[str] = None, enabled: Optional[bool] = None):
+        self.directory = Path(directory or settings.critical_css_dir)
+        self.enabled = settings.critical_css_enabled if enabled is None else enabled
+        self._pages: Optional[Dict[str, Markup]] = None
+        self._stylesheet = ""
+
+    def __call__(self, page: Optional[str]) -> Markup:
+        """The page's critical CSS, ready to go inside <style>; empty without a current build."""
+        if not page:
+            return Markup("")
+        return self._load().get(page, Markup(""))
+
+    @property
+    def stylesheet(self) -> str:
+        """URL of the flattened stylesheet loaded after first paint."""
+        self._load()
+        return self._stylesheet
+
+    def reload(self):
+        self._pages = None
+
+    def _load(self) -> Dict[str, Markup]:
+        if self._pages is not None:
+            return self._pages
+        pages: Dict[str, Markup] = {}
+        if self.enabled:
+            try:
+                pages = self._read()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Critical CSS not loaded, pages use the blocking stylesheet: {e}")
+        self._pages = pages
+        return pages
+
+    def _read(self) -> Dict[str, Markup]:
+        manifest_path = self.directory / "manifest.json"
+        if not manifest_path.exists():
+            return {}
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest["source_hash"] != source_hash(flatten(Path(settings.static_dir) / STYLESHEET)):
+            print("Critical CSS is older than the stylesheets; run python -m app.services.critical_css")
+            return {}
+        url = "/static/" + (self.directory / manifest["stylesheet"]).resolve().relative_to(
+            Path(settings.static_dir).resolve()
+        ).as_posix()
+        pages = {}
+        for page, entry in manifest["pages"].items():
+            css = (self.directory / entry["file"]).read_text(encoding="utf-8")
+            pages[page] = Markup(css.replace("</", "<\\/"))
+        self._stylesheet = url
+        return pages
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the critical CSS for each page and the flattened stylesheet.")
+    parser.add_argument("--output", default=None, help="Output directory (default: critical_css_dir)")
+    parser.add_argument("--fold-elements", type=int, default=None, help="Elements counted as above the fold")
+    args = parser.parse_args(argv)
+
+    manifest = build(args.output, args.fold_elements)
+    print(json.dumps(manifest, indent=2))
+    return manifest
+
+
+# Global critical CSS instance
+critical_css = CriticalCSS()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+RSS/Atom feeds and sitemap.xml, pre-rendered per catalog generation.
+
+Every article's feed item, Atom entry and sitemap ``<url>`` are rendered
+once and cached as XML fragments. When the portfolio service refreshes with
+a known change set (admin save/delete, bulk import) only the changed
+articles are re-rendered and the documents are re-joined from the cached
+fragments; sitemap shards whose contents did not change keep their bytes
+and ETag. A refresh without a change set rebuilds everything.
+
+Articles are laid out in the sitemap oldest first, so new posts land in the
+last shard. Once there are more URLs than ``sitemap_shard_size``,
+``sitemap.xml`` becomes a sitemap index pointing at ``sitemaps/sitemap-<n>.xml``.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from app.core.config import settings
+from app.models.portfolio import Article
+from app.services.portfolio_service import CatalogChange, OptimizedPortfolioService, portfolio_service
+
+RSS_MEDIA_TYPE = "application/rss+xml"
+ATOM_MEDIA_TYPE = "application/atom+xml"
+XML_MEDIA_TYPE = "application/xml"
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+@dataclass(frozen=True)
+class RenderedDocument:
+    """A pre-rendered XML document with its validator."""
+    body: bytes
+    etag: str
+    media_type: str
+
+
+def _document(text: str, media_type: str) -> RenderedDocument:
+    body = text.encode("utf-8")
+    return RenderedDocument(body, f'"{hashlib.sha1(body).hexdigest()[:20]}"', media_type)
+
+
+def _utc(value: datetime) -> datetime:
+    # Article dates are stored naive; treat them as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _w3c(value: datetime) -> str:
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FeedService:
+    """Keeps feed and sitemap documents in step with the portfolio catalog."""
+
+    def __init__(
+        self,
+        service: OptimizedPortfolioService = portfolio_service,
+        site_url: Optional[str] = None,
+        max_items: Optional[int] = None,
+        shard_size: Optional[int] = None,
+        listen: bool = True
+    ):
+        self.service = service
+        self.site_url = (site_url or settings.site_url).rstrip("/")
+        self.max_items = max_items or settings.feed_max_items
+        self.shard_size = shard_size or settings.sitemap_shard_size
+        self.generation: Optional[int] = None
+
+        # Per-article fragments: id -> (rss item, atom entry, sitemap url or None)
+        self._fragments: Dict[str, Tuple[str, str, Optional[str]]] = {}
+        self._shard_ids: List[List[str]] = []
+        self._documents: Dict[str, RenderedDocument] = {}
+        self._lock = threading.Lock()
+
+        if listen:
+            service.add_listener(self._on_change)
+
+    # Public API
+    def get(self, name: str) -> Optional[RenderedDocument]:
+        """Return a document by path (``feed.xml``, ``sitemaps/sitemap-2.xml``, ...)."""
+        with self._lock:
+            if self.generation != self.service.generation:
+                self._rebuild()
+            return self._documents.get(name)
+
+    def documents(self) -> Dict[str, RenderedDocument]:
+        """All current documents keyed by path, for static export."""
+        with self._lock:
+            if self.generation != self.service.generation:
+                self._rebuild()
+            return dict(self._documents)
+
+    def article_url(self, article: Article) -> str:
+        """Where an article is read: its external post, else the on-site page."""
+        return article.external_url or f"{self.site_url}/noteonai/{article.id}"
+
+    # Change handling
+    def _on_change(self, change: CatalogChange):
+        with self._lock:
+            if self.generation is None:
+                return  # Nothing built yet; the first request builds from scratch
+            if change.full:
+                self._rebuild()
+            else:
+                self._patch(change.upserted, change.removed)
+
+    def _rebuild(self):
+        self._fragments = {a.id: self._render_article(a) for a in self.service.articles}
+        self._shard_ids = []
+        self._documents = {}
+        self._assemble(changed=None)
+
+    def _patch(self, upserted: Iterable[str], removed: Iterable[str]):
+        changed = set()
+        for article_id in removed:
+            self._fragments.pop(article_id, None)
+            changed.add(article_id)
+        for article_id in upserted:
+            article = self.service.get_article_by_id(article_id)
+            if article:
+                self._fragments[article_id] = self._render_article(article)
+            else:
+                self._fragments.pop(article_id, None)
+            changed.add(article_id)
+        self._assemble(changed=changed)
+
+    # Rendering
+    def _render_article(self, article: Article) -> Tuple[str, str, Optional[str]]:
+        link = escape(self.article_url(article))
+        title = escape(article.title)
+        excerpt = escape(article.excerpt)
+        categories = "".join(
+            f"<category>{escape(term)}</category>" for term in [article.category, *article.tags]
+        )
+        rss_item = (
+            f"<item><title>{title}</title><link>{link}</link>"
+            f'<guid isPermaLink="false">{escape(article.primary_id)}</guid>'
+            f"<pubDate>{format_datetime(_utc(article.published_date))}</pubDate>"
+            f"<description>{excerpt}</description>{categories}</item>"
+        )
+
+        terms = "".join(
+            f"<category term={quoteattr(term)}/>" for term in [article.category, *article.tags]
+        )
+        atom_entry = (
+            f"<entry><title>{title}</title><link href={quoteattr(self.article_url(article))}/>"
+            f"<id>urn:uuid:{escape(article.primary_id)}</id>"
+            f"<published>{_w3c(article.published_date)}</published>"
+            f"<updated>{_w3c(article.published_date)}</updated>"
+            f"<summary>{excerpt}</summary>{terms}</entry>"
+        )
+
+        # Only on-site pages belong in this host's sitemap
+        sitemap_url = None
+        if not article.external_url:
+            sitemap_url = self._url_entry(self.article_url(article), article.published_date)
+        return rss_item, atom_entry, sitemap_url
+
+    @staticmethod
+    def _url_entry(loc: str, lastmod: Optional[datetime]) -> str:
+        lastmod_tag = f"<lastmod>{_w3c(lastmod)}</lastmod>" if lastmod else ""
+        return f"<url><loc>{escape(loc)}</loc>{lastmod_tag}</url>"
+
+    def _page_entries(self) -> List[str]:
+        articles = self.service.articles
+        projects = [p for p in self.service.projects if p.created_date]
+        latest_article = articles[0].published_date if articles else None
+        latest_project = max((p.created_date for p in projects), default=None)
+        latest = max(filter(None, [latest_article, latest_project]), key=_utc, default=None)
+        return [
+            self._url_entry(f"{self.site_url}/", latest),
+            self._url_entry(f"{self.site_url}/projects", latest_project),
+            self._url_entry(f"{self.site_url}/noteonai", latest_article),
+        ]
+
+    # Assembly
+    def _assemble(self, changed: Optional[set]):
+        """Join cached fragments into documents; ``changed=None`` means re-join all shards."""
+        articles = self.service.articles  # Newest first
+        self._documents["feed.xml"] = self._rss(articles[:self.max_items])
+        self._documents["atom.xml"] = self._atom(articles[:self.max_items])
+
+        page_entries = self._page_entries()
+        ordered = [a.id for a in reversed(articles) if self._fragments[a.id][2]]
+        slots = len(page_entries) + len(ordered)
+
+        if slots <= self.shard_size:
+            self._shard_ids = []
+            self._drop_shards(0)
+            entries = page_entries + [self._fragments[i][2] for i in ordered]
+            self._documents["sitemap.xml"] = self._urlset(entries)
+        else:
+            # Pages occupy the head of the first shard
+            first = self.shard_size - len(page_entries)
+            shard_ids = [ordered[:first]] + [
+                ordered[start:start + self.shard_size]
+                for start in range(first, len(ordered), self.shard_size)
+            ]
+            for index, ids in enumerate(shard_ids):
+                name = f"sitemaps/sitemap-{index + 1}.xml"
+                unchanged = (
+                    changed is not None
+                    and index > 0
+                    and index < len(self._shard_ids)
+                    and self._shard_ids[index] == ids
+                    and not changed.intersection(ids)
+                    and name in self._documents
+                )
+                if unchanged:
+                    continue
+                entries = [self._fragments[i][2] for i in ids]
+                if index == 0:
+                    entries = page_entries + entries
+                self._documents[name] = self._urlset(entries)
+            self._drop_shards(len(shard_ids))
+            self._shard_ids = shard_ids
+            published = {a.id: a.published_date for a in articles}
+            # Shards run oldest first, so a shard's newest URL is its last one
+            lastmods = [published[ids[-1]] if ids else None for ids in shard_ids]
+            if articles:
+                # The first shard also carries the listing pages, which change with every post
+                lastmods[0] = articles[0].published_date
+            self._documents["sitemap.xml"] = self._sitemap_index(lastmods)
+
+        self.generation = self.service.generation
+
+    def _drop_shards(self, keep: int):
+        for name in [n for n in self._documents if n.startswith("sitemaps/")]:
+            if int(name.rsplit("-", 1)[1].split(".")[0]) > keep:
+                del self._documents[name]
+
+    def _rss(self, articles: List[Article]) -> RenderedDocument:
+        last_build = f"<lastBuildDate>{format_datetime(_utc(articles[0].published_date))}</lastBuildDate>" if articles else ""
+        text = (
+            f'{_XML_DECLARATION}<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+            f"<title>{escape(settings.app_name)} - NoteOnAI</title>"
+            f"<link>{escape(self.site_url)}/noteonai</link>"
+            f"<description>{escape(settings.app_description)}</description>"
+            f'<atom:link href={quoteattr(self.site_url + "/feed.xml")} rel="self" type="{RSS_MEDIA_TYPE}"/>'
+            f"{last_build}{''.join(self._fragments[a.id][0] for a in articles)}"
+            "</channel></rss>"
+        )
+        return _document(text, RSS_MEDIA_TYPE)
+
+    def _atom(self, articles: List[Article]) -> RenderedDocument:
+        updated = _w3c(articles[0].published_date) if articles else _w3c(datetime(1970, 1, 1))
+        text = (
+            f'{_XML_DECLARATION}<feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{escape(settings.app_name)} - NoteOnAI</title>"
+            f"<id>{escape(self.site_url)}/atom.xml</id>"
+            f'<link href={quoteattr(self.site_url + "/atom.xml")} rel="self"/>'
+            f'<link href={quoteattr(self.site_url + "/noteonai")}/>'
+            f"<updated>{updated}</updated>"
+            f"<author><name>{escape(settings.app_name)}</name></author>"
+            f"{''.join(self._fragments[a.id][1] for a in articles)}"
+            "</feed>"
+        )
+        return _document(text, ATOM_MEDIA_TYPE)
+
+    @staticmethod
+    def _urlset(entries: List[str]) -> RenderedDocument:
+        text = f'{_XML_DECLARATION}<urlset xmlns="{_SITEMAP_NS}">{"".join(entries)}</urlset>'
+        return _document(text, XML_MEDIA_TYPE)
+
+    def _sitemap_index(self, lastmods: List[Optional[datetime]]) -> RenderedDocument:
+        entries = "".join(
+            f"<sitemap><loc>{escape(self.site_url)}/sitemaps/sitemap-{n}.xml</loc>"
+            f"{f'<lastmod>{_w3c(lastmod)}</lastmod>' if lastmod else ''}</sitemap>"
+            for n, lastmod in enumerate(lastmods, start=1)
+        )
+        text = f'{_XML_DECLARATION}<sitemapindex xmlns="{_SITEMAP_NS}">{entries}</sitemapindex>'
+        return _document(text, XML_MEDIA_TYPE)
+
+
+# Global feed service instance
+feed_service = FeedService()
@@ -0,0 +1,195 @@
+"""
+Incremental metadata extractor for Medium post pages.
+
+Medium pages are several megabytes, but everything the admin needs is in
+the ``<head>`` meta tags plus one ``Post:<id>`` entry of the
+``window.__APOLLO_STATE__`` script. The extractor takes the response in
+chunks as it arrives and:
+
+- runs ``HTMLParser`` only until ``</head>`` (or ``<body>``);
+- scans the rest as text for the Apollo marker, decoding just the
+  ``Post:`` objects with ``json.JSONDecoder.raw_decode``;
+- reports ``done`` as soon as both are found, so callers can stop reading;
+- keeps only a small unconsumed tail in memory, and never reads past
+  ``max_bytes``.
+"""
+import codecs
+import json
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+_APOLLO_MARKER = "window.__APOLLO_STATE__"
+_POST_KEY = re.compile(r'"Post:([^"\\]+)"\s*:\s*')
+_SCRIPT_END = "</script>"
+# Unconsumed text kept between chunks so keys split across chunk boundaries still match
+_TAIL = 256
+# Give up on a single Post object that grows beyond this many characters
+_MAX_POST_CHARS = 1_000_000
+
+
+def post_id_from_url(url: str) -> Optional[str]:
+    """Medium post URLs end in ``-<hex id>``."""
+    match = re.search(r'-([a-f0-9]+)$', url)
+    return match.group(1) if match else None
+
+
+class MediumMetadataExtractor(HTMLParser):
+    """Feed a post page in chunks; read ``done`` to know when to stop."""
+
+    def __init__(self, url: str, max_bytes: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.url = url
+        self.max_bytes = max_bytes or settings.medium_max_fetch_bytes
+        self.meta: Dict[str, Optional[str]] = {}
+        self.post: Optional[Dict[str, Any]] = None
+        self.bytes_read = 0
+        self.head_done = False
+        self.apollo_done = False
+        self.truncated = False
+
+        self._post_id = post_id_from_url(url)
+        self._title_match: Optional[Dict[str, Any]] = None
+        self._apollo_found = False
+        self._scan = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._json = json.JSONDecoder()
+
+    @property
+    def done(self) -> bool:
+        return (self.head_done and self.apollo_done) or self.truncated
+
+    # Input
+    def feed_bytes(self, chunk: bytes) -> bool:
+        """Consume a chunk of the raw response. Returns True once nothing more is needed."""
+        if self.done:
+            return True
+        remaining = self.max_bytes - self.bytes_read
+        if len(chunk) >= remaining:
+            chunk = chunk[:remaining]
+            self.truncated = True
+        self.bytes_read += len(chunk)
+        self.feed_text(self._decoder.decode(chunk))
+        return self.done
+
+    def feed_text(self, text: str) -> bool:
+        """Consume already-decoded text."""
+        if not self.head_done:
+            self.feed(text)
+        if not self.apollo_done:
+            self._scan_apollo(text)
+        return self.done
+
+    # HTMLParser callbacks (only active until the head is complete)
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs_dict = dict(attrs)
+            if 'property' in attrs_dict:
+                prop = attrs_dict['property']
+                if prop.startswith('og:'):
+                    self.meta[prop] = attrs_dict.get('content')
+            elif 'name' in attrs_dict:
+                name = attrs_dict['name']
+                if name in ('description', 'twitter:data1', 'article:published_time'):
+                    self.meta[name] = attrs_dict.get('content')
+        elif tag == 'body':
+            self.head_done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.head_done = True
+
+    # Apollo state scanning
+    def _scan_apollo(self, text: str):
+        self._scan += text
+        if not self._apollo_found:
+            idx = self._scan.find(_APOLLO_MARKER)
+            if idx < 0:
+                self._scan = self._scan[-len(_APOLLO_MARKER):]
+                return
+            self._apollo_found = True
+            self._scan = self._scan[idx + len(_APOLLO_MARKER):]
+
+        pos = 0
+        while True:
+            match = _POST_KEY.search(self._scan, pos)
+            script_end = self._scan.find(_SCRIPT_END, pos)
+            if script_end >= 0 and (match is None or script_end < match.start()):
+                # End of the Apollo script: settle for a title match, if any
+                self.post = self.post or self._title_match
+                self._finish_apollo()
+                return
+            if match is None:
+                self._scan = self._scan[max(pos, len(self._scan) - _TAIL):]
+                return
+
+            try:
+                value, end = self._json.raw_decode(self._scan, match.end())
+            except ValueError:
+                # Most likely the object continues in the next chunk
+                self._scan = self._scan[match.start():]
+                if len(self._scan) > _MAX_POST_CHARS:
+                    self._finish_apollo()
+                return
+
+            if isinstance(value, dict):
+                if self._post_id and match.group(1) == self._post_id:
+                    self.post = value
+                    self._finish_apollo()
+                    return
+                if self._title_match is None and value.get('title') == self.meta.get('og:title'):
+                    self._title_match = value
+                    if not self._post_id:
+                        self.post = value
+                        self._finish_apollo()
+                        return
+            pos = end
+
+    def _finish_apollo(self):
+        self.apollo_done = True
+        self._scan = ""
+
+    # Output
+    def result(self) -> Dict[str, Any]:
+        """Assemble the fetch-medium response from whatever has been found."""
+        if not self.head_done:
+            self.close()
+        post = self.post or self._title_match
+
+        # Extract read time (heuristic or from meta)
+        read_time = 5 # Default
+        published_date = self.meta.get('article:published_time')
+
+        if post:
+            if 'readingTime' in post:
+                read_time = int(round(post['readingTime']))
+
+            if post.get('firstPublishedAt'):
+                published_date = datetime.fromtimestamp(post['firstPublishedAt'] / 1000).isoformat()
+            elif post.get('updatedAt'):
+                published_date = datetime.fromtimestamp(post['updatedAt'] / 1000).isoformat()
+
+        # Fallback for read time if not found in Apollo
+        if read_time == 5:
+            twitter_data1 = self.meta.get('twitter:data1')
+            if twitter_data1 and 'min read' in twitter_data1:
+                try:
+                    read_time = int(twitter_data1.split()[0])
+                except ValueError:
+                    pass
+
+        # Fallback for date
+        if not published_date:
+            published_date = datetime.now().isoformat()
+
+        return {
+            "title": self.meta.get('og:title', ''),
+            "description": self.meta.get('og:description', '') or self.meta.get('description', ''),
+            "image": self.meta.get('og:image', ''),
+            "url": self.meta.get('og:url', self.url),
+            "read_time": read_time,
+            "published_date": published_date
+        }
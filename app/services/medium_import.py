@@ -0,0 +1,425 @@
+"""
+Medium article fetching, metadata extraction and bulk import.
+
+Bulk import accepts a list of post URLs, a Medium RSS feed or a Medium
+account export (zip or unpacked directory). Pages are fetched with bounded
+concurrency and per-host spacing, raw responses are kept in a
+content-addressed on-disk cache, and all results are written in one
+``ArticleStore.apply_batch()`` (in a worker thread, so the event loop keeps
+serving) followed by a single portfolio refresh.
+
+Run from the command line, the import refreshes its own process's catalog;
+a running server using the same data directory (and ``refresh_signal_path``)
+reloads when it next polls the refresh signal, within
+``refresh_poll_interval`` seconds. With polling disabled, restart it.
+
+Usage:
+    python -m app.services.medium_import --category "AI Engineering" urls.txt
+    python -m app.services.medium_import --category "Core AI" feed.xml
+    python -m app.services.medium_import --category "Core AI" medium-export.zip
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.utils import atomic_write_bytes, slugify
+from app.services.article_store import ArticleStore, BatchError, BatchResult, article_store
+from app.services.tag_registry import TagRegistry, tag_registry
+from app.services.medium_extractor import MediumMetadataExtractor
+from app.services.portfolio_service import OptimizedPortfolioService, portfolio_service
+
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+def _read_chunks(stream, extractor: MediumMetadataExtractor) -> bytes:
+    """Feed a binary stream to the extractor until it has what it needs."""
+    consumed = []
+    while not extractor.done:
+        chunk = stream.read(settings.medium_read_chunk_size)
+        if not chunk:
+            break
+        consumed.append(chunk)
+        extractor.feed_bytes(chunk)
+    return b"".join(consumed)
+
+
+def fetch_medium_metadata(url: str) -> Tuple[Dict[str, Any], bytes]:
+    """Stream a post page through the extractor, stopping as soon as it is done.
+
+    Returns the metadata and the bytes that were read (a prefix of the page
+    when extraction finished early), falling back to curl when urllib is
+    refused (e.g. 403s).
+    """
+    # Try urllib first
+    try:
+        import urllib.request
+        extractor = MediumMetadataExtractor(url)
+        req = urllib.request.Request(url, headers=REQUEST_HEADERS)
+        with urllib.request.urlopen(req, timeout=settings.medium_fetch_timeout) as response:
+            body = _read_chunks(response, extractor)
+        return extractor.result(), body
+    except Exception as e:
+        print(f"Urllib failed: {e}")
+
+        # Try curl if available (fallback for 403s)
+        if shutil.which("curl"):
+            try:
+                extractor = MediumMetadataExtractor(url)
+                process = subprocess.Popen(
+                    ["curl", "-sL", "--max-time", str(settings.medium_fetch_timeout),
+                     "-A", REQUEST_HEADERS['User-Agent'], url],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL
+                )
+                try:
+                    body = _read_chunks(process.stdout, extractor)
+                finally:
+                    process.kill()
+                    process.wait()
+                if body:
+                    return extractor.result(), body
+            except Exception as curl_e:
+                print(f"Curl failed: {curl_e}")
+
+        raise e
+
+
+def extract_medium_metadata_from_bytes(body: bytes, url: str) -> Dict[str, Any]:
+    """Run the extractor over an already-downloaded (possibly partial) page."""
+    extractor = MediumMetadataExtractor(url)
+    chunk_size = settings.medium_read_chunk_size
+    for start in range(0, len(body), chunk_size):
+        if extractor.feed_bytes(body[start:start + chunk_size]):
+            break
+    return extractor.result()
+
+
+class FetchCache:
+    """Content-addressed on-disk cache of fetched pages.
+
+    Bodies are stored once under ``objects/<sha256 of body>``; a small ref
+    file per URL (``refs/<sha256 of url>.json``) points at the body and
+    records when it was fetched, so identical pages are stored once and
+    entries expire after ``ttl`` seconds.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or settings.medium_cache_dir)
+        self.ttl = settings.medium_cache_ttl if ttl is None else ttl
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _ref_path(self, url: str) -> Path:
+        return self.cache_dir / "refs" / f"{self._digest(url.encode('utf-8'))}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.cache_dir / "objects" / digest[:2] / digest
+
+    def get(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._ref_path(url), "r", encoding="utf-8") as f:
+                ref = json.load(f)
+            if time.time() - ref["fetched_at"] > self.ttl:
+                return None
+            return self._object_path(ref["object"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, url: str, body: bytes):
+        digest = self._digest(body)
+        object_path = self._object_path(digest)
+        if not object_path.exists():
+            atomic_write_bytes(object_path, body)
+        ref = {"url": url, "object": digest, "fetched_at": time.time()}
+        atomic_write_bytes(self._ref_path(url), json.dumps(ref).encode("utf-8"))
+
+
+@dataclass
+class ImportItem:
+    """One post to import, with any tags its source provided."""
+    url: str
+    tags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ImportResult:
+    url: str
+    status: str  # "imported", "skipped" or "failed"
+    article_id: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+def _canonical_links(html: str) -> List[str]:
+    """Canonical post URLs in a Medium export post file."""
+    return re.findall(r'<a[^>]+href="([^"]+)"[^>]*class="p-canonical"', html)
+
+
+def load_import_items(source: str) -> List[ImportItem]:
+    """Read posts to import from a URL list, RSS/Atom feed or Medium export."""
+    path = Path(source)
+    items: List[ImportItem] = []
+
+    if path.is_dir():
+        for post in sorted(path.rglob("*.html")):
+            items.extend(ImportItem(url) for url in _canonical_links(post.read_text(encoding="utf-8", errors="ignore")))
+        return items
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.endswith(".html"):
+                    html = archive.read(name).decode("utf-8", errors="ignore")
+                    items.extend(ImportItem(url) for url in _canonical_links(html))
+        return items
+
+    return parse_import_text(path.read_text(encoding="utf-8"))
+
+
+def parse_import_text(text: str) -> List[ImportItem]:
+    """Parse an RSS/Atom document or a newline-separated URL list."""
+    stripped = text.lstrip()
+    if not stripped.startswith("<"):
+        return [
+            ImportItem(line.strip())
+            for line in text.splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+    root = ET.fromstring(stripped)
+    items = []
+    # RSS 2.0: <item><link>…</link><category>…</category></item>
+    for entry in root.iter("item"):
+        link = entry.findtext("link")
+        if link:
+            items.append(ImportItem(link.strip(), [c.text.strip() for c in entry.findall("category") if c.text]))
+    # Atom: <entry><link href="…"/><category term="…"/></entry>
+    atom = "{http://www.w3.org/2005/Atom}"
+    for entry in root.iter(f"{atom}entry"):
+        link = entry.find(f"{atom}link")
+        if link is not None and link.get("href"):
+            items.append(ImportItem(link.get("href"), [c.get("term") for c in entry.findall(f"{atom}category") if c.get("term")]))
+    return items
+
+
+def _naive_iso(value: str) -> str:
+    """Normalize a timestamp to naive UTC ISO format, matching stored articles."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat()
+
+
+ProgressCallback = Callable[[int, int, ImportResult], None]
+
+
+class MediumImporter:
+    """Fetches many posts concurrently and saves them as articles in one batch."""
+
+    def __init__(
+        self,
+        store: ArticleStore = article_store,
+        service: OptimizedPortfolioService = portfolio_service,
+        cache: Optional[FetchCache] = None,
+        concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        host_delay: Optional[float] = None,
+        fetcher: Callable[[str], Tuple[Dict[str, Any], bytes]] = fetch_medium_metadata,
+        registry: TagRegistry = tag_registry
+    ):
+        self.store = store
+        self.registry = registry
+        self.service = service
+        self.cache = cache or FetchCache()
+        self.concurrency = concurrency or settings.medium_fetch_concurrency
+        self.per_host_concurrency = per_host_concurrency or settings.medium_per_host_concurrency
+        self.host_delay = settings.medium_host_delay if host_delay is None else host_delay
+        self.fetcher = fetcher
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_next_start: Dict[str, float] = {}
+
+    async def _fetch(self, url: str, limiter: asyncio.Semaphore) -> Tuple[Dict[str, Any], bool]:
+        """Return (metadata, from_cache), honouring global and per-host limits on misses."""
+        cached = self.cache.get(url)
+        if cached is not None:
+            return extract_medium_metadata_from_bytes(cached, url), True
+
+        host = urlparse(url).netloc
+        host_slot = self._host_slots.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        async with limiter, host_slot:
+            # Reserve the next start time for this host so requests are spaced out
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._host_next_start.get(host, now))
+            self._host_next_start[host] = start + self.host_delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            meta, body = await asyncio.to_thread(self.fetcher, url)
+
+        # Only the prefix the extractor needed is stored; it re-extracts identically
+        self.cache.put(url, body)
+        return meta, False
+
+    def _build_record(
+        self,
+        item: ImportItem,
+        meta: Dict[str, Any],
+        category: str,
+        tags: List[str],
+        featured: bool
+    ) -> Dict[str, Any]:
+        title = meta["title"] or item.url
+        return {
+            "id": slugify(title),
+            "title": title,
+            "excerpt": meta["description"] or title,
+            "category": category,
+            "tags": list(dict.fromkeys([*tags, *item.tags])),
+            "published_date": _naive_iso(meta["published_date"]),
+            "read_time": max(1, int(meta["read_time"])),
+            "featured": featured,
+            "image_url": meta["image"] or None,
+            "external_url": meta["url"] or item.url,
+        }
+
+    async def run(
+        self,
+        items: List[ImportItem],
+        category: str,
+        tags: Optional[List[str]] = None,
+        featured: bool = False,
+        overwrite: bool = False,
+        progress: Optional[ProgressCallback] = None
+    ) -> List[ImportResult]:
+        """Fetch and parse every item, save them in one batch, then refresh the catalog once."""
+        tags = tags or []
+        limiter = asyncio.Semaphore(self.concurrency)
+        snapshot = self.service.snapshot
+        existing_ids = set(snapshot.article_by_id)
+        results: List[ImportResult] = []
+        records: Dict[str, Tuple[ImportResult, Dict[str, Any]]] = {}  # Validated, not yet written
+        unique_items = list({item.url: item for item in items}.values())
+        total = len(unique_items)
+
+        async def process(item: ImportItem) -> ImportResult:
+            try:
+                meta, cached = await self._fetch(item.url, limiter)
+                record = self._build_record(item, meta, category, tags, featured)
+                if record["id"] in existing_ids and not overwrite:
+                    return ImportResult(item.url, "skipped", record["id"], cached, "Article already exists")
+                self.store.validate(record)
+                existing_ids.add(record["id"])
+                result = ImportResult(item.url, "imported", record["id"], cached)
+                records[record["id"]] = (result, record)
+                return result
+            except Exception as e:
+                return ImportResult(item.url, "failed", error=str(e))
+
+        for next_result in asyncio.as_completed([process(item) for item in unique_items]):
+            result = await next_result
+            results.append(result)
+            if progress:
+                progress(len(results), total, result)
+
+        written = await asyncio.to_thread(self._write, records, snapshot)
+        if written is not None and written.upserted:
+            self.registry.register(written.categories, written.tags)
+            await self.service.refresh(upserted=written.upserted, paths=written.paths)
+        return results
+
+    def _write(self, records: Dict[str, Tuple[ImportResult, Dict[str, Any]]], snapshot) -> Optional[BatchResult]:
+        """Write the records as one batch; results of records that could not be written turn "failed"."""
+        pending = list(records.values())
+        while pending:
+            operations = [{"op": "upsert", "article": record} for _, record in pending]
+            try:
+                return self.store.apply_batch(operations, snapshot.article_by_id, snapshot.paths)
+            except BatchError as e:
+                # Nothing was written; drop the rejected records and try the rest
+                rejected = {error["index"]: error["error"] for error in e.errors}
+                for index, error in rejected.items():
+                    pending[index][0].status, pending[index][0].error = "failed", error
+                pending = [entry for index, entry in enumerate(pending) if index not in rejected]
+            except Exception as e:
+                for result, _ in pending:
+                    result.status, result.error = "failed", str(e)
+                return None
+        return None
+
+
+class ImportJobRegistry:
+    """Tracks background bulk imports started from the admin API."""
+
+    def __init__(self, max_jobs: int = 20):
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks = set()
+
+    def create(self, total: int) -> Dict[str, Any]:
+        job_id = hashlib.sha1(f"{time.time_ns()}".encode()).hexdigest()[:12]
+        job = {"id": job_id, "status": "running", "done": 0, "total": total, "results": []}
+        self._jobs[job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.pop(next(iter(self._jobs)))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    def start(self, coro) -> asyncio.Task:
+        """Schedule a job coroutine, holding a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+
+import_jobs = ImportJobRegistry()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Bulk import Medium posts as articles.")
+    parser.add_argument("source", help="URL list file, RSS/Atom feed, or Medium export (zip/dir)")
+    parser.add_argument("--category", required=True, help="Category for imported articles")
+    parser.add_argument("--tag", action="append", default=[], help="Tag to add to every article (repeatable)")
+    parser.add_argument("--featured", action="store_true", help="Mark imported articles as featured")
+    parser.add_argument("--overwrite", action="store_true", help="Replace articles whose id already exists")
+    parser.add_argument("--concurrency", type=int, default=None, help="Max concurrent fetches")
+    args = parser.parse_args(argv)
+
+    items = load_import_items(args.source)
+
+    def report(done: int, total: int, result: ImportResult):
+        suffix = f" ({result.error})" if result.error else ""
+        origin = " [cache]" if result.cached else ""
+        print(f"[{done}/{total}] {result.status}{origin} {result.url}{suffix}")
+
+    importer = MediumImporter(concurrency=args.concurrency)
+    results = asyncio.run(importer.run(
+        items, args.category, args.tag, args.featured, args.overwrite, progress=report
+    ))
+    counts = {status: sum(r.status == status for r in results) for status in ("imported", "skipped", "failed")}
+    print(f"Done: {counts['imported']} imported, {counts['skipped']} skipped, {counts['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
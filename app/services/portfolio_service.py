@@ -1,33 +1,235 @@
 """
 Optimized Portfolio Service with improved data management and caching.
+
+The catalog is published as an immutable ``CatalogSnapshot``: the data plus
+every lookup derived from it, built completely before anyone can see it and
+swapped in with a single reference assignment. A reload never blocks or
+tears reads: requests keep using the snapshot they started with (take
+``portfolio_service.snapshot`` once when several reads must agree), and an
+old snapshot is freed once the last request holding it finishes.
+
+Every refresh also rewrites a small signal file (``refresh_signal_path``).
+Other processes serving the same data directory (forked workers, or the
+server after a CLI import) poll it with ``sync_with_signal()`` and reload
+the catalog when it changed.
 """
-from typing import List, Optional, Dict, Any
+from typing import Callable, Iterable, List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
-from functools import lru_cache
-from collections import Counter
+from bisect import bisect_left
+from collections import Counter, defaultdict
+import asyncio
 import json
+import os
+import threading
+import time
 from pathlib import Path
 from app.models.portfolio import (
     PortfolioData, PersonalInfo, ContactInfo, Education, 
     Certification, TechStack, Project, Article
 )
 from app.core.config import settings
+from app.core.utils import atomic_write_bytes, month_after, project_path
+from app.services.analytics import view_counter
+from app.services.projection import FieldEncoder
+
+
+@dataclass
+class CatalogChange:
+    """Describes a data refresh to listeners that maintain derived state."""
+    generation: int
+    upserted: List[str] = field(default_factory=list)  # Article ids added or modified
+    removed: List[str] = field(default_factory=list)   # Article ids deleted
+    full: bool = False  # Change set unknown: rebuild everything
+    previous: Optional["CatalogSnapshot"] = field(default=None, repr=False)  # Replaced snapshot, during listener calls only
+
+
+# Categories listed on the articles page even when they have no articles
+EXPECTED_CATEGORIES = [
+    "Core AI", "Natural Language", "AI Engineering", "Tools & Frameworks",
+    "Research & Insights", "Ethics & Security", "Guides & Career", "Tutorial Series"
+]
+
+
+def _group_by_category(items: list) -> Dict[str, list]:
+    groups = defaultdict(list)
+    for item in items:
+        groups[item.category.lower()].append(item)
+    return dict(groups)
+
+
+class DateIndex:
+    """Articles by publication date: bisect over the sorted dates plus year -> month buckets.
+
+    A range lookup is two binary searches and a slice of the newest-first
+    article list, O(log n + k) for k results.
+    """
+
+    def __init__(self, articles: List[Article]):
+        self._articles = articles  # Newest first, as the catalog keeps them
+        self._dates = [article.published_date for article in reversed(articles)]  # Oldest first
+        self.buckets: Dict[int, Dict[int, List[str]]] = {}  # year -> month -> article ids, newest first
+        for article in articles:
+            date = article.published_date
+            self.buckets.setdefault(date.year, {}).setdefault(date.month, []).append(article.id)
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Article]:
+        """Articles published in ``[start, end)``, newest first; either bound may be open."""
+        n = len(self._dates)
+        lo = bisect_left(self._dates, start) if start is not None else 0
+        hi = bisect_left(self._dates, end) if end is not None else n
+        return self._articles[n - hi:n - lo] if lo < hi else []
+
+    def year(self, year: int) -> List[Article]:
+        return self.between(datetime(year, 1, 1), datetime(year + 1, 1, 1))
+
+    def month(self, year: int, month: int) -> List[Article]:
+        return self.between(datetime(year, month, 1), month_after(year, month))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Years newest first, each with its months newest first and their article counts."""
+        return [
+            {
+                "year": year,
+                "count": sum(len(ids) for ids in months.values()),
+                "months": [{"month": month, "count": len(months[month])} for month in sorted(months, reverse=True)]
+            }
+            for year, months in sorted(self.buckets.items(), reverse=True)
+        ]
+
+
+class CatalogSnapshot:
+    """One immutable version of the catalog and its lookups.
+
+    Everything is computed in ``__init__``; afterwards nothing is modified
+    (except the field encoders' memoized encodings, which only ever gain
+    identical entries), so a snapshot can be read from any thread without
+    locks. Returned lists are shared between readers and must not be mutated.
+    """
+
+    def __init__(self, data: PortfolioData, generation: int, paths: Optional[Dict[str, Path]] = None):
+        self.data = data
+        self.generation = generation
+        self.paths: Dict[str, Path] = paths or {}  # Article id -> file it was loaded from
+        self.article_by_id: Dict[str, Article] = {}
+        for article in data.articles:
+            self.article_by_id.setdefault(article.id, article)
+        self.project_by_id: Dict[str, Project] = {}
+        for project in data.projects:
+            self.project_by_id.setdefault(project.id, project)
+        self.featured_projects = [p for p in data.projects if p.featured]
+        self.featured_articles = [a for a in data.articles if a.featured]
+        self.articles_by_category = _group_by_category(data.articles)
+        self.projects_by_category = _group_by_category(data.projects)
+        self.tech_by_category = _group_by_category(data.tech_stack)
+        self.dates = DateIndex(data.articles)
+        self.article_fields = FieldEncoder(Article)
+        self.project_fields = FieldEncoder(Project)
+        counts = Counter(article.category for article in data.articles)
+        for category in EXPECTED_CATEGORIES:
+            counts.setdefault(category, 0)
+        self.category_counts = dict(counts)
+        self.stats = {
+            "total_projects": len(data.projects),
+            "featured_projects": len(self.featured_projects),
+            "total_articles": len(data.articles),
+            "featured_articles": len(self.featured_articles),
+            "total_certifications": len(data.certifications),
+            "total_technologies": len(data.tech_stack),
+            "education_levels": len(data.education)
+        }
+
+    @property
+    def articles(self) -> List[Article]:
+        return self.data.articles
+
+    @property
+    def projects(self) -> List[Project]:
+        return self.data.projects
+
+    def get_featured_projects(self, limit: int = 3) -> List[Project]:
+        return (self.featured_projects or self.data.projects)[:limit]
+
+    def get_featured_articles(self, limit: int = 2) -> List[Article]:
+        """Featured articles, falling back to the most viewed."""
+        return self.featured_articles[:limit] if self.featured_articles else self.get_popular_articles(limit)
+
+    def get_popular_articles(self, limit: int = 5) -> List[Article]:
+        """Most viewed articles (ties by id), then unviewed ones in catalog order.
+
+        Walks the view counter's published ranking, so the cost is the
+        number of ranked ids skipped, not the catalog size.
+        """
+        popular = []
+        for article_id in view_counter.ranking("article").ranked:
+            if len(popular) >= limit:
+                return popular
+            article = self.article_by_id.get(article_id)
+            if article is not None:
+                popular.append(article)
+        if len(popular) < limit:
+            chosen = {article.id for article in popular}
+            popular.extend(a for a in self.data.articles[:limit + len(chosen)] if a.id not in chosen)
+        return popular[:limit]
+
+    def get_article_by_id(self, article_id: str) -> Optional[Article]:
+        return self.article_by_id.get(article_id)
+
+    def get_project_by_id(self, project_id: str) -> Optional[Project]:
+        return self.project_by_id.get(project_id)
+
+    def get_articles_by_category(self, category: str) -> List[Article]:
+        return self.articles_by_category.get(category.lower(), [])
+
+    def get_projects_by_category(self, category: str) -> List[Project]:
+        return self.projects_by_category.get(category.lower(), [])
+
+    def get_tech_by_category(self, category: str) -> List[TechStack]:
+        return self.tech_by_category.get(category.lower(), [])
 
 
 class OptimizedPortfolioService:
     """Optimized service class for managing portfolio data with caching."""
     
     def __init__(self):
-        self._portfolio_data = None
-        self._load_portfolio_data()
+        # Data is loaded on first access (or by the startup warm-up), not at import
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._listeners: List[Callable[[CatalogChange], None]] = []
+        self._load_lock = threading.RLock()  # One build at a time; readers never take it once loaded
+        self.load_progress: Dict[str, int] = {"articles_loaded": 0, "articles_total": 0}
+        self._seen_signal: Optional[str] = None  # Refresh signal this process's catalog is current with
+    
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """The current catalog snapshot, loading it on first access."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    # Read first, so a refresh elsewhere during the build is picked up by the next poll
+                    self._seen_signal = self._read_signal()
+                    self._snapshot = self._build_snapshot()
+                snapshot = self._snapshot
+        return snapshot
+    
+    @property
+    def generation(self) -> int:
+        """Generation of the published snapshot (0 before the first load)."""
+        snapshot = self._snapshot
+        return snapshot.generation if snapshot is not None else 0
     
     @property
     def portfolio_data(self) -> PortfolioData:
-        """Cached access to portfolio data."""
-        if self._portfolio_data is None:
-            self._load_portfolio_data()
-        assert self._portfolio_data is not None
-        return self._portfolio_data
+        """Data of the current snapshot."""
+        return self.snapshot.data
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+    
+    def ensure_loaded(self):
+        """Load the catalog now if nothing has loaded it yet."""
+        self.snapshot
     
     @property
     def personal_info(self) -> PersonalInfo:
@@ -57,8 +259,26 @@ class OptimizedPortfolioService:
     def articles(self) -> List[Article]:
         return self.portfolio_data.articles
     
-    def _load_portfolio_data(self):
-        """Load portfolio data with optimized data structures."""
+    def _build_snapshot(
+        self,
+        upserted: Optional[Iterable[str]] = None,
+        removed: Optional[Iterable[str]] = None,
+        paths: Optional[Dict[str, Path]] = None
+    ) -> CatalogSnapshot:
+        """Load portfolio data from disk into a new, unpublished snapshot.
+        
+        With a change set, only the changed articles are read; everything
+        else is carried over from the current snapshot.
+        """
+        previous = self._snapshot
+        if previous is not None and (upserted is not None or removed is not None):
+            articles, article_paths = self._update_articles_data(previous, upserted or [], removed or [], paths or {})
+            data = PortfolioData(**{**dict(previous.data), "articles": articles})
+            snapshot = CatalogSnapshot(data, previous.generation + 1, article_paths)
+            # Unchanged items are the same objects, so their JSON encodings still hold
+            snapshot.article_fields.carry_over(previous.article_fields, articles)
+            snapshot.project_fields.carry_over(previous.project_fields, data.projects)
+            return snapshot
         
         # Use data factory methods for cleaner code
         personal_info = self._create_personal_info()
@@ -67,9 +287,9 @@ class OptimizedPortfolioService:
         certifications = self._create_certifications_data()
         tech_stack = self._create_tech_stack_data()
         projects = self._create_projects_data()
-        articles = self._create_articles_data()
+        articles, article_paths = self._create_articles_data()
         
-        self._portfolio_data = PortfolioData(
+        data = PortfolioData(
             personal_info=personal_info,
             contact_info=contact_info,
             education=education,
@@ -78,6 +298,7 @@ class OptimizedPortfolioService:
             projects=projects,
             articles=articles
         )
+        return CatalogSnapshot(data, self.generation + 1, article_paths)
     
     def _create_personal_info(self) -> PersonalInfo:
         """Create personal information."""
@@ -262,17 +483,64 @@ class OptimizedPortfolioService:
             for p in projects_data
         ]
     
-    def _create_articles_data(self) -> List[Article]:
+    @property
+    def articles_dir(self) -> Path:
+        return project_path(settings.data_dir) / "articles"
+    
+    def _create_articles_data(self) -> Tuple[List[Article], Dict[str, Path]]:
         """Load articles data from nested JSON files."""
-        articles_dir = Path(__file__).parent.parent.parent / settings.data_dir / "articles"
-        articles = []
+        articles_dir = self.articles_dir
         
         if not articles_dir.exists():
             print(f"Warning: Articles directory not found at {articles_dir}")
-            return []
+            return [], {}
             
         # Recursively find all .json files in the articles directory
-        for file_path in articles_dir.rglob("*.json"):
+        articles, paths = self._load_article_files(list(articles_dir.rglob("*.json")))
+                
+        # Sort by date descending
+        articles.sort(key=lambda x: x.published_date, reverse=True)
+        return articles, paths
+    
+    def _update_articles_data(
+        self,
+        previous: CatalogSnapshot,
+        upserted: Iterable[str],
+        removed: Iterable[str],
+        paths: Dict[str, Path]
+    ) -> Tuple[List[Article], Dict[str, Path]]:
+        """The previous snapshot's articles with the changed ones re-read (or dropped)."""
+        upserted = set(upserted)
+        changed = upserted | set(removed)
+        
+        # Where to read each upserted article: the caller's path, else where it was loaded from
+        located: Dict[str, Path] = {}
+        for article_id in upserted:
+            path = paths.get(article_id) or previous.paths.get(article_id)
+            if path is not None and path.is_file():
+                located[article_id] = path
+        missing = upserted - located.keys()
+        if missing and self.articles_dir.exists():
+            # New or moved without a path given: one directory walk, no parsing
+            for path in self.articles_dir.rglob("*.json"):
+                if path.stem in missing:
+                    located[path.stem] = path
+        
+        articles = [a for a in previous.articles if a.id not in changed]
+        article_paths = {i: p for i, p in previous.paths.items() if i not in changed}
+        loaded, loaded_paths = self._load_article_files(list(located.values()))
+        articles.extend(loaded)
+        article_paths.update(loaded_paths)
+        articles.sort(key=lambda x: x.published_date, reverse=True)
+        return articles, article_paths
+    
+    def _load_article_files(self, file_paths: List[Path]) -> Tuple[List[Article], Dict[str, Path]]:
+        """Parse article files, skipping (and reporting) any that fail to load."""
+        articles = []
+        paths: Dict[str, Path] = {}
+        self.load_progress = {"articles_loaded": 0, "articles_total": len(file_paths)}
+        for file_path in file_paths:
+            self.load_progress["articles_loaded"] += 1
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     article_data = json.load(f)
@@ -291,88 +559,142 @@ class OptimizedPortfolioService:
                 if 'slug' not in article_data:
                     article_data['slug'] = article_data.get('id')
 
-                articles.append(Article(**article_data))
+                article = Article(**article_data)
+                articles.append(article)
+                paths.setdefault(article.id, file_path)
             except Exception as e:
                 print(f"Error loading article {file_path}: {e}")
-                
-        # Sort by date descending
-        articles.sort(key=lambda x: x.published_date, reverse=True)
-        return articles
+        return articles, paths
     
-    # Optimized getter methods with better error handling
+    # Getters read the current snapshot; see ``snapshot`` for consistent multi-step reads
     def get_portfolio_data(self) -> PortfolioData:
         """Get complete portfolio data."""
-        return self.portfolio_data
+        return self.snapshot.data
     
-    @lru_cache(maxsize=10)
     def get_featured_projects(self, limit: int = 3) -> List[Project]:
-        """Get featured projects with caching."""
-        featured = [p for p in self.projects if p.featured]
-        return featured[:limit] if featured else self.projects[:limit]
+        """Get featured projects (precomputed per snapshot)."""
+        return self.snapshot.get_featured_projects(limit)
     
-    @lru_cache(maxsize=10)
     def get_featured_articles(self, limit: int = 2) -> List[Article]:
-        """Get featured articles with caching."""
-        featured = [a for a in self.articles if a.featured]
-        return featured[:limit] if featured else self.articles[:limit]
+        """Get featured articles, falling back to the most viewed (not cached, views change)."""
+        return self.snapshot.get_featured_articles(limit)
+    
+    def get_popular_articles(self, limit: int = 5) -> List[Article]:
+        """Most viewed articles; ties (and unviewed articles) keep catalog order."""
+        return self.snapshot.get_popular_articles(limit)
     
     def get_project_by_id(self, project_id: str) -> Optional[Project]:
-        """Get a specific project by ID with optimized lookup."""
-        return next((p for p in self.projects if p.id == project_id), None)
+        """Get a specific project by ID."""
+        return self.snapshot.get_project_by_id(project_id)
     
     def get_article_by_id(self, article_id: str) -> Optional[Article]:
-        """Get a specific article by ID with optimized lookup."""
-        return next((a for a in self.articles if a.id == article_id), None)
+        """Get a specific article by ID."""
+        return self.snapshot.get_article_by_id(article_id)
     
-    @lru_cache(maxsize=20)
     def get_projects_by_category(self, category: str) -> List[Project]:
-        """Get projects filtered by category with caching."""
-        return [p for p in self.projects if p.category.lower() == category.lower()]
+        """Get projects filtered by category (case-insensitive)."""
+        return self.snapshot.get_projects_by_category(category)
     
-    @lru_cache(maxsize=20)
     def get_tech_by_category(self, category: str) -> List[TechStack]:
-        """Get technologies filtered by category with caching."""
-        return [t for t in self.tech_stack if t.category.lower() == category.lower()]
+        """Get technologies filtered by category (case-insensitive)."""
+        return self.snapshot.get_tech_by_category(category)
     
-    @lru_cache(maxsize=20)
     def get_articles_by_category(self, category: str) -> List[Article]:
-        """Get articles filtered by category with caching."""
-        return [a for a in self.articles if a.category.lower() == category.lower()]
+        """Get articles filtered by category (case-insensitive)."""
+        return self.snapshot.get_articles_by_category(category)
     
     def get_category_counts(self) -> Dict[str, int]:
         """Get count of articles per category."""
-        categories = [article.category for article in self.articles]
-        counts = Counter(categories)
-        # Ensure all expected categories are present with 0 if not
-        expected_categories = [
-            "Core AI", "Natural Language", "AI Engineering", "Tools & Frameworks",
-            "Research & Insights", "Ethics & Security", "Guides & Career", "Tutorial Series"
-        ]
-        for cat in expected_categories:
-            if cat not in counts:
-                counts[cat] = 0
-        return dict(counts)
+        return dict(self.snapshot.category_counts)
     
     def get_portfolio_stats(self) -> Dict[str, Any]:
         """Get portfolio statistics."""
-        return {
-            "total_projects": len(self.projects),
-            "featured_projects": len([p for p in self.projects if p.featured]),
-            "total_articles": len(self.articles),
-            "featured_articles": len([a for a in self.articles if a.featured]),
-            "total_certifications": len(self.certifications),
-            "total_technologies": len(self.tech_stack),
-            "education_levels": len(self.education)
-        }
+        return dict(self.snapshot.stats)
+    
+    def add_listener(self, listener: Callable[[CatalogChange], None]):
+        """Register a callback invoked after every data refresh."""
+        self._listeners.append(listener)
+    
+    def refresh_data(
+        self, 
+        upserted: Optional[Iterable[str]] = None, 
+        removed: Optional[Iterable[str]] = None,
+        paths: Optional[Dict[str, Path]] = None,
+        broadcast: bool = True
+    ) -> CatalogChange:
+        """Rebuild the catalog from disk and publish it as the new snapshot.
+        
+        Blocks the calling thread for the whole build (use ``refresh()`` on
+        the event loop); readers keep the previous snapshot until the swap.
+        Callers that know which articles changed pass their ids, so only those
+        files are read and listeners update incrementally (``paths`` gives the
+        files of upserted articles, saving a directory walk for new or moved
+        ones); without them everything is reloaded and rebuilt.
+        Listeners run in this thread, in generation order. With ``broadcast``
+        the refresh signal is rewritten so other processes reload too.
+        """
+        upserted = list(upserted) if upserted is not None else None
+        removed = list(removed) if removed is not None else None
+        with self._load_lock:
+            previous = self._snapshot
+            snapshot = self._build_snapshot(upserted, removed, paths)
+            self._snapshot = snapshot  # The only write readers can observe
+            
+            change = CatalogChange(
+                generation=snapshot.generation,
+                upserted=list(upserted or []),
+                removed=list(removed or []),
+                full=upserted is None and removed is None,
+                previous=previous
+            )
+            for listener in self._listeners:
+                try:
+                    listener(change)
+                except Exception as e:
+                    print(f"Error in refresh listener {listener}: {e}")
+            change.previous = None  # Let the old snapshot go once no request holds it
+            if broadcast:
+                self._write_signal()
+        return change
+    
+    def sync_with_signal(self) -> Optional[CatalogChange]:
+        """Reload everything if another process refreshed the catalog since this one last did."""
+        if not self.is_loaded:
+            return None
+        token = self._read_signal()
+        if token is None or token == self._seen_signal:
+            return None
+        self._seen_signal = token
+        print(f"Catalog refreshed by another process ({token}); reloading")
+        return self.refresh_data(broadcast=False)
+    
+    @staticmethod
+    def _signal_path() -> Path:
+        return project_path(settings.refresh_signal_path)
+    
+    def _read_signal(self) -> Optional[str]:
+        try:
+            return self._signal_path().read_text(encoding="utf-8")
+        except OSError:
+            return None
+    
+    def _write_signal(self):
+        token = f"{os.getpid()}-{time.time_ns()}"
+        try:
+            atomic_write_bytes(self._signal_path(), token.encode("utf-8"))
+        except OSError as e:
+            print(f"Could not write the refresh signal: {e}")
+            return
+        self._seen_signal = token
     
-    def refresh_data(self):
-        """Refresh portfolio data from disk and clear caches."""
-        self._load_portfolio_data()
-        self.get_featured_projects.cache_clear()
-        self.get_featured_articles.cache_clear()
-        self.get_projects_by_category.cache_clear()
-        self.get_tech_by_category.cache_clear()
-        self.get_articles_by_category.cache_clear()
+    async def refresh(
+        self, 
+        upserted: Optional[Iterable[str]] = None, 
+        removed: Optional[Iterable[str]] = None,
+        paths: Optional[Dict[str, Path]] = None
+    ) -> CatalogChange:
+        """``refresh_data()`` in a worker thread, so the event loop keeps serving meanwhile."""
+        return await asyncio.to_thread(self.refresh_data, upserted, removed, paths)
 
 
 # Global optimized portfolio service instance
@@ -0,0 +1,61 @@
+"""
+Sparse fieldsets for the JSON API.
+
+``FieldEncoder`` keeps the JSON encoding of each field of each item and
+assembles a projection (``?fields=id,title``) by joining the requested
+fields' bytes, so no model is dumped or validated per response and fields
+that were not asked for are never encoded. Encodings are filled in on first
+use and belong to one catalog snapshot; items a new snapshot carries over
+unchanged keep theirs (``carry_over()``).
+"""
+import json
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class FieldEncoder:
+    """Per-item, per-field JSON encodings of one model's instances."""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self.fields: Tuple[str, ...] = tuple(model.model_fields)
+        self._keys = {name: json.dumps(name).encode() + b":" for name in self.fields}
+        # id(item) -> {field: encoded value}; the snapshot holding the items keeps the ids unique
+        self._encoded: Dict[int, Dict[str, bytes]] = {}
+
+    def parse(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Requested field names in model order, or None for all. Raises ValueError on unknown names."""
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(self.fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(self.fields)}")
+        return tuple(name for name in self.fields if name in requested) or None
+
+    def encode(self, item: BaseModel, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """One item as a JSON object with only ``fields`` (all when None)."""
+        encoded = self._encoded.get(id(item))
+        if encoded is None:
+            # Concurrent first uses may both build this; either result is the same
+            encoded = self._encoded.setdefault(id(item), {})
+        parts = []
+        for name in fields or self.fields:
+            value = encoded.get(name)
+            if value is None:
+                value = encoded[name] = to_json(getattr(item, name))
+            parts.append(self._keys[name] + value)
+        return b"{" + b",".join(parts) + b"}"
+
+    def encode_many(self, items: Iterable[BaseModel], fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """Items as a JSON array of projections."""
+        return b"[" + b",".join(self.encode(item, fields) for item in items) + b"]"
+
+    def carry_over(self, previous: "FieldEncoder", items: Iterable[BaseModel]):
+        """Reuse ``previous``'s encodings for the ``items`` it already encoded (same objects)."""
+        for item in items:
+            encoded = previous._encoded.get(id(item))
+            if encoded is not None:
+                self._encoded[id(item)] = encoded
@@ -0,0 +1,273 @@
+"""
+Related-content recommender for articles and projects.
+
+Each item is reduced to a set of terms (``category:``/``tag:`` for articles,
+``category:``/``tech:`` for projects) and compared with Jaccard similarity.
+Scores come from an inverted index: for one row, walking the postings of its
+terms accumulates the overlap with every item it shares a term with, which
+is a sparse row-times-matrix product without materializing the matrix. Only
+the top-k neighbors per item are kept.
+
+Candidates for a row are found through its rarest terms, walking at most
+``related_max_postings`` postings (but always at least the rarest term), so
+a big shared category does not make every row scan the whole catalog. The
+remaining terms still count towards the score of the candidates found, and
+in large catalogs only the candidates with the highest raw overlap (at least
+``5 * top_k`` of them) are rescored.
+
+On an article change only the affected rows are touched: the changed
+article's own row is recomputed, and rows sharing a term with its old or new
+version either admit it, rescore it in place, or (when it drops out of
+their top-k) are recomputed.
+"""
+import heapq
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.models.portfolio import Article, Project
+from app.services.portfolio_service import CatalogChange, CatalogSnapshot, OptimizedPortfolioService, portfolio_service
+
+Neighbors = List[Tuple[str, float]]
+
+# Candidates rescored per row, as a multiple of top_k
+_SHORTLIST_FACTOR = 5
+
+
+def article_terms(article: Article) -> FrozenSet[str]:
+    return frozenset(
+        [f"category:{article.category.lower()}"] + [f"tag:{tag.lower()}" for tag in article.tags]
+    )
+
+
+def project_terms(project: Project) -> FrozenSet[str]:
+    return frozenset(
+        [f"category:{project.category.lower()}"] + [f"tech:{tech.lower()}" for tech in project.tech_stack]
+    )
+
+
+class SimilarityIndex:
+    """Inverted index over term sets with precomputed top-k Jaccard neighbors."""
+
+    def __init__(self, top_k: Optional[int] = None, max_postings: Optional[int] = None):
+        self.top_k = top_k or settings.related_top_k
+        self.max_postings = max_postings or settings.related_max_postings
+        self.terms: Dict[str, FrozenSet[str]] = {}
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.neighbors: Dict[str, Neighbors] = {}
+
+    def build(self, items: Dict[str, FrozenSet[str]]):
+        """Index every item and compute all rows."""
+        self.terms = {}
+        self.postings = defaultdict(set)
+        self.neighbors = {}
+        for item_id, terms in items.items():
+            self._add(item_id, terms)
+        for item_id in self.terms:
+            self.neighbors[item_id] = self._compute_row(item_id)
+
+    def update(self, upserted: Dict[str, FrozenSet[str]], removed: Iterable[str]) -> int:
+        """Apply item changes, touching only affected rows. Returns rows recomputed."""
+        removed = list(removed)
+        if (len(upserted) + len(removed)) * 2 > len(self.terms):
+            # Most rows change anyway (a bulk import): one build is far cheaper than row-by-row updates
+            dropped = set(removed)
+            items = {item_id: terms for item_id, terms in self.terms.items() if item_id not in dropped}
+            items.update(upserted)
+            self.build(items)
+            return len(self.terms)
+
+        old_terms: Dict[str, FrozenSet[str]] = {}
+        for item_id in removed + list(upserted):
+            if item_id in self.terms:
+                old_terms[item_id] = self.terms[item_id]
+                self._discard(item_id)
+        for item_id, terms in upserted.items():
+            self._add(item_id, terms)
+
+        recompute: Set[str] = set(upserted)
+        changed = set(old_terms) | set(upserted)
+        for item_id in changed:
+            # Rows that may have held this item, or may now want it
+            candidates: Set[str] = set()
+            for term in old_terms.get(item_id, frozenset()) | self.terms.get(item_id, frozenset()):
+                candidates |= self.postings.get(term, set())
+            for row_id in candidates - changed:
+                if self._offer(row_id, item_id):
+                    recompute.add(row_id)
+
+        for item_id in set(old_terms) - set(upserted):
+            self.neighbors.pop(item_id, None)
+        for row_id in recompute:
+            if row_id in self.terms:
+                self.neighbors[row_id] = self._compute_row(row_id)
+        return len(recompute)
+
+    def related(self, item_id: str, limit: Optional[int] = None) -> Neighbors:
+        return self.neighbors.get(item_id, [])[:limit or self.top_k]
+
+    # Internals
+    def _add(self, item_id: str, terms: FrozenSet[str]):
+        self.terms[item_id] = terms
+        for term in terms:
+            self.postings[term].add(item_id)
+
+    def _discard(self, item_id: str):
+        for term in self.terms.pop(item_id, frozenset()):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.discard(item_id)
+                if not posting:
+                    del self.postings[term]
+
+    def _score(self, a: FrozenSet[str], b: FrozenSet[str]) -> float:
+        overlap = len(a & b)
+        return overlap / (len(a) + len(b) - overlap) if overlap else 0.0
+
+    def _compute_row(self, item_id: str) -> Neighbors:
+        terms = self.terms[item_id]
+        postings = self.postings
+
+        # Candidates come from the rarest terms, within a budget of postings walked
+        selective = []
+        budget = self.max_postings
+        for term in sorted(terms, key=lambda t: len(postings[t])):
+            if selective and len(postings[term]) > budget:
+                break
+            selective.append(term)
+            budget -= len(postings[term])
+        overlap = Counter(chain.from_iterable(postings[t] for t in selective))
+        overlap.pop(item_id, None)
+        # The remaining (common) terms still count towards the candidates' overlap
+        for term in terms.difference(selective):
+            overlap.update(postings[term] & overlap.keys())
+
+        # Shortlist everything at or above the overlap count that yields enough
+        # candidates, then rescore exactly
+        shortlist = overlap.items()
+        shortlist_size = self.top_k * _SHORTLIST_FACTOR
+        if len(overlap) > shortlist_size:
+            histogram = Counter(overlap.values())
+            seen = 0
+            for threshold in sorted(histogram, reverse=True):
+                seen += histogram[threshold]
+                if seen >= shortlist_size:
+                    break
+            if threshold > 1:
+                shortlist = [pair for pair in shortlist if pair[1] >= threshold]
+
+        size = len(terms)
+        terms_of = self.terms
+        scored = [
+            (count / (size + len(terms_of[other]) - count), other)
+            for other, count in shortlist
+        ]
+        return [(other, score) for score, other in heapq.nlargest(self.top_k, scored)]
+
+    def _offer(self, row_id: str, item_id: str) -> bool:
+        """Update ``row_id``'s neighbors for a changed item. True if the row needs recomputing."""
+        row = list(self.neighbors.get(row_id, []))
+        score = self._score(self.terms[row_id], self.terms[item_id]) if item_id in self.terms else 0.0
+        entry = (score, item_id)
+        full = len(row) >= self.top_k
+
+        current = next((i for i, (other, _) in enumerate(row) if other == item_id), None)
+        if current is not None:
+            del row[current]
+            if full and (score == 0.0 or not row or entry < (row[-1][1], row[-1][0])):
+                # It may now rank below neighbors that were cut from the list
+                return True
+        elif score == 0.0 or (full and entry <= (row[-1][1], row[-1][0])):
+            return False
+
+        if score > 0.0:
+            row.append((item_id, score))
+            row.sort(key=lambda pair: (pair[1], pair[0]), reverse=True)
+        self.neighbors[row_id] = row[:self.top_k]
+        return False
+
+
+@dataclass(frozen=True)
+class RelatedSnapshot:
+    """Neighbor lists for one catalog generation, published whole and never modified."""
+    generation: int
+    catalog: CatalogSnapshot
+    articles: Dict[str, Neighbors]
+    projects: Dict[str, Neighbors]
+
+
+class RelatedContentService:
+    """Keeps article and project neighbor lists in step with the catalog.
+
+    The indexes are only touched by the refresh listener (and the first
+    build), under a lock; each result is published as a ``RelatedSnapshot``
+    that readers pick up with one attribute read, so requests never wait on
+    an update. Until the listener has run, readers see the previous
+    generation's lists.
+    """
+
+    def __init__(self, service: OptimizedPortfolioService = portfolio_service, listen: bool = True):
+        self.service = service
+        self.articles = SimilarityIndex()
+        self.projects = SimilarityIndex()
+        self.current: Optional[RelatedSnapshot] = None
+        self._lock = threading.Lock()  # Writers only
+        if listen:
+            service.add_listener(self._on_change)
+
+    def related_articles(self, article_id: str, limit: Optional[int] = None) -> List[Article]:
+        current = self.current or self.warm()
+        by_id = current.catalog.article_by_id
+        neighbors = current.articles.get(article_id, [])[:limit or self.articles.top_k]
+        return [by_id[other] for other, _ in neighbors if other in by_id]
+
+    def related_projects(self, project_id: str, limit: Optional[int] = None) -> List[Project]:
+        current = self.current or self.warm()
+        neighbors = current.projects.get(project_id, [])[:limit or self.projects.top_k]
+        return [p for p in map(current.catalog.get_project_by_id, (other for other, _ in neighbors)) if p]
+
+    def warm(self) -> RelatedSnapshot:
+        """Build both indexes now instead of on first use."""
+        with self._lock:
+            if self.current is None:
+                self._build(self.service.snapshot)
+            return self.current
+
+    def _build(self, catalog: CatalogSnapshot):
+        self.articles.build({a.id: article_terms(a) for a in catalog.articles})
+        self.projects.build({p.id: project_terms(p) for p in catalog.projects})
+        self._publish(catalog)
+
+    def _publish(self, catalog: CatalogSnapshot):
+        # Copies, so later in-place index updates never show through to readers
+        self.current = RelatedSnapshot(
+            generation=catalog.generation,
+            catalog=catalog,
+            articles=dict(self.articles.neighbors),
+            projects=dict(self.projects.neighbors)
+        )
+
+    def _on_change(self, change: CatalogChange):
+        with self._lock:
+            if self.current is None:
+                return  # Built lazily on first use
+            catalog = self.service.snapshot
+            if change.full:
+                self._build(catalog)
+                return
+            by_id = catalog.article_by_id
+            upserted = {
+                article_id: article_terms(by_id[article_id])
+                for article_id in change.upserted if article_id in by_id
+            }
+            wanted = set(change.upserted)
+            removed = set(change.removed) | (wanted - set(upserted))
+            self.articles.update(upserted, removed)
+            self._publish(catalog)
+
+
+# Global related content service instance
+related_service = RelatedContentService()
@@ -0,0 +1,299 @@
+"""
+Static site export: renders the public pages and GET API responses to files.
+
+The exported tree mirrors the public URL space so any static file server or
+CDN can serve it (with ``try_files $uri $uri.html $uri.json`` style fallback
+for extensionless URLs):
+
+    index.html, projects.html, noteonai.html, noteonai/<id>.html
+    noteonai/archive.html, noteonai/archive/<YYYY>.html, noteonai/archive/<YYYY>/<MM>.html
+    api/projects.json, api/projects/<id>.json
+    api/noteonai.json, api/noteonai/<id>.json, api/noteonai/<id>/content.json
+    api/noteonai/archive.json
+    api/featured.json, api/contact.json, api/tech-stack.json, api/portfolio-summary.json
+    feed.xml, atom.xml, sitemap.xml, sitemaps/sitemap-<n>.xml
+
+Usage:
+    python -m app.services.static_export [--output dist]
+    python -m app.services.static_export --article <article_id> [--article ...]
+"""
+import argparse
+import gzip
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.templates import template_manager
+from app.core.utils import atomic_write_bytes
+from app.services.portfolio_service import OptimizedPortfolioService, portfolio_service
+
+# An archive page: (year, None) for a year, (year, month) for a month
+Period = Tuple[int, Optional[int]]
+
+try:  # Optional: brotli variants are only written when the package is installed
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+class StaticSiteExporter:
+    """Writes the public site to a directory, fully or for a single article change."""
+
+    def __init__(
+        self,
+        output_dir: Optional[str] = None,
+        service: OptimizedPortfolioService = portfolio_service,
+        precompress: Optional[bool] = None
+    ):
+        self.output_dir = Path(output_dir or settings.export_dir)
+        self.service = service
+        self.precompress = settings.export_precompress if precompress is None else precompress
+        self.written: List[Path] = []
+
+    # Full export
+    def export_all(self, include_assets: bool = True) -> List[Path]:
+        """Export every public page and API response."""
+        self.written = []
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.export_pages()
+        self.export_project_api()
+        self.export_article_api()
+        self.export_archive()
+        self.export_misc_api()
+        self.export_feeds()
+
+        if include_assets:
+            self._copy_tree(Path(settings.static_dir), self.output_dir / "static")
+            self._copy_tree(Path(settings.assets_dir), self.output_dir / "assets")
+
+        return self.written
+
+    def export_pages(self):
+        """Render the HTML pages."""
+        from app.routes.pages import ContextBuilder
+
+        self._write_page("index.html", "pages/index.html", ContextBuilder.build_home_context(None))
+        self._write_page("projects.html", "pages/projects.html", ContextBuilder.build_projects_context(None))
+        self._write_page("noteonai.html", "pages/noteonai.html", ContextBuilder.build_noteonai_context(None))
+
+    def export_project_api(self):
+        """Write the project list and details."""
+        projects = self.service.projects
+        self._write_json("api/projects.json", projects)
+        for project in projects:
+            self._write_json(f"api/projects/{project.id}.json", project)
+
+    def export_article_api(self):
+        """Write the article list, and each article's detail, content and page."""
+        articles = self.service.articles
+        self._write_json("api/noteonai.json", articles)
+        for article in articles:
+            self._write_article(article.id)
+
+    def export_archive(self, periods: Optional[Iterable[Period]] = None):
+        """Write the archive index and its year/month pages.
+
+        Without ``periods`` every year and month is written and pages of
+        periods that no longer have articles are removed; otherwise only the
+        given periods are rewritten (or removed when empty).
+        """
+        from app.routes.pages import ContextBuilder
+
+        dates = self.service.snapshot.dates
+        summary = dates.summary()
+        self._write_page("noteonai/archive.html", "pages/archive.html", ContextBuilder.build_archive_context(None))
+        self._write_json("api/noteonai/archive.json", {"total": len(self.service.articles), "years": summary})
+
+        full = periods is None
+        if full:
+            periods = [(year["year"], None) for year in summary] + [
+                (year["year"], month["month"]) for year in summary for month in year["months"]
+            ]
+        written = set()
+        for year, month in periods:
+            relative = self._archive_path(year, month)
+            written.add(relative)
+            context = ContextBuilder.build_archive_context(None, year, month)
+            if context["articles"]:
+                self._write_page(relative, "pages/archive.html", context)
+            else:
+                self._remove(relative)
+
+        archive_dir = self.output_dir / "noteonai" / "archive"
+        if full and archive_dir.exists():
+            for path in archive_dir.rglob("*.html"):
+                relative = path.relative_to(self.output_dir).as_posix()
+                if relative not in written:
+                    self._remove(relative)
+
+    def export_misc_api(self):
+        """Write the small aggregate endpoints."""
+        self._write_json("api/featured.json", {
+            "projects": self.service.get_featured_projects(limit=3),
+            "articles": self.service.get_featured_articles(limit=2)
+        })
+        self._write_json("api/contact.json", self.service.contact_info)
+        self._write_json("api/tech-stack.json", self.service.tech_stack)
+        self._write_json("api/portfolio-summary.json", self.service.get_portfolio_stats())
+
+    def export_feeds(self):
+        """Write the RSS/Atom feeds and sitemap (or sitemap index and shards)."""
+        from app.services.feed_service import FeedService
+
+        documents = FeedService(self.service, listen=False).documents()
+        for relative, document in documents.items():
+            self._write(relative, document.body)
+
+        # Drop shards left over from a previous, larger export
+        shard_dir = self.output_dir / "sitemaps"
+        if shard_dir.exists():
+            for path in shard_dir.glob("sitemap-*.xml"):
+                if f"sitemaps/{path.name}" not in documents:
+                    self._remove(f"sitemaps/{path.name}")
+
+    # Incremental export
+    def export_article_change(self, article_ids: Iterable[str]) -> List[Path]:
+        """Re-export only the files affected by changes to the given articles.
+
+        Articles that no longer exist are removed from the output. Archive
+        pages are refreshed for both the current publication date and the
+        one recorded in the previously exported JSON, so redated articles
+        disappear from their old year and month.
+        """
+        self.written = []
+        periods: Set[Period] = set()
+
+        for article_id in article_ids:
+            previous = self._read_exported(f"api/noteonai/{article_id}.json")
+            if previous and previous.get("published_date"):
+                try:
+                    periods.update(self._periods(datetime.fromisoformat(previous["published_date"])))
+                except (TypeError, ValueError):
+                    pass
+
+            article = self.service.get_article_by_id(article_id)
+            if article:
+                self._write_article(article_id)
+                periods.update(self._periods(article.published_date))
+            else:
+                for relative in self._article_paths(article_id):
+                    self._remove(relative)
+
+        self._write_json("api/noteonai.json", self.service.articles)
+        self.export_archive(periods)
+        self.export_misc_api()
+        self.export_feeds()
+
+        from app.routes.pages import ContextBuilder
+        self._write_page("index.html", "pages/index.html", ContextBuilder.build_home_context(None))
+        self._write_page("noteonai.html", "pages/noteonai.html", ContextBuilder.build_noteonai_context(None))
+
+        return self.written
+
+    # Writers
+    def _write_article(self, article_id: str):
+        from app.routes.api import get_article_content
+        from app.routes.pages import ContextBuilder
+
+        detail, content, page = self._article_paths(article_id)
+        self._write_json(detail, self.service.get_article_by_id(article_id))
+        self._write_json(content, get_article_content(article_id))
+        self._write_page(page, "pages/article.html", ContextBuilder.build_article_context(None, article_id))
+
+    @staticmethod
+    def _article_paths(article_id: str) -> Tuple[str, str, str]:
+        return (
+            f"api/noteonai/{article_id}.json",
+            f"api/noteonai/{article_id}/content.json",
+            f"noteonai/{article_id}.html",
+        )
+
+    @staticmethod
+    def _archive_path(year: int, month: Optional[int]) -> str:
+        # Months are zero-padded, as in the archive page's links
+        return f"noteonai/archive/{year}.html" if month is None else f"noteonai/archive/{year}/{month:02d}.html"
+
+    @staticmethod
+    def _periods(published: datetime) -> List[Period]:
+        return [(published.year, None), (published.year, published.month)]
+
+    def _write_page(self, relative: str, template_name: str, context: dict):
+        html = template_manager.render_to_string(template_name, context)
+        self._write(relative, html.encode("utf-8"))
+
+    def _write_json(self, relative: str, content: Any):
+        # Same encoding FastAPI's JSONResponse uses, so exported bytes match the live API
+        body = json.dumps(
+            jsonable_encoder(content),
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self._write(relative, body)
+
+    def _write(self, relative: str, body: bytes):
+        path = self.output_dir / relative
+        atomic_write_bytes(path, body)
+        if self.precompress:
+            atomic_write_bytes(path.with_name(path.name + ".gz"), gzip.compress(body, compresslevel=9, mtime=0))
+            if brotli is not None:
+                atomic_write_bytes(path.with_name(path.name + ".br"), brotli.compress(body))
+        self.written.append(path)
+
+    def _remove(self, relative: str):
+        path = self.output_dir / relative
+        for candidate in (path, path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")):
+            if candidate.exists():
+                candidate.unlink()
+        # Drop directories left empty, e.g. api/noteonai/<id>/ of a deleted article
+        parent = path.parent
+        if parent != self.output_dir and parent.exists() and not any(parent.iterdir()):
+            parent.rmdir()
+
+    def _read_exported(self, relative: str) -> Optional[dict]:
+        path = self.output_dir / relative
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _copy_tree(source: Path, destination: Path):
+        if source.exists():
+            shutil.copytree(source, destination, dirs_exist_ok=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export the public site as static files.")
+    parser.add_argument("--output", default=settings.export_dir, help="Output directory")
+    parser.add_argument(
+        "--article",
+        action="append",
+        default=[],
+        help="Only re-export files affected by this article id (repeatable)"
+    )
+    parser.add_argument("--no-assets", action="store_true", help="Skip copying static/ and assets/")
+    parser.add_argument("--no-compress", action="store_true", help="Skip .gz/.br variants")
+    args = parser.parse_args(argv)
+
+    exporter = StaticSiteExporter(args.output, precompress=not args.no_compress)
+    if args.article:
+        written = exporter.export_article_change(args.article)
+    else:
+        written = exporter.export_all(include_assets=not args.no_assets)
+
+    print(f"Exported {len(written)} files to {exporter.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+In-memory category/tag registry with prefix completion.
+
+The vocabulary from ``blog_metadata.json`` is loaded once into a
+``TermTrie`` per kind, with usage counts taken from the article catalog.
+Every term is reachable from the start of each of its words ("lang" finds
+"Language Models" and "Large Language Models"), and completions are ranked
+by usage count, then name.
+
+Membership checks are dictionary lookups. New terms are added in memory and
+the metadata file is rewritten atomically, only when something was actually
+added. Counts follow the catalog through the portfolio service's refresh
+listener.
+"""
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.services.article_store import ArticleStore, article_store
+from app.services.portfolio_service import CatalogChange, OptimizedPortfolioService, portfolio_service
+
+
+class _Node:
+    __slots__ = ("children", "terms")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.terms: Set[str] = set()  # Keys of terms with a word starting exactly here
+
+
+class TermTrie:
+    """Case-insensitive term set with word-prefix completion and usage counts."""
+
+    def __init__(self):
+        self.root = _Node()
+        self.display: Dict[str, str] = {}  # key -> name as first registered
+        self.counts: Dict[str, int] = {}
+
+    @staticmethod
+    def key(term: str) -> str:
+        return " ".join(term.casefold().split())
+
+    def __contains__(self, term: str) -> bool:
+        return self.key(term) in self.display
+
+    def __len__(self) -> int:
+        return len(self.display)
+
+    def add(self, term: str) -> bool:
+        """Add a term; False if it (or a case variant) is already present."""
+        key = self.key(term)
+        if not key or key in self.display:
+            return False
+        self.display[key] = " ".join(term.split())
+        self.counts.setdefault(key, 0)
+        words = key.split(" ")
+        for i in range(len(words)):
+            node = self.root
+            for char in " ".join(words[i:]):
+                node = node.children.setdefault(char, _Node())
+            node.terms.add(key)
+        return True
+
+    def count(self, term: str, delta: int):
+        key = self.key(term)
+        if key in self.display:
+            self.counts[key] = max(0, self.counts[key] + delta)
+
+    def names(self) -> List[str]:
+        return sorted(self.display.values(), key=str.casefold)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """Terms with a word starting with ``prefix``, most used first."""
+        node = self.root
+        for char in self.key(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        matches: Set[str] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            matches |= current.terms
+            stack.extend(current.children.values())
+
+        ranked = heapq.nsmallest(limit, matches, key=lambda k: (-self.counts[k], k))
+        return [(self.display[k], self.counts[k]) for k in ranked]
+
+
+class TagRegistry:
+    """Categories and tags known to the admin, loaded once and kept current."""
+
+    def __init__(
+        self,
+        store: ArticleStore = article_store,
+        service: OptimizedPortfolioService = portfolio_service,
+        listen: bool = True
+    ):
+        self.store = store
+        self.service = service
+        self.categories = TermTrie()
+        self.tags = TermTrie()
+        self._article_terms: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        if listen:
+            service.add_listener(self._on_change)
+
+    def load(self):
+        """Load the vocabulary and usage counts (once)."""
+        with self._lock:
+            if self._loaded:
+                return
+            meta = self.store.load_metadata()
+            for category in meta.get("categories", []):
+                self.categories.add(category)
+            for tag in meta.get("tags", []):
+                self.tags.add(tag)
+            self._recount()
+            self._loaded = True
+
+    def complete(self, kind: str, prefix: str, limit: int = 10) -> List[Dict[str, object]]:
+        self.load()
+        trie = self.categories if kind == "categories" else self.tags
+        with self._lock:
+            return [{"name": name, "count": count} for name, count in trie.complete(prefix, limit)]
+
+    def popular_tags(self, limit: int) -> List[str]:
+        return [item["name"] for item in self.complete("tags", "", limit)]
+
+    def category_names(self) -> List[str]:
+        self.load()
+        with self._lock:
+            return self.categories.names()
+
+    def register(self, categories: Iterable[str], tags: Iterable[str]) -> bool:
+        """Add new terms and persist the metadata file if anything changed."""
+        self.load()
+        with self._lock:
+            added = [self.categories.add(c) for c in categories] + [self.tags.add(t) for t in tags]
+            if not any(added):
+                return False
+            if self.store.metadata_path.exists():
+                self.store.save_metadata({"categories": self.categories.names(), "tags": self.tags.names()})
+            return True
+
+    # Usage counts
+    def _recount(self):
+        for trie in (self.categories, self.tags):
+            trie.counts = dict.fromkeys(trie.counts, 0)
+        self._article_terms = {}
+        for article in self.service.articles:
+            self._apply(article.id, (article.category, tuple(article.tags)))
+
+    def _apply(self, article_id: str, terms: Optional[Tuple[str, Tuple[str, ...]]]):
+        previous = self._article_terms.pop(article_id, None)
+        if previous:
+            self.categories.count(previous[0], -1)
+            for tag in previous[1]:
+                self.tags.count(tag, -1)
+        if terms:
+            self._article_terms[article_id] = terms
+            # Terms used by articles are known even if the metadata file lacks them
+            self.categories.add(terms[0])
+            self.categories.count(terms[0], 1)
+            for tag in terms[1]:
+                self.tags.add(tag)
+                self.tags.count(tag, 1)
+
+    def _on_change(self, change: CatalogChange):
+        with self._lock:
+            if not self._loaded:
+                return
+            if change.full:
+                self._recount()
+                return
+            for article_id in change.removed:
+                self._apply(article_id, None)
+            for article_id in change.upserted:
+                article = self.service.get_article_by_id(article_id)
+                self._apply(article_id, (article.category, tuple(article.tags)) if article else None)
+
+
+# Global tag registry instance
+tag_registry = TagRegistry()
@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for hot paths in the portfolio application.
+
+Run all of them with ``python -m benchmarks.run``.
+"""
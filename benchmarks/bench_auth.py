@@ -0,0 +1,35 @@
+"""
+Admin authentication cost: JWT verification backends and the verified-token cache.
+"""
+from datetime import timedelta
+from typing import Any, Dict
+
+from jose import jwt
+
+from app.core import security
+from app.core.config import settings
+from benchmarks.common import measure
+
+
+def run() -> Dict[str, Any]:
+    token = security.create_access_token(
+        {"sub": settings.admin_username}, expires_delta=timedelta(minutes=30)
+    )
+
+    results = {
+        "jose_decode": measure(
+            lambda: jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        ),
+        "hmac_decode": measure(lambda: security._decode_hmac(token)),
+    }
+
+    def uncached():
+        security.token_cache.clear()
+        security.verify_access_token(token)
+
+    results["verify_uncached"] = measure(uncached)
+
+    security.verify_access_token(token)
+    results["verify_cached"] = measure(lambda: security.verify_access_token(token))
+    results["backend"] = settings.jwt_backend
+    return results
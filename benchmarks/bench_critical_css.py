@@ -0,0 +1,64 @@
+"""
+First-paint CSS: ``python -m app.services.critical_css`` into a temporary
+directory, in a fresh interpreter.
+
+Reports, before and after, the render-blocking stylesheet requests, their
+bytes (raw and gzipped) and the round trips of the ``@import`` chain, then
+per page the inlined critical CSS. ``within_budget`` is False when a page's
+inline CSS gzips to more than ``INLINE_GZIP_BUDGET`` (about what fits in the
+first round trip alongside the HTML) or anything still blocks render.
+"""
+import gzip
+import json
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).parent.parent
+INLINE_GZIP_BUDGET = 14 * 1024
+_IMPORT = re.compile(r"""@import\s+['"]([^'"]+)['"]""")
+
+
+def _gzipped(data: bytes) -> int:
+    return len(gzip.compress(data, 6))
+
+
+def run() -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as output:
+        build = subprocess.run(
+            [sys.executable, "-m", "app.services.critical_css", "--output", output],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        # Catalog loading prints progress lines first; the manifest starts at the first "{" line
+        lines = build.stdout.splitlines()
+        manifest = json.loads("\n".join(lines[lines.index("{"):]))
+        output = Path(output)
+        bundle = (output / manifest["stylesheet"]).read_bytes()
+        inline = {page: (output / entry["file"]).read_bytes() for page, entry in manifest["pages"].items()}
+
+    # Each blocking file travels compressed on its own
+    stylesheet = ROOT / "static" / "css" / "styles-modular.css"
+    files = [stylesheet] + [stylesheet.parent / name for name in _IMPORT.findall(stylesheet.read_text(encoding="utf-8"))]
+
+    before = dict(manifest["before"], blocking_gzip_bytes=sum(_gzipped(path.read_bytes()) for path in files))
+    after = dict(manifest["after"], deferred_gzip_bytes=_gzipped(bundle))
+    pages = {
+        page: {
+            **entry,
+            "inline_gzip_bytes": _gzipped(inline[page]),
+            "ok": _gzipped(inline[page]) <= INLINE_GZIP_BUDGET,
+        }
+        for page, entry in manifest["pages"].items()
+    }
+    return {
+        "fold_elements": manifest["fold_elements"],
+        "rules": manifest["rules"],
+        "before": before,
+        "after": after,
+        "pages": pages,
+        "inline_gzip_budget": INLINE_GZIP_BUDGET,
+        "within_budget": after["blocking_requests"] == 0 and all(page["ok"] for page in pages.values()),
+    }
@@ -0,0 +1,79 @@
+"""
+Startup cost: ``python -X importtime -c "import main"`` in a fresh interpreter,
+plus the deferred warm-up that now runs after the port is bound.
+
+Reports the total import time, the slowest modules by cumulative and self
+time, the app's own modules, and how long each warm-up step takes.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).parent.parent
+TOP = 12
+
+_WARMUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from app.core.startup import startup_state, warm_up
+warm_up(startup_state)
+print(json.dumps({
+    "import_main_ms": round((imported - started) * 1000, 1),
+    "warm_up_ms": round((time.perf_counter() - imported) * 1000, 1),
+    "steps": {name: step.get("ms") for name, step in startup_state.steps.items()},
+}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` lines: ``import time: self [us] | cumulative | name``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": round(int(self_us) / 1000, 2),
+            "cumulative_ms": round(int(cumulative_us) / 1000, 2),
+        })
+    return rows
+
+
+def _subset(rows: List[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    return [
+        {"module": row["module"], key: row[key]}
+        for row in sorted(rows, key=lambda r: r[key], reverse=True)[:TOP]
+    ]
+
+
+def run() -> Dict[str, Any]:
+    profile = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = parse_importtime(profile.stderr)
+    top_level = [row for row in rows if row["depth"] == 0]
+
+    warm = subprocess.run(
+        [sys.executable, "-c", _WARMUP_SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(warm.stdout.strip().splitlines()[-1])
+
+    return {
+        "import_total_ms": round(sum(row["cumulative_ms"] for row in top_level), 1),
+        "modules_imported": len(rows),
+        "top_cumulative": _subset(rows, "cumulative_ms"),
+        "top_self": _subset(rows, "self_ms"),
+        "app_modules": [
+            {"module": row["module"], "cumulative_ms": row["cumulative_ms"], "self_ms": row["self_ms"]}
+            for row in rows if row["module"] == "main" or row["module"].startswith("app.")
+        ],
+        "startup": timings,
+    }
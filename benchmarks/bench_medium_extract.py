@@ -0,0 +1,141 @@
+"""
+fetch-medium metadata extraction: streaming extractor vs. the previous
+decode-everything + HTMLParser + regex implementation.
+
+Pages come from ``benchmarks/samples/*.html`` when present (saved Medium
+post pages, named ``<slug>-<post id>.html``), plus a synthetic page shaped
+like a Medium post: meta tags in the head, a large article body, then an
+Apollo state script with many entries.
+"""
+import io
+import json
+import random
+import re
+import time
+import tracemalloc
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from app.services.medium_extractor import MediumMetadataExtractor
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+CHUNK_SIZE = 64 * 1024
+
+
+def synthetic_page(post_id: str = "1a2b3c4d5e6f", body_kb: int = 1500, apollo_entries: int = 4000) -> bytes:
+    rng = random.Random(42)
+    paragraphs = []
+    size = 0
+    while size < body_kb * 1024:
+        words = " ".join(rng.choice(["model", "data", "agent", "graph", "token", "layer", "loss"]) for _ in range(60))
+        paragraph = f'<p class="pw-post-body-paragraph">{words}</p>\n'
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+
+    apollo: Dict[str, Any] = {}
+    for i in range(apollo_entries):
+        apollo[f"User:{i:08x}"] = {"id": f"{i:08x}", "name": f"User {i}", "bio": "x" * 120}
+        if i == apollo_entries // 2:
+            apollo[f"Post:{post_id}"] = {
+                "id": post_id,
+                "title": "Synthetic Post",
+                "readingTime": 8.3,
+                "firstPublishedAt": 1717000000000,
+                "content": {"bodyModel": {"paragraphs": [{"text": "y" * 200}] * 50}},
+            }
+
+    head = (
+        '<html><head><meta charset="utf-8">'
+        '<meta property="og:title" content="Synthetic Post">'
+        '<meta property="og:description" content="A synthetic post">'
+        '<meta property="og:image" content="https://example.com/image.png">'
+        f'<meta property="og:url" content="https://medium.com/@someone/synthetic-post-{post_id}">'
+        '<meta name="twitter:data1" content="8 min read">'
+        '</head><body>'
+    )
+    tail = f"<script>window.__APOLLO_STATE__ = {json.dumps(apollo)}</script></body></html>"
+    return (head + "".join(paragraphs) + tail).encode("utf-8")
+
+
+def legacy_extract(raw: bytes, url: str) -> Dict[str, Any]:
+    """The pre-streaming fetch_medium parsing, kept verbatim as the baseline."""
+    class MetaParser(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.meta = {}
+        def handle_starttag(self, tag, attrs):
+            if tag == 'meta':
+                attrs_dict = dict(attrs)
+                if 'property' in attrs_dict:
+                    prop = attrs_dict['property']
+                    if prop.startswith('og:'):
+                        self.meta[prop] = attrs_dict.get('content')
+                elif 'name' in attrs_dict:
+                    name = attrs_dict['name']
+                    if name in ('description', 'twitter:data1', 'article:published_time'):
+                        self.meta[name] = attrs_dict.get('content')
+
+    html = raw.decode('utf-8')
+    parser = MetaParser()
+    parser.feed(html)
+    read_time = 5
+    published_date = parser.meta.get('article:published_time')
+    apollo_match = re.search(r'window\.__APOLLO_STATE__\s*=\s*({.+?})</script>', html)
+    if apollo_match:
+        apollo_data = json.loads(apollo_match.group(1))
+        post = None
+        url_match = re.search(r'-([a-f0-9]+)$', url)
+        if url_match:
+            post = apollo_data.get(f"Post:{url_match.group(1)}")
+        if post:
+            read_time = int(round(post['readingTime']))
+            published_date = datetime.fromtimestamp(post['firstPublishedAt'] / 1000).isoformat()
+    return {"title": parser.meta.get('og:title', ''), "read_time": read_time, "published_date": published_date}
+
+
+def streaming_extract(raw: bytes, url: str) -> Tuple[Dict[str, Any], int]:
+    stream = io.BytesIO(raw)
+    extractor = MediumMetadataExtractor(url, max_bytes=len(raw) + 1)
+    while not extractor.done:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        extractor.feed_bytes(chunk)
+    return extractor.result(), extractor.bytes_read
+
+
+def _profile(func, *args) -> Dict[str, float]:
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    result = func(*args)
+    cpu = time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"result": result, "cpu_ms": round(cpu * 1000, 2), "peak_kb": round(peak / 1024, 1)}
+
+
+def load_samples() -> List[Tuple[str, bytes, str]]:
+    post_id = "1a2b3c4d5e6f"
+    samples = [("synthetic", synthetic_page(post_id), f"https://medium.com/@someone/synthetic-post-{post_id}")]
+    if SAMPLES_DIR.exists():
+        for path in sorted(SAMPLES_DIR.glob("*.html")):
+            samples.append((path.stem, path.read_bytes(), f"https://medium.com/@sample/{path.stem}"))
+    return samples
+
+
+def run() -> Dict[str, Any]:
+    report = {}
+    for name, raw, url in load_samples():
+        legacy = _profile(legacy_extract, raw, url)
+        streaming = _profile(streaming_extract, raw, url)
+        streamed_result, bytes_read = streaming.pop("result")
+        legacy_result = legacy.pop("result")
+        report[name] = {
+            "page_kb": round(len(raw) / 1024, 1),
+            "legacy": legacy,
+            "streaming": {**streaming, "bytes_read_kb": round(bytes_read / 1024, 1)},
+            "same_result": all(streamed_result[k] == legacy_result[k] for k in legacy_result),
+        }
+    return report
@@ -0,0 +1,72 @@
+"""
+Memory budgets: ``python -m app.core.memory --leak-check N`` in a fresh
+interpreter, after the startup warm-up has loaded the catalog and built the
+indexes.
+
+Reports the deep size of each component and checks it against the budgets
+below (bytes per catalog article, so they hold for any data directory),
+along with the traced growth per ``refresh_data()``. ``within_budget`` is
+False when any budget is exceeded, and ``benchmarks.run`` then exits 1.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).parent.parent
+REFRESHES = 3
+
+# Bytes per article
+BUDGETS_PER_ARTICLE = {
+    "catalog": 8 * 1024,
+    "related_index": 8 * 1024,
+    "feeds": 4 * 1024,
+    "chat_index": 8 * 1024,
+    "tag_registry": 4 * 1024,
+}
+# Bytes, independent of catalog size
+BUDGETS = {
+    "site_templates": 4 * 1024 * 1024,
+    "growth_per_refresh": 256 * 1024,
+}
+
+
+def run() -> Dict[str, Any]:
+    profile = subprocess.run(
+        [sys.executable, "-m", "app.core.memory", "--leak-check", str(REFRESHES)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    # The warm-up prints progress lines first; the report starts at the first "{" line
+    lines = profile.stdout.splitlines()
+    report = json.loads("\n".join(lines[lines.index("{"):]))
+
+    articles = max(report["articles"], 1)
+    actual = {
+        "catalog": report["catalog"]["bytes"],
+        **{name: report["derived"][name]["bytes"] for name in BUDGETS_PER_ARTICLE if name != "catalog"},
+    }
+    budgets = {
+        name: {"limit": limit, "actual": actual[name] // articles, "ok": actual[name] // articles <= limit}
+        for name, limit in BUDGETS_PER_ARTICLE.items()
+    }
+    measured = {
+        "site_templates": report["templates"]["site"]["bytes"],
+        "growth_per_refresh": report["leak_check"]["growth_per_refresh"],
+    }
+    budgets.update({
+        name: {"limit": limit, "actual": measured[name], "ok": measured[name] <= limit}
+        for name, limit in BUDGETS.items()
+    })
+
+    return {
+        "articles": report["articles"],
+        "process_kib": report["process_kib"],
+        "total_bytes": report["total_bytes"],
+        "catalog": report["catalog"],
+        "derived": report["derived"],
+        "templates": report["templates"],
+        "leak_check": report["leak_check"],
+        "budgets": budgets,
+        "within_budget": all(budget["ok"] for budget in budgets.values()),
+    }
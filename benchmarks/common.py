@@ -0,0 +1,38 @@
+"""
+Shared timing helpers for the benchmark suite.
+"""
+import time
+from typing import Any, Callable, Dict
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, min_time: float = 0.2) -> Dict[str, float]:
+    """Time ``func`` and return per-call statistics in microseconds.
+
+    The loop count is calibrated so each of the ``repeat`` runs takes at least
+    ``min_time`` seconds; the best run is reported alongside the mean.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed < min_time / 10 else max(2, int(min_time / max(elapsed, 1e-9)))
+
+    runs = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append(time.perf_counter() - start)
+
+    per_call = [run / number * 1e6 for run in runs]
+    best = min(per_call)
+    return {
+        "loops": number,
+        "best_us": round(best, 3),
+        "mean_us": round(sum(per_call) / len(per_call), 3),
+        "ops_per_sec": round(1e6 / best, 1) if best else 0.0,
+    }
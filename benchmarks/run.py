@@ -0,0 +1,39 @@
+"""
+Run the benchmark suite and print a JSON report.
+
+Usage:
+    python -m benchmarks.run [name ...]
+
+Names are benchmark module suffixes, e.g. ``auth`` for ``bench_auth``.
+Exits 1 if any benchmark reports ``within_budget: false``.
+"""
+import importlib
+import json
+import pkgutil
+import sys
+from pathlib import Path
+
+
+def discover():
+    """Yield (name, module name) for every bench_* module in this package."""
+    package_dir = Path(__file__).parent
+    for module in sorted(pkgutil.iter_modules([str(package_dir)]), key=lambda m: m.name):
+        if module.name.startswith("bench_"):
+            yield module.name[len("bench_"):], f"benchmarks.{module.name}"
+
+
+def main(argv=None):
+    selected = set(argv if argv is not None else sys.argv[1:])
+    report = {}
+    for name, module_name in discover():
+        if selected and name not in selected:
+            continue
+        module = importlib.import_module(module_name)
+        report[name] = module.run()
+    print(json.dumps(report, indent=2, default=str))
+    return report
+
+
+if __name__ == "__main__":
+    results = main()
+    sys.exit(0 if all(r.get("within_budget", True) for r in results.values() if isinstance(r, dict)) else 1)
@@ -6,7 +6,14 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.routes import pages, api, admin
+from app.core.compression import StreamingGZipMiddleware
+from app.core.admission import AdmissionControlMiddleware
+from app.core.analytics import RouteViewMiddleware
+from app.core.response_cache import ResponseCacheMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.surrogate import SurrogateKeyMiddleware
+from app.core.startup import WarmupGateMiddleware, lifespan
+from app.routes import pages, api, admin, feeds
 
 
 def create_app() -> FastAPI:
@@ -17,9 +24,23 @@ def create_app() -> FastAPI:
         title=settings.app_name,
         description=settings.app_description,
         version=settings.version,
-        debug=settings.debug
+        debug=settings.debug,
+        lifespan=lifespan
     )
     
+    # Tag responses with surrogate keys (below the cache, so hits carry the same keys)
+    app.add_middleware(SurrogateKeyMiddleware)
+    
+    # Serve cacheable GETs from memory (everything added after it still runs on hits)
+    app.add_middleware(ResponseCacheMiddleware)
+    
+    # Count route views (outside the cache, so hits are counted too)
+    app.add_middleware(RouteViewMiddleware)
+    
+    # Per-request phase timings and the slow-request log (inside compression,
+    # which is reported as its own phase)
+    app.add_middleware(ProfilingMiddleware)
+    
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -29,6 +50,15 @@ def create_app() -> FastAPI:
         allow_headers=settings.allowed_headers,
     )
     
+    # Compress responses (flushes per chunk so streamed pages stay incremental)
+    app.add_middleware(StreamingGZipMiddleware, minimum_size=settings.gzip_minimum_size)
+    
+    # Hold data-dependent requests while the background warm-up runs
+    app.add_middleware(WarmupGateMiddleware)
+    
+    # Rate limiting and admission control (added last so it runs first)
+    app.add_middleware(AdmissionControlMiddleware)
+    
     # Mount static files
     app.mount("/static", StaticFiles(directory=settings.static_dir), name="static")
     app.mount("/assets", StaticFiles(directory=settings.assets_dir), name="assets")
@@ -36,6 +66,7 @@ def create_app() -> FastAPI:
     # Include routers
     app.include_router(pages.router, tags=["pages"])
     app.include_router(api.router, tags=["api"])
+    app.include_router(feeds.router)
     app.include_router(admin.router, prefix="/admin", tags=["admin"])
     
     return app
@@ -60,5 +91,7 @@ if __name__ == "__main__":
         "main:app",
         host=settings.host,
         port=port,
-        reload=settings.reload
+        reload=settings.reload,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.forwarded_allow_ips
     )
@@ -1,3 +1,5 @@
 #!/usr/bin/env bash
 # Build script for Render
 pip install -r requirements.txt
+# Inline critical CSS per page and flatten the stylesheet imports
+python -m app.services.critical_css
@@ -1,3 +1,5 @@
 #!/usr/bin/env bash
-# Start script for Render
-uvicorn main:app --host 0.0.0.0 --port $PORT
+# Start script for Render (preloads the app, then forks $WORKERS uvicorn workers)
+# Only Render's load balancer can reach the service, so trust its X-Forwarded-For
+export FORWARDED_ALLOW_IPS="${FORWARDED_ALLOW_IPS:-*}"
+python -m app.core.launcher --host 0.0.0.0 --port $PORT
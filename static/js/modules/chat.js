@@ -72,10 +72,10 @@ export class ChatManager {
     handleQuickQuestion(questionType) {
         if (this.isProcessing) return;
 
-        const response = this.responses[questionType];
-        if (response) {
-            this.addUserMessage(`Tell me about your ${questionType}`);
-            this.addBotMessage(response.text);
+        if (this.responses[questionType]) {
+            const question = `Tell me about your ${questionType}`;
+            this.addUserMessage(question);
+            this.processMessage(question);
         }
     }
 
@@ -160,9 +160,55 @@ export class ChatManager {
     }
 
     /**
-     * Optimized message processing with keyword mapping
+     * Ask the server (streamed over SSE); answer locally if it is unreachable
      */
     processMessage(message) {
+        this.streamAnswer(message).catch(() => this.answerLocally(message));
+    }
+
+    streamAnswer(message) {
+        return new Promise((resolve, reject) => {
+            if (!window.EventSource || !this.chatMessages) {
+                reject(new Error('Streaming unavailable'));
+                return;
+            }
+
+            this.isProcessing = true;
+            const typingElement = this.addTypingIndicator();
+            const source = new EventSource(`/api/chat?q=${encodeURIComponent(message)}`);
+            let paragraph = null;
+
+            source.onmessage = (event) => {
+                const { delta } = JSON.parse(event.data);
+                if (!paragraph) {
+                    typingElement?.remove();
+                    const messageElement = this.createMessageElement(false, '');
+                    this.chatMessages.appendChild(messageElement);
+                    paragraph = messageElement.querySelector('.bot-bubble p');
+                }
+                paragraph.textContent += delta;
+                this.scrollToBottom();
+            };
+
+            source.addEventListener('done', () => {
+                source.close();
+                this.isProcessing = false;
+                resolve();
+            });
+
+            source.onerror = () => {
+                source.close();
+                typingElement?.remove();
+                this.isProcessing = false;
+                paragraph ? resolve() : reject(new Error('Chat request failed'));
+            };
+        });
+    }
+
+    /**
+     * Offline fallback with keyword mapping
+     */
+    answerLocally(message) {
         const lowerMessage = message.toLowerCase();
 
         // Keyword to response mapping for better maintainability
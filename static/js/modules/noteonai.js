@@ -76,6 +76,16 @@ document.addEventListener('DOMContentLoaded', function () {
         item.style.cursor = 'pointer';
     });
 
+    // Count a view when an article link is followed (fire-and-forget beacon)
+    document.addEventListener('click', function (e) {
+        const link = e.target.closest('[data-article-id] a[href]');
+        if (!link || !navigator.sendBeacon) return;
+        // Article pages on this site are counted by the server when they load
+        if (link.getAttribute('href').startsWith('/noteonai/')) return;
+        const articleId = link.closest('[data-article-id]').dataset.articleId;
+        navigator.sendBeacon('/api/noteonai/' + encodeURIComponent(articleId) + '/view');
+    });
+
     // Category filtering
     categoryFilters.forEach(filter => {
         filter.addEventListener('click', function () {
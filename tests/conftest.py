@@ -0,0 +1,39 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.core.utils import PROJECT_ROOT
+from app.services.article_store import ArticleStore
+
+
+def article_record(article_id: str, **overrides):
+    record = {
+        "id": article_id,
+        "title": f"Title of {article_id}",
+        "excerpt": "An excerpt.",
+        "category": "Core AI",
+        "tags": ["Testing"],
+        "published_date": "2024-02-10T08:00:00",
+        "read_time": 3,
+        "featured": False,
+    }
+    record.update(overrides)
+    return record
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch) -> Path:
+    """An empty data directory, configured the way deployments do: relative, from another working directory."""
+    path = tmp_path / "data"
+    (path / "articles").mkdir(parents=True)
+    monkeypatch.setattr(settings, "data_dir", os.path.relpath(path, PROJECT_ROOT))
+    monkeypatch.setattr(settings, "refresh_signal_path", str(path / ".catalog-version"))
+    monkeypatch.chdir(tmp_path)
+    return path
+
+
+@pytest.fixture
+def store(data_dir) -> ArticleStore:
+    return ArticleStore()
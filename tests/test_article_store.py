@@ -0,0 +1,49 @@
+from app.services.portfolio_service import OptimizedPortfolioService
+
+from tests.conftest import article_record
+
+
+def test_batch_keeps_files_of_articles_loaded_from_disk(store):
+    for article_id in ("a-1", "a-2", "a-3"):
+        store.save(article_record(article_id))
+    service = OptimizedPortfolioService()
+    snapshot = service.snapshot
+
+    result = store.apply_batch(
+        [
+            {"op": "upsert", "article": article_record("a-1", title="Edited")},
+            {"op": "toggle_featured", "id": "a-2"},
+        ],
+        snapshot.article_by_id,
+        snapshot.paths
+    )
+
+    assert result.moved == []
+    for article_id in ("a-1", "a-2"):
+        assert snapshot.paths[article_id].exists()
+    service.refresh_data()
+    assert {a.id for a in service.articles} == {"a-1", "a-2", "a-3"}
+    assert service.get_article_by_id("a-1").title == "Edited"
+    assert service.get_article_by_id("a-2").featured
+
+
+def test_batch_moves_and_deletes_articles_at_non_canonical_paths(store, data_dir):
+    legacy = data_dir / "articles" / "legacy"
+    legacy.mkdir()
+    for article_id in ("b-1", "b-2"):
+        path = legacy / f"{article_id}.json"
+        path.write_bytes(store._encode(article_record(article_id)))
+    snapshot = OptimizedPortfolioService().snapshot
+
+    result = store.apply_batch(
+        [
+            {"op": "upsert", "article": article_record("b-1", title="Edited")},
+            {"op": "delete", "id": "b-2"},
+        ],
+        snapshot.article_by_id,
+        snapshot.paths
+    )
+
+    assert result.moved == ["b-1"]
+    assert sorted(p.name for p in (data_dir / "articles").rglob("*.json")) == ["b-1.json"]
+    assert result.paths["b-1"].exists()
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.services import catalog_transfer
+from app.services.catalog_transfer import CatalogImporter, export_ndjson
+from app.services.portfolio_service import OptimizedPortfolioService
+from app.services.tag_registry import TagRegistry
+
+from tests.conftest import article_record
+
+
+async def _chunks(data: bytes):
+    for start in range(0, len(data), 100):
+        yield data[start:start + 100]
+
+
+def test_reimporting_an_export_keeps_every_article(store, data_dir, monkeypatch):
+    for number in range(5):
+        store.save(article_record(f"c-{number}", category="Core AI" if number % 2 else "Research"))
+    service = OptimizedPortfolioService()
+    monkeypatch.setattr(catalog_transfer, "portfolio_service", service)
+    monkeypatch.setattr(catalog_transfer, "tag_registry", TagRegistry(store, service, listen=False))
+    files_before = sorted((data_dir / "articles").rglob("*.json"))
+
+    exported = b"".join(export_ndjson(service.snapshot, store))
+    report = asyncio.run(CatalogImporter(store, batch_size=2).run(_chunks(exported)))
+
+    assert report["error_count"] == 0
+    assert report["written"] == 5
+    assert sorted((data_dir / "articles").rglob("*.json")) == files_before
+    service.refresh_data()
+    assert len(service.articles) == 5
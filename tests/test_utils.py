@@ -0,0 +1,26 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.utils import period_bounds
+
+
+@pytest.mark.parametrize("value, start, end", [
+    ("2025", datetime(2025, 1, 1), datetime(2026, 1, 1)),
+    ("2025-12", datetime(2025, 12, 1), datetime(2026, 1, 1)),
+    ("2025-03-14", datetime(2025, 3, 14), datetime(2025, 3, 15)),
+    ("2025-03-14T10:00:00+02:00", datetime(2025, 3, 14, 8), datetime(2025, 3, 14, 8, 0, 0, 1)),
+])
+def test_period_bounds(value, start, end):
+    assert period_bounds(value) == (start, end)
+
+
+@pytest.mark.parametrize("value", ["9999", "9999-12", "9999-12-31", "9999-12-31T23:59:59.999999"])
+def test_period_bounds_at_the_end_of_the_calendar(value):
+    assert period_bounds(value)[1] == datetime.max
+
+
+@pytest.mark.parametrize("value", ["", "0", "2025-13", "yesterday", "0001-01-01T00:00:00+01:00"])
+def test_period_bounds_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        period_bounds(value)